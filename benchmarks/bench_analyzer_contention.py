@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Analyzer Ingest Contention Benchmark
+Measures how long the ingest thread waits while the scorer runs.
+
+Compares the lock-free SPSC ring in MeditationAnalyzer against the previous
+design, where add_sample and calculate_meditation_score shared one lock.
+
+Usage:
+    python benchmarks/bench_analyzer_contention.py [--seconds 5]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from meditation_analyzer import MeditationAnalyzer
+
+
+class LockedAnalyzer(MeditationAnalyzer):
+    """Previous behaviour: ingest and scoring serialized on one lock"""
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.lock_wait = []
+
+    def add_sample(self, sample):
+        start = time.perf_counter()
+        self.lock.acquire()
+        self.lock_wait.append(time.perf_counter() - start)
+        try:
+            super().add_sample(sample)
+        finally:
+            self.lock.release()
+
+    def calculate_meditation_score(self):
+        with self.lock:
+            return super().calculate_meditation_score()
+
+
+def run(analyzer, seconds):
+    """Ingest as fast as possible while another thread scores continuously"""
+    samples = np.random.default_rng(0).normal(0, 30, (4096, 4))
+    latencies = []
+    stop = threading.Event()
+    scores = [0]
+
+    def scorer():
+        while not stop.is_set():
+            analyzer.calculate_meditation_score()
+            scores[0] += 1
+
+    # Fill the window so every score does the full computation
+    for sample in samples[:analyzer.buffer_size]:
+        analyzer.add_sample(sample)
+
+    thread = threading.Thread(target=scorer, daemon=True)
+    thread.start()
+    deadline = time.perf_counter() + seconds
+    i = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        analyzer.add_sample(samples[i % len(samples)])
+        latencies.append(time.perf_counter() - start)
+        i += 1
+    stop.set()
+    thread.join()
+
+    latencies = np.array(latencies) * 1e6
+    result = {
+        'samples': len(latencies),
+        'scores': scores[0],
+        'add_p50_us': np.percentile(latencies, 50),
+        'add_p99_us': np.percentile(latencies, 99),
+        'add_max_us': latencies.max(),
+    }
+    if hasattr(analyzer, 'lock_wait'):
+        wait = np.array(analyzer.lock_wait) * 1e6
+        result['lock_wait_total_ms'] = wait.sum() / 1e3
+        result['lock_wait_max_us'] = wait.max()
+    else:
+        result['lock_wait_total_ms'] = 0.0
+        result['lock_wait_max_us'] = 0.0
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{'design':<12}{'samples':>10}{'scores':>8}{'p50 us':>9}{'p99 us':>9}"
+          f"{'max us':>10}{'lock wait ms':>14}")
+    for name, analyzer in (('locked', LockedAnalyzer()), ('spsc', MeditationAnalyzer())):
+        r = run(analyzer, args.seconds)
+        print(f"{name:<12}{r['samples']:>10}{r['scores']:>8}{r['add_p50_us']:>9.1f}"
+              f"{r['add_p99_us']:>9.1f}{r['add_max_us']:>10.0f}{r['lock_wait_total_ms']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+EEG Codec Benchmark
+Compares the quantized delta codec with raw float32 storage on synthetic
+Muse EEG: bytes per hour, compression ratio and encode/decode throughput.
+
+Usage:
+    python benchmarks/bench_eeg_codec.py [--minutes 10] [--block-size 1024]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from session_archive import CODECS
+from synthetic_stream import synthetic_eeg, MUSE_EEG_RATE, MUSE_CHANNELS
+
+
+def run(codec, times, data, block_size):
+    """Encode and decode every block; returns (bytes, encode s, decode s)"""
+    encode, decode = CODECS[codec]
+    blocks = []
+    start = time.perf_counter()
+    for i in range(0, len(times), block_size):
+        blocks.append(encode(times[i:i + block_size], data[i:i + block_size]))
+    encode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decoded = [decode(block, min(block_size, len(times) - i), data.shape[1])
+               for i, block in zip(range(0, len(times), block_size), blocks)]
+    decode_time = time.perf_counter() - start
+
+    # Round trip must be lossless for device-resolution data
+    assert np.array_equal(np.concatenate([d for _, d in decoded]), data)
+    assert np.abs(np.concatenate([t for t, _ in decoded]) - times).max() < 1e-6
+    return sum(len(b) for b in blocks), encode_time, decode_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--minutes', type=float, default=10.0)
+    parser.add_argument('--block-size', type=int, default=1024)
+    args = parser.parse_args()
+
+    n = int(args.minutes * 60 * MUSE_EEG_RATE)
+    data = synthetic_eeg(n, np.random.default_rng(0)).astype(np.float32)
+    # Dejittered LSL timestamps with one dropped 12-sample packet per minute
+    index = np.arange(n) + (np.arange(n) // (60 * MUSE_EEG_RATE)) * 12
+    times = 12345.678 + index / MUSE_EEG_RATE
+    hours = n / MUSE_EEG_RATE / 3600
+
+    print(f"{n} samples x {len(MUSE_CHANNELS)} channels, blocks of {args.block_size}")
+    print(f"{'codec':<10}{'MB/hour':>10}{'ratio':>8}{'encode MS/s':>13}{'decode MS/s':>13}")
+    baseline = None
+    for codec in ('float32', 'delta'):
+        size, encode_time, decode_time = run(codec, times, data, args.block_size)
+        baseline = baseline or size
+        print(f"{codec:<10}{size / hours / 1e6:>10.2f}{baseline / size:>8.2f}"
+              f"{n / encode_time / 1e6:>13.2f}{n / decode_time / 1e6:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Multi-headset Scoring Benchmark
+Time per scoring tick for 1, 8 and 32 simulated headsets: one
+MeditationAnalyzer per device scored in a Python loop, against the stacked
+MultiHeadsetEngine scoring all devices in one vectorized pass.
+Every other headset has a flat AF7, so the score difference also checks
+that both paths apply the same contact-quality weighting.
+
+Usage:
+    python benchmarks/bench_multi_headset.py [--ticks 50] [--devices 1 8 32]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from meditation_analyzer import MeditationAnalyzer
+from multi_headset import MultiHeadsetEngine
+from synthetic_stream import synthetic_eeg, MUSE_EEG_RATE
+
+
+def run(n_devices, ticks):
+    """Returns (loop ms per tick, engine ms per tick, max score difference)"""
+    rng = np.random.default_rng(n_devices)
+    analyzers = [MeditationAnalyzer() for _ in range(n_devices)]
+    engine = MultiHeadsetEngine()
+    for device, analyzer in enumerate(analyzers):
+        data = synthetic_eeg(2 * MUSE_EEG_RATE * 3, rng, alpha_amplitude=5 + device)
+        if device % 2 == 0:
+            data[:, 1] = 0.0  # Lifted AF7 electrode
+        timestamps = np.arange(len(data)) / MUSE_EEG_RATE
+        engine.add_samples(str(device), data, timestamps)
+        for sample, timestamp in zip(data, timestamps):
+            analyzer.add_sample(sample, timestamp)
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        loop_scores = [analyzer.calculate_meditation_score()[0] for analyzer in analyzers]
+    loop_time = (time.perf_counter() - start) / ticks
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        engine_scores = engine.score()['score']
+    engine_time = (time.perf_counter() - start) / ticks
+
+    return loop_time * 1e3, engine_time * 1e3, np.abs(np.array(loop_scores) - engine_scores).max()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ticks', type=int, default=50)
+    parser.add_argument('--devices', type=int, nargs='+', default=[1, 8, 32])
+    args = parser.parse_args()
+
+    print(f"{'headsets':>9}{'loop ms':>10}{'engine ms':>11}{'speedup':>9}{'max diff':>10}")
+    for n_devices in args.devices:
+        loop_ms, engine_ms, diff = run(n_devices, args.ticks)
+        print(f"{n_devices:>9}{loop_ms:>10.2f}{engine_ms:>11.2f}{loop_ms / engine_ms:>9.1f}{diff:>10.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Meditation Calibration
+Streaming calibration statistics and persisted personal baselines.
+
+CalibrationStats folds AF7/AF8 samples into Welford-style running moments:
+mean square (for RMS), mean and variance of the first difference (for
+smoothness) and the co-moment of both channels (for sync). Memory is
+constant, every sample is O(1), and turning the moments into a baseline is
+instant. Blocks of samples merge in with the parallel (Chan et al.) form
+of the same update.
+
+Baselines can also come from any recorded segment of an archived session
+(baseline_from_eeg / the command line below), and AdaptiveBaseline lets a
+baseline follow slow electrode drift during long sessions.
+
+BaselineStore keeps finished baselines in ~/.musemeditation/baselines.json,
+keyed by device address and user, so a returning user can skip calibration.
+
+Usage:
+    python calibration.py SESSION --start 2 --end 3 [--user NAME]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from session_archive import Session
+
+
+BASELINE_FILE = os.path.join(os.path.expanduser('~'), '.musemeditation', 'baselines.json')
+
+
+class RunningMoments:
+    """Count, means, M2 per variable and co-moment of two variables"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = np.zeros(2)
+        self.m2 = np.zeros(2)
+        self.comoment = 0.0
+
+    def add(self, x, y):
+        self.n += 1
+        dx = x - self.mean[0]
+        dy = y - self.mean[1]
+        self.mean[0] += dx / self.n
+        self.mean[1] += dy / self.n
+        self.m2[0] += dx * (x - self.mean[0])
+        self.m2[1] += dy * (y - self.mean[1])
+        self.comoment += dx * (y - self.mean[1])
+
+    def add_block(self, x, y):
+        """Merge the moments of two equally long arrays"""
+        n = len(x)
+        if n == 0:
+            return
+        mean = np.array([x.mean(), y.mean()])
+        m2 = np.array([np.sum((x - mean[0]) ** 2), np.sum((y - mean[1]) ** 2)])
+        comoment = np.sum((x - mean[0]) * (y - mean[1]))
+
+        total = self.n + n
+        delta = mean - self.mean
+        self.m2 += m2 + delta ** 2 * self.n * n / total
+        self.comoment += comoment + delta[0] * delta[1] * self.n * n / total
+        self.mean += delta * n / total
+        self.n = total
+
+    def variance(self):
+        """Population variance of both variables (like np.var)"""
+        return self.m2 / self.n if self.n else np.full(2, np.nan)
+
+    def correlation(self):
+        denominator = np.sqrt(self.m2[0] * self.m2[1])
+        return self.comoment / denominator if denominator > 0 else np.nan
+
+
+class CalibrationStats:
+    """Constant-memory accumulator of the baseline indicators"""
+
+    def __init__(self):
+        self.signal = RunningMoments()  # AF7, AF8
+        self.diff = RunningMoments()    # first differences of AF7, AF8
+        self.sum_sq = np.zeros(2)
+        self.last = None
+
+    @property
+    def n_samples(self):
+        return self.signal.n
+
+    def add(self, af7, af8):
+        """Fold in one sample pair; O(1)"""
+        self.signal.add(af7, af8)
+        self.sum_sq[0] += af7 * af7
+        self.sum_sq[1] += af8 * af8
+        if self.last is not None:
+            self.diff.add(af7 - self.last[0], af8 - self.last[1])
+        self.last = (af7, af8)
+
+    def add_block(self, af7, af8):
+        """Fold in (n,) arrays of consecutive samples"""
+        af7 = np.asarray(af7, dtype=np.float64)
+        af8 = np.asarray(af8, dtype=np.float64)
+        if len(af7) == 0:
+            return
+        self.signal.add_block(af7, af8)
+        self.sum_sq += [np.dot(af7, af7), np.dot(af8, af8)]
+        if self.last is not None:
+            self.diff.add(af7[0] - self.last[0], af8[0] - self.last[1])
+        self.diff.add_block(np.diff(af7), np.diff(af8))
+        self.last = (af7[-1], af8[-1])
+
+    def baseline(self):
+        """Baseline dict (avg_rms, smoothness, sync) as used by MeditationAnalyzer.
+
+        sync is None when the correlation is undefined (e.g. a flat channel).
+        """
+        rms = np.sqrt(self.sum_sq / self.signal.n)
+        smoothness = 1.0 / (1.0 + self.diff.variance())
+        correlation = self.signal.correlation()
+        return {
+            'avg_rms': float(rms.mean()),
+            'smoothness': float(smoothness.mean()),
+            'sync': None if np.isnan(correlation) else float(abs(correlation)),
+        }
+
+
+def baseline_from_eeg(eeg, channels=('TP9', 'AF7', 'AF8', 'TP10')):
+    """Baseline from a whole (channels, samples) recording in one vectorized pass"""
+    stats = CalibrationStats()
+    stats.add_block(eeg[channels.index('AF7')], eeg[channels.index('AF8')])
+    return stats
+
+
+class AdaptiveBaseline:
+    """Exponentially weighted baseline that follows slow drift; O(1) per update.
+
+    Each scored block pulls the baseline towards the block's own RMS,
+    smoothness and sync with a weight set by the time since the previous
+    update, so the half-life is in seconds whatever the scoring rate.
+    Keep the half-life long (minutes) so it tracks electrode drift rather
+    than the meditation itself.
+    """
+
+    def __init__(self, baseline, half_life=600.0):
+        self.half_life = half_life
+        self.reset(baseline)
+
+    def reset(self, baseline):
+        self.baseline = dict(baseline)
+        self.last_time = None
+
+    def update(self, indicators, timestamp):
+        """Fold in one block's indicators (rms, smoothness, sync); returns the baseline"""
+        if timestamp is None:
+            return self.baseline
+        if self.last_time is None or timestamp <= self.last_time:
+            self.last_time = timestamp
+            return self.baseline
+        weight = 1.0 - 0.5 ** ((timestamp - self.last_time) / self.half_life)
+        self.last_time = timestamp
+        for key, indicator in (('avg_rms', 'rms'), ('smoothness', 'smoothness'), ('sync', 'sync')):
+            value = float(indicators[indicator])
+            if np.isfinite(value):
+                self.baseline[key] += weight * (value - self.baseline[key])
+        return self.baseline
+
+
+def baseline_key(address, user):
+    return f"{address or 'unknown'}/{user or 'default'}"
+
+
+class BaselineStore:
+    """Personal baselines persisted per device address and user"""
+
+    def __init__(self, path=BASELINE_FILE):
+        self.path = path
+        self.baselines = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.baselines = json.load(f)
+            except (OSError, ValueError):
+                self.baselines = {}
+
+    def get(self, address, user, max_age_days=None):
+        """Saved baseline dict, or None if missing (or older than max_age_days)"""
+        entry = self.baselines.get(baseline_key(address, user))
+        if entry is None:
+            return None
+        if max_age_days is not None and time.time() - entry['saved'] > max_age_days * 86400:
+            return None
+        return entry['baseline']
+
+    def put(self, address, user, baseline, samples=0):
+        self.baselines[baseline_key(address, user)] = {
+            'baseline': baseline,
+            'samples': samples,
+            'saved': time.time(),
+        }
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump(self.baselines, f, indent=2)
+        os.replace(self.path + '.tmp', self.path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate from a recorded session segment")
+    parser.add_argument('session', help="session folder")
+    parser.add_argument('--start', type=float, default=0.0, help="segment start (minutes into the session)")
+    parser.add_argument('--end', type=float, default=1.0, help="segment end (minutes into the session)")
+    parser.add_argument('--user', help="save the baseline for this user (default: only print it)")
+    args = parser.parse_args()
+
+    # Imported here: multi_headset depends on the analyzer, which depends on this module
+    from multi_headset import device_address
+
+    session = Session(args.session)
+    times, data = session.raw_minutes(args.start, args.end, channels=['AF7', 'AF8'])
+    stats = baseline_from_eeg(data.T, channels=('AF7', 'AF8'))
+    if stats.n_samples < session.sample_rate:
+        print("ERROR Not enough data in the selected segment")
+        sys.exit(1)
+
+    baseline = stats.baseline()
+    if baseline['sync'] is None:
+        print("ERROR Sync undefined for this segment (flat channel?)")
+        sys.exit(1)
+    print(f"Baseline from {stats.n_samples} samples: RMS {baseline['avg_rms']:.1f}µV, "
+          f"smoothness {baseline['smoothness']:.5f}, sync {baseline['sync']:.3f}")
+
+    if args.user:
+        address = device_address(session.meta.get('source_id', ''))
+        BaselineStore().put(address, args.user, baseline, stats.n_samples)
+        print(f"Saved for {args.user} on {address}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Inter-hemispheric Coherence
+Magnitude-squared coherence between AF7/AF8 (frontal) and TP9/TP10
+(temporal) in the theta and alpha bands, maintained incrementally.
+
+Welch-style estimate: Hann-tapered 1s segments with 50% overlap, auto- and
+cross-spectra summed over the last SEGMENTS segments. Each update only
+transforms the segments completed since the previous one (one rfft call for
+all channels and new segments) and swaps them into running sums, so the
+work per block is one segment's FFT whatever the averaging length.
+
+    MSC(f) = |sum Sab(f)|^2 / (sum Saa(f) * sum Sbb(f))
+
+averaged over the band's bins; NaN until two segments are in.
+"""
+
+import numpy as np
+
+
+COHERENCE_PAIRS = {'frontal': ('AF7', 'AF8'), 'temporal': ('TP9', 'TP10')}
+COHERENCE_BANDS = {'theta': (4.0, 8.0), 'alpha': (8.0, 13.0)}
+COHERENCE_COLUMNS = tuple(f"coherence_{band}_{pair}"
+                          for pair in COHERENCE_PAIRS for band in COHERENCE_BANDS)
+SEGMENTS = 8  # 1s segments, 50% overlap: 4.5s of signal
+
+
+class CoherenceTracker:
+    """Running cross-spectral averages for the channel pairs of one stream"""
+
+    def __init__(self, channels, sample_rate=256, segment_seconds=1.0, segments=SEGMENTS):
+        self.segment = int(segment_seconds * sample_rate)
+        self.hop = self.segment // 2
+        self.taper = np.hanning(self.segment)
+        frequencies = np.fft.rfftfreq(self.segment, 1.0 / sample_rate)
+        self.band_masks = {band: (frequencies >= low) & (frequencies <= high)
+                           for band, (low, high) in COHERENCE_BANDS.items()}
+
+        # Pairs whose channels this stream has
+        self.pairs = [name for name, (a, b) in COHERENCE_PAIRS.items() if a in channels and b in channels]
+        self.first = [list(channels).index(COHERENCE_PAIRS[name][0]) for name in self.pairs]
+        self.second = [list(channels).index(COHERENCE_PAIRS[name][1]) for name in self.pairs]
+
+        # Ring of per-segment spectra and their running sums
+        bins = len(frequencies)
+        self.segments = segments
+        self.auto = np.zeros((segments, 2, len(self.pairs), bins))
+        self.cross = np.zeros((segments, len(self.pairs), bins), dtype=np.complex128)
+        self.auto_sum = np.zeros((2, len(self.pairs), bins))
+        self.cross_sum = np.zeros((len(self.pairs), bins), dtype=np.complex128)
+        self.count = 0          # segments added so far
+        self.next_start = None  # absolute sample index of the next segment
+
+    def update(self, window, end):
+        """Add the segments completed in window, a (channels, n) array whose
+        last sample has absolute index end - 1"""
+        if not self.pairs:
+            return
+        begin = end - window.shape[1]
+        if self.next_start is None or self.next_start < begin:
+            self.next_start = begin  # Start, or fell behind the window: skip ahead
+        starts = np.arange(self.next_start, end - self.segment + 1, self.hop)
+        if len(starts) == 0:
+            return
+        starts = starts[-self.segments:]
+        self.next_start = starts[-1] + self.hop
+
+        # (channels, new segments, samples) -> one FFT for all of them
+        rows = sorted(set(self.first + self.second))
+        segments = window[rows][:, (starts - begin)[:, None] + np.arange(self.segment)]
+        segments = segments - segments.mean(axis=-1, keepdims=True)
+        spectra = np.fft.rfft(segments * self.taper, axis=-1)
+        a = spectra[[rows.index(i) for i in self.first]]   # (pairs, new, bins)
+        b = spectra[[rows.index(i) for i in self.second]]
+
+        for k in range(len(starts)):
+            slot = self.count % self.segments
+            auto = np.stack((np.abs(a[:, k]) ** 2, np.abs(b[:, k]) ** 2))
+            cross = a[:, k] * np.conj(b[:, k])
+            self.auto_sum += auto - self.auto[slot]
+            self.cross_sum += cross - self.cross[slot]
+            self.auto[slot] = auto
+            self.cross[slot] = cross
+            self.count += 1
+            if slot == self.segments - 1:
+                # Once per lap, resum exactly so rounding never accumulates
+                self.auto_sum = self.auto.sum(axis=0)
+                self.cross_sum = self.cross.sum(axis=0)
+
+    def values(self):
+        """{COHERENCE_COLUMNS entry: MSC} (NaN for missing pairs or too little data)"""
+        result = dict.fromkeys(COHERENCE_COLUMNS, np.nan)
+        if self.count < 2:
+            return result
+        with np.errstate(invalid='ignore', divide='ignore'):
+            msc = np.abs(self.cross_sum) ** 2 / (self.auto_sum[0] * self.auto_sum[1])
+        for p, pair in enumerate(self.pairs):
+            for band, mask in self.band_masks.items():
+                result[f"coherence_{band}_{pair}"] = float(np.mean(msc[p, mask]))
+        return result
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Quantized Delta EEG Codec
+Compact, independently decodable blocks for raw Muse EEG.
+
+Muse samples are 12-bit ADC codes scaled by 0.48828125 µV, shipped as
+float32. Each block is stored as:
+
+- header: first timestamp, quantization step, code width, compressed sizes
+- timestamps: microsecond offsets from the first one, second-order deltas,
+  zlib-compressed (regular sampling makes them nearly all zero)
+- samples: integer codes, channel-major, first-order delta per channel,
+  zlib-compressed
+
+Device data round-trips exactly; other signals are rounded to the step.
+Timestamps are exact to half a microsecond. Blocks share no state, so any
+block can be decoded on its own straight from the archive index.
+"""
+
+import struct
+import zlib
+
+import numpy as np
+
+
+MUSE_UV_PER_LSB = 0.48828125
+HEADER = struct.Struct('<ddBII')  # t0, step, code bytes, timestamp bytes, sample bytes
+TIME_RESOLUTION = 1e-6
+
+
+def encode_block(times, data, step=MUSE_UV_PER_LSB, level=6):
+    """Encode (n,) timestamps and (n, channels) samples into bytes"""
+    times = np.asarray(times, dtype=np.float64)
+    t0 = float(times[0]) if len(times) else 0.0
+    ticks = np.round((times - t0) / TIME_RESOLUTION).astype(np.int64)
+    time_deltas = np.diff(np.diff(ticks, prepend=0), prepend=0)
+    time_bytes = zlib.compress(time_deltas.tobytes(), level)
+
+    codes = np.round(np.asarray(data, dtype=np.float64).T / step).astype(np.int64)
+    deltas = np.diff(codes, axis=1, prepend=0)
+    dtype = np.int16
+    if deltas.size and (deltas.min() < np.iinfo(np.int16).min or deltas.max() > np.iinfo(np.int16).max):
+        dtype = np.int32
+    sample_bytes = zlib.compress(deltas.astype(dtype).tobytes(), level)
+
+    header = HEADER.pack(t0, step, np.dtype(dtype).itemsize, len(time_bytes), len(sample_bytes))
+    return header + time_bytes + sample_bytes
+
+
+def decode_block(buffer, n_samples, n_channels):
+    """Decode one block into (timestamps, (n, channels) float32 samples)"""
+    buffer = memoryview(buffer)
+    t0, step, code_bytes, time_size, sample_size = HEADER.unpack_from(buffer)
+    start = HEADER.size
+
+    time_deltas = np.frombuffer(zlib.decompress(buffer[start:start + time_size]), dtype=np.int64)
+    times = t0 + np.cumsum(np.cumsum(time_deltas)) * TIME_RESOLUTION
+    start += time_size
+
+    dtype = np.int16 if code_bytes == 2 else np.int32
+    deltas = np.frombuffer(zlib.decompress(buffer[start:start + sample_size]), dtype=dtype)
+    codes = np.cumsum(deltas.reshape(n_channels, n_samples), axis=1, dtype=np.int64)
+    data = (codes.T * step).astype(np.float32)
+    return times[:n_samples], data
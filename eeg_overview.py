@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+EEG Overview Pyramid
+Min/max pyramid over the whole session's EEG so a plot can show anything
+from a few seconds to hours while drawing about one point pair per pixel.
+
+Level 0 holds the raw samples (float32) and their LSL timestamps. Every
+complete group of PYRAMID_FACTOR entries of level k is folded into one
+(min, max) bucket of level k + 1 as soon as it fills, so appending stays
+O(1) amortized and nothing is recomputed later.
+
+read() picks the finest level with no more buckets than the plot has
+pixels across the requested time span, and returns the buckets as
+alternating min/max points (the usual envelope trace). The unfinished
+last bucket is taken from the raw tail, which is less than one bucket
+long, so the live edge is always shown up to the newest sample.
+"""
+
+import numpy as np
+
+
+PYRAMID_FACTOR = 4
+
+
+class MinMaxPyramid:
+    """Growing (channels, samples) record with min/max decimation levels"""
+
+    def __init__(self, n_channels, factor=PYRAMID_FACTOR, capacity=65536):
+        self.factor = factor
+        self.times = np.empty(capacity)
+        raw = np.empty((n_channels, capacity), dtype=np.float32)
+        self.mins = [raw]  # Level 0: min == max == the samples
+        self.maxs = [raw]
+        self.counts = [0]
+
+    @property
+    def count(self):
+        return self.counts[0]
+
+    @property
+    def last_time(self):
+        return self.times[self.count - 1] if self.count else None
+
+    def grow(self, level):
+        """Double the capacity of one level"""
+        extra = self.mins[level].shape[1]
+        mins = np.concatenate((self.mins[level], np.empty_like(self.mins[level][:, :extra])), axis=1)
+        if level == 0:
+            self.times = np.concatenate((self.times, np.empty(extra)))
+            self.mins[0] = self.maxs[0] = mins
+        else:
+            self.mins[level] = mins
+            self.maxs[level] = np.concatenate((self.maxs[level], np.empty_like(mins[:, :extra])), axis=1)
+
+    def add(self, sample, timestamp):
+        """Append one sample (one value per channel); folds full buckets upward"""
+        n = self.counts[0]
+        if n == self.times.size:
+            self.grow(0)
+        self.times[n] = timestamp
+        self.mins[0][:, n] = sample
+        n += 1
+        self.counts[0] = n
+
+        level = 0
+        while n % self.factor == 0:
+            n //= self.factor
+            level += 1
+            if level == len(self.counts):
+                shape = (self.mins[0].shape[0], max(self.mins[level - 1].shape[1] // self.factor, 16))
+                self.mins.append(np.empty(shape, dtype=np.float32))
+                self.maxs.append(np.empty(shape, dtype=np.float32))
+                self.counts.append(0)
+            elif n > self.mins[level].shape[1]:
+                self.grow(level)
+            span = slice((n - 1) * self.factor, n * self.factor)
+            self.mins[level][:, n - 1] = self.mins[level - 1][:, span].min(axis=1)
+            self.maxs[level][:, n - 1] = self.maxs[level - 1][:, span].max(axis=1)
+            self.counts[level] = n
+
+    def read(self, t0, t1, pixels):
+        """Points covering LSL times [t0, t1] for a plot pixels wide.
+
+        Returns (times, values) with values shaped (channels, points):
+        raw samples when they fit, else min/max pairs of the right level.
+        """
+        times = self.times[:self.count]
+        i0 = int(np.searchsorted(times, t0, side='left'))
+        i1 = int(np.searchsorted(times, t1, side='right'))
+        if i1 <= i0:
+            return np.empty(0), np.empty((self.mins[0].shape[0], 0), dtype=np.float32)
+
+        level, size = 0, 1
+        while (i1 - i0) / size > max(pixels, 1) and level + 1 < len(self.counts):
+            level += 1
+            size *= self.factor
+        if level == 0:
+            return times[i0:i1], self.mins[0][:, i0:i1]
+
+        b0 = i0 // size
+        b1 = -(-i1 // size)
+        done = min(b1, self.counts[level])
+        lows = self.mins[level][:, b0:done]
+        highs = self.maxs[level][:, b0:done]
+        if b1 > done:
+            # Unfinished last bucket straight from the raw tail
+            tail = self.mins[0][:, done * size:self.count]
+            lows = np.concatenate((lows, tail.min(axis=1, keepdims=True)), axis=1)
+            highs = np.concatenate((highs, tail.max(axis=1, keepdims=True)), axis=1)
+
+        values = np.empty((lows.shape[0], 2 * lows.shape[1]), dtype=np.float32)
+        values[:, 0::2] = lows
+        values[:, 1::2] = highs
+        return np.repeat(times[np.arange(b0, b1) * size], 2), values
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Group Synchrony Metrics
+Live group metrics for shared sessions on top of MultiHeadsetEngine.
+
+Every update:
+- aligns all headsets on the LSL timeline: the reference time is the newest
+  timestamp every live device has reached (devices more than one window
+  behind the newest sample are left out), and each device's band power
+  window ends at its last sample at or before that time
+- computes AF7/AF8 band power (alpha by default) for all devices in one
+  batched FFT
+- folds the log band powers into exponentially weighted running means and
+  a devices x devices covariance (one outer-product update per tick, no
+  history kept), giving pairwise inter-brain correlations
+- summarizes the per-device scores: mean and dispersion
+
+The group synchrony index is the mean pairwise correlation.
+"""
+
+import numpy as np
+
+from session_archive import band_power
+
+
+class GroupSynchrony:
+    """Incremental mean score, dispersion and inter-brain band power correlation"""
+
+    def __init__(self, engine, band=(8.0, 13.0), window_seconds=2.0, half_life=30.0):
+        self.engine = engine
+        self.band = band
+        self.window = int(window_seconds * engine.sample_rate)
+        # Weight of the newest tick; older ticks fade with the given half-life
+        self.alpha = 1.0 - 0.5 ** (1.0 / half_life)
+
+        self.mean = np.zeros(0)
+        self.cov = np.zeros((0, 0))
+        self.updates = np.zeros(0, dtype=np.int64)
+
+    def grow(self, n_devices):
+        """Make room for devices added to the engine since the last update"""
+        added = n_devices - len(self.mean)
+        if added > 0:
+            self.mean = np.append(self.mean, np.zeros(added))
+            self.cov = np.pad(self.cov, ((0, added), (0, added)))
+            self.updates = np.append(self.updates, np.zeros(added, dtype=np.int64))
+
+    def aligned_band_power(self):
+        """(reference time, ready device indices, log band power per device)"""
+        engine = self.engine
+        ready = np.flatnonzero(engine.write_index >= engine.window)
+        if len(ready) == 0:
+            return None, ready, np.zeros(0)
+
+        latest = engine.times[ready, (engine.write_index[ready] - 1) % engine.capacity]
+        # A stalled or disconnected headset must not pin the reference: only
+        # devices within one window of the newest sample take part
+        with np.errstate(invalid='ignore'):
+            live = latest >= np.nanmax(latest) - self.window / engine.sample_rate
+        ready, latest = ready[live], latest[live]
+        if len(ready) == 0:
+            return None, ready, np.zeros(0)
+        reference = latest.min()
+        
+        # Samples each device is ahead of the common reference time
+        with np.errstate(invalid='ignore'):
+            ahead = np.sum(engine.times[ready] > reference, axis=1)
+        ends = engine.write_index[ready] - ahead
+        # Keep devices whose window really ends at or before the reference
+        # and hasn't been overwritten
+        end_times = engine.times[ready, (ends - 1) % engine.capacity]
+        aligned = (ahead + self.window <= engine.capacity) & (ends >= self.window) & (end_times <= reference)
+        ready, ends = ready[aligned], ends[aligned]
+        if len(ready) == 0:
+            return reference, ready, np.zeros(0)
+        slots = (ends[:, None] - self.window + np.arange(self.window)) % engine.capacity
+
+        rows = ready[:, None]
+        channels = [engine.channels.index('AF7'), engine.channels.index('AF8')]
+        # (devices * 2, window) -> one FFT for every device and channel
+        windows = np.concatenate([engine.eeg[rows, c, slots] for c in channels])
+        power = band_power(windows.T, engine.sample_rate, self.band).reshape(2, -1).mean(axis=0)
+        return reference, ready, np.log(power + 1e-12)
+
+    def update(self, scores=None):
+        """Advance the running statistics by one tick and return group metrics.
+
+        scores is an engine.score() result (computed here if not given).
+        """
+        scores = self.engine.score() if scores is None else scores
+        self.grow(len(self.engine.devices))
+        reference, ready, log_power = self.aligned_band_power()
+
+        if len(ready):
+            # Exponentially weighted Welford update restricted to ready devices
+            block = np.ix_(ready, ready)
+            delta = log_power - self.mean[ready]
+            self.mean[ready] += self.alpha * delta
+            self.cov[block] = (1 - self.alpha) * (self.cov[block] + self.alpha * np.outer(delta, delta))
+            self.updates[ready] += 1
+
+        tracked = np.flatnonzero(self.updates > 1)
+        correlation = np.full(self.cov.shape, np.nan)
+        if len(tracked):
+            block = np.ix_(tracked, tracked)
+            std = np.sqrt(np.diag(self.cov)[tracked])
+            with np.errstate(invalid='ignore', divide='ignore'):
+                correlation[block] = self.cov[block] / np.outer(std, std)
+
+        pairs = correlation[np.triu_indices(len(correlation), k=1)]
+        pairs = pairs[~np.isnan(pairs)]
+        valid_scores = scores['score'][~np.isnan(scores['score'])]
+        return {
+            'time': reference,
+            'devices': len(valid_scores),
+            'mean_score': float(valid_scores.mean()) if len(valid_scores) else np.nan,
+            'score_std': float(valid_scores.std()) if len(valid_scores) else np.nan,
+            'band_power': dict(zip(ready.tolist(), log_power.tolist())),
+            'correlation': correlation,
+            'synchrony': float(pairs.mean()) if len(pairs) else np.nan,
+        }
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Heart Rate and HRV
+Streaming beat detection on the Muse PPG stream, constant work per sample.
+
+Per PPG sample (infrared channel):
+- the slow DC level is tracked with an exponential average and removed;
+  the sign is flipped because more blood at systole reflects less light
+- a short exponential average smooths the pulse wave
+- an exponential average of its magnitude sets the peak threshold
+- a local maximum above the threshold, at least MIN_IBI after the last
+  beat, is a beat; a parabola through the three samples around it places
+  the beat between samples
+
+Inter-beat intervals that jump more than 30% from their running average
+are treated as artifacts. Accepted intervals give the instantaneous heart
+rate, and their successive differences feed a rolling RMSSD over the last
+RMSSD_BEATS beats (running sum of squares, O(1) per beat).
+
+The PPG inlet is read next to the EEG inlet with zero timeout, after the
+EEG samples of each chunk have been handed on, so EEG never waits for it.
+
+heart_score() turns heart rate and RMSSD into a 0-100 relaxation score
+that MeditationAnalyzer can blend into the meditation score (heart_weight,
+off by default so scores stay comparable with EEG-only baselines).
+"""
+
+import math
+from collections import deque
+
+
+PPG_RATE = 64.0     # Muse 2 PPG rate (Hz)
+PPG_CHANNEL = 1     # Muse PPG channels: ambient, infrared, red
+MIN_IBI = 60.0 / 180
+MAX_IBI = 60.0 / 35
+RMSSD_BEATS = 30
+STALE_SECONDS = 5.0  # No beat for this long: heart rate unknown
+
+# Values added to every analyzer result (NaN while unknown)
+HEART_COLUMNS = ('heart_rate', 'rmssd')
+
+# Typical resting adult values heart_score compares against without calibration
+HEART_REFERENCE = {'heart_rate': 70.0, 'rmssd': 40.0}
+
+
+def heart_score(heart, reference=None):
+    """0-100 relaxation score from heart_rate and rmssd values (NaN if unknown).
+
+    Half comes from heart rate: 10% below the reference scores full, 10%
+    above scores nothing. Half from RMSSD: twice the reference scores full.
+    reference is a calibration-time summary() (HEART_REFERENCE if None).
+    """
+    reference = reference or HEART_REFERENCE
+    heart_rate, rmssd = heart['heart_rate'], heart['rmssd']
+    if math.isnan(heart_rate) or math.isnan(rmssd):
+        return math.nan
+    slower = 0.5 + (reference['heart_rate'] - heart_rate) / (0.2 * reference['heart_rate'])
+    variable = 0.5 * rmssd / reference['rmssd']
+    return 50.0 * min(max(slower, 0.0), 1.0) + 50.0 * min(max(variable, 0.0), 1.0)
+
+
+class HeartRateEngine:
+    """Instantaneous heart rate and rolling RMSSD from PPG samples"""
+
+    def __init__(self, sample_rate=PPG_RATE, channel=PPG_CHANNEL, rmssd_beats=RMSSD_BEATS):
+        self.channel = channel
+        self.set_sample_rate(sample_rate)
+
+        self.dc = None
+        self.pulse = 0.0
+        self.envelope = 0.0
+        self.previous = (0.0, 0.0)       # pulse two samples ago, one sample ago
+        self.previous_time = None
+        self.last_time = None
+
+        self.last_peak = None
+        self.last_beat = None            # time of the last accepted beat
+        self.last_ibi = None
+        self.ibi_average = None
+        self.heart_rate = math.nan
+        self.beats = 0
+        self.differences = deque(maxlen=rmssd_beats)  # successive IBI differences (ms)
+        self.sum_squares = 0.0
+
+    def set_sample_rate(self, sample_rate):
+        """Adopt the PPG stream's nominal rate (before feeding samples)"""
+        self.sample_interval = 1.0 / sample_rate
+        self.dc_alpha = 1.0 - math.exp(-1.0 / (1.0 * sample_rate))
+        self.smooth_alpha = 1.0 - math.exp(-1.0 / (0.05 * sample_rate))
+        self.envelope_alpha = 1.0 - math.exp(-1.0 / (2.0 * sample_rate))
+        
+    def add(self, sample, timestamp):
+        """Fold in one PPG sample; O(1)"""
+        x = sample[self.channel]
+        if self.dc is None:
+            self.dc = x
+        self.dc += self.dc_alpha * (x - self.dc)
+        pulse = self.pulse + self.smooth_alpha * ((self.dc - x) - self.pulse)
+        self.pulse = pulse
+        self.envelope += self.envelope_alpha * (abs(pulse) - self.envelope)
+
+        # The previous sample is a peak if it tops both neighbours and the envelope
+        before, peak = self.previous
+        if peak > before and peak >= pulse and peak > self.envelope and \
+                (self.last_peak is None or self.previous_time - self.last_peak >= MIN_IBI):
+            offset = 0.5 * (before - pulse) / (before - 2 * peak + pulse)
+            self.beat(self.previous_time + offset * self.sample_interval)
+
+        self.previous = (peak, pulse)
+        self.previous_time = timestamp
+        self.last_time = timestamp
+
+    def add_chunk(self, samples, timestamps):
+        for sample, timestamp in zip(samples, timestamps):
+            self.add(sample, timestamp)
+
+    def beat(self, timestamp):
+        if self.last_peak is not None:
+            ibi = timestamp - self.last_peak
+            if ibi > MAX_IBI:
+                self.last_ibi = None  # Gap: restart the interval chain
+            elif self.ibi_average is None or abs(ibi - self.ibi_average) < 0.3 * self.ibi_average:
+                self.accept(ibi, timestamp)
+            else:
+                # Likely an artifact; still drift the average so a real change is followed
+                self.ibi_average += 0.1 * (ibi - self.ibi_average)
+        self.last_peak = timestamp
+
+    def accept(self, ibi, timestamp):
+        self.heart_rate = 60.0 / ibi
+        self.last_beat = timestamp
+        self.beats += 1
+        if self.last_ibi is not None:
+            difference = (ibi - self.last_ibi) * 1000.0
+            if len(self.differences) == self.differences.maxlen:
+                self.sum_squares -= self.differences[0] ** 2
+            self.differences.append(difference)
+            self.sum_squares += difference ** 2
+        self.last_ibi = ibi
+        self.ibi_average = ibi if self.ibi_average is None else \
+            self.ibi_average + 0.2 * (ibi - self.ibi_average)
+
+    @property
+    def rmssd(self):
+        """Root mean square of successive IBI differences (ms)"""
+        if len(self.differences) < 2:
+            return math.nan
+        return math.sqrt(max(self.sum_squares, 0.0) / len(self.differences))
+
+    def summary(self):
+        """HEART_COLUMNS as a dict; NaN once no beat was seen for STALE_SECONDS"""
+        if self.last_beat is None or self.last_time - self.last_beat > STALE_SECONDS:
+            return {'heart_rate': math.nan, 'rmssd': math.nan}
+        return {'heart_rate': self.heart_rate, 'rmssd': self.rmssd}
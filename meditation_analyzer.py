@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Meditation Analysis Engine
+Real-time meditation scoring from Muse 2 EEG data.
+
+Kept free of Qt imports so the same analyzer can run inside the GUI,
+in a headless ingest process, or in offline tools.
+"""
+
+import numpy as np
+
+from calibration import CalibrationStats, AdaptiveBaseline
+from metrics import evaluate
+from heart_rate import HEART_COLUMNS, heart_score
+from coherence import CoherenceTracker
+from motion_gate import MAX_ACC_LAG
+
+
+# Brain states in ascending order of relaxation; the index is the state code
+# used wherever a numeric state is needed (shared memory, LSL, exports)
+MEDITATION_STATES = (
+    "Active/Stressed",
+    "Alert/Focused",
+    "Mild Relaxation",
+    "Calm/Relaxed",
+    "Deep Meditation",
+)
+
+
+# Labels returned instead of a state when a tick produces no score
+COLLECTING_LABEL = "Collecting data..."
+MOTION_LABEL = "Motion detected - score paused"
+NO_NEW_SCORE_LABEL = "Waiting for the next score"  # Viewer of a slower ingest process
+UNSCORED_LABELS = (COLLECTING_LABEL, MOTION_LABEL, NO_NEW_SCORE_LABEL)
+
+
+def state_code_from_score(score):
+    """Map a 0-100 meditation score to its MEDITATION_STATES index"""
+    if score > 75:
+        return 4
+    elif score > 60:
+        return 3
+    elif score > 40:
+        return 2
+    elif score > 25:
+        return 1
+    return 0
+
+
+def state_label(state_code, calibrated):
+    """Human readable state for a state code, as shown in the GUI"""
+    suffix = " (Calibrated)" if calibrated else " (Uncalibrated)"
+    return MEDITATION_STATES[int(state_code)] + suffix
+
+
+# Muse 2 EEG channels as declared by the muselsl outlet; used until the
+# stream's own channel map is known
+MUSE_CHANNELS = ('TP9', 'AF7', 'AF8', 'TP10', 'Right AUX')
+
+# Registered metrics the meditation score is built from
+INDICATORS = ('rms', 'smoothness', 'sync', 'stability')
+
+# Per-window outputs of score_windows, in export order
+WINDOW_COLUMNS = ('rms', 'smoothness', 'sync', 'stability', 'amplitude_score',
+                  'smoothness_score', 'sync_score', 'stability_score', 'score', 'state')
+
+
+def window_indicators(af7, af8):
+    """RMS, smoothness, sync and stability of (windows, samples) AF7/AF8 arrays.
+
+    Research-based meditation indicators:
+    1. Signal amplitude (high amplitude = more mental activity)
+    2. Signal smoothness (jagged = more active, smooth = more relaxed)
+    3. Cross-channel coherence (synchronized = more meditative)
+    4. Stability of the amplitude within the window
+    The indicators are registered metrics (metrics.py) sharing intermediates.
+    """
+    return evaluate(INDICATORS, np.stack((af7, af8)), ('AF7', 'AF8'))
+
+
+def combine_indicators(indicators, baseline=None):
+    """Sub-scores, 0-100 score and state code from window_indicators output.
+
+    Scores against a personal calibration baseline dict when given (values
+    may be scalars or one per window), otherwise against fixed population
+    thresholds.
+    """
+    rms = indicators['rms']
+    smoothness = indicators['smoothness']
+    sync = indicators['sync']
+
+    if baseline is not None:
+        # Relative amplitude scoring (compared to personal baseline)
+        rms_ratio = rms / baseline['avg_rms']
+        amplitude_score = np.select([rms_ratio < 0.7, rms_ratio < 0.85, rms_ratio < 1.15,
+                                     rms_ratio < 1.4], [40, 30, 20, 10], 0)
+        smoothness_score = np.minimum(30, smoothness / baseline['smoothness'] * 15)
+        baseline_sync = np.asarray(baseline['sync'], dtype=np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sync_ratio = np.where(baseline_sync > 0, sync / baseline_sync, 1.0)
+        sync_score = np.minimum(20, sync_ratio * 15)
+    else:
+        amplitude_score = np.select([rms < 15, rms < 30, rms < 50], [40, 25, 10], 0)
+        smoothness_score = np.minimum(30, smoothness * 1000)
+        sync_score = sync * 20
+
+    stability = indicators['stability']
+    stability_score = np.where(np.isnan(stability), 0, np.minimum(10, np.nan_to_num(stability) * 100))
+
+    score = np.clip(amplitude_score + smoothness_score + sync_score + stability_score, 0, 100)
+    state = state_code(score)
+    return {
+        'amplitude_score': amplitude_score.astype(np.float64),
+        'smoothness_score': smoothness_score,
+        'sync_score': sync_score,
+        'stability_score': stability_score.astype(np.float64),
+        'score': score,
+        'state': state,
+    }
+
+
+def state_code(score):
+    """MEDITATION_STATES index for scores (array or scalar)"""
+    return np.select([score > 75, score > 60, score > 40, score > 25], [4, 3, 2, 1], 0)
+
+
+def score_windows(eeg, window, hop, channels=('TP9', 'AF7', 'AF8', 'TP10'), baseline=None,
+                  chunk=2048, metrics=(), sample_rate=256, quality_weighting=True):
+    """Meditation scoring for every window of a whole recording.
+
+    eeg is a (channels, samples) array; window k covers samples
+    [k * hop, k * hop + window). All windows are scored in one vectorized
+    pass over strided views (chunk windows at a time to bound memory).
+    The live analyzer scores its buffer through this same function, so
+    offline and real-time results are identical for the same samples.
+    baseline is a calibration baseline dict (uncalibrated if None).
+    metrics names additional registered metrics to evaluate alongside.
+    quality_weighting down-weights AF7 or AF8 in windows where its signal
+    quality index (signal_quality.py) is below QUALITY_GOOD.
+
+    Returns a dict of arrays: end (index of each window's last sample) plus
+    every entry of WINDOW_COLUMNS and of metrics.
+    """
+    eeg = np.asarray(eeg, dtype=np.float64)
+    n_windows = max(0, (eeg.shape[1] - window) // hop + 1)
+    views = np.lib.stride_tricks.sliding_window_view(eeg, window, axis=1)[:, ::hop]
+    names = INDICATORS + tuple(metrics)
+    columns = WINDOW_COLUMNS + tuple(metrics)
+
+    result = {column: np.empty(n_windows) for column in columns}
+    result['state'] = np.empty(n_windows, dtype=np.int64)
+    for start in range(0, n_windows, chunk):
+        values = evaluate(names, views[:, start:start + chunk], channels, sample_rate,
+                          quality_weighting)
+        values.update(combine_indicators(values, baseline))
+        for column in columns:
+            result[column][start:start + chunk] = values[column]
+    result['end'] = np.arange(n_windows) * hop + window - 1
+    return result
+
+
+class MeditationAnalyzer:
+    """Real-time meditation analysis from EEG data"""
+    def __init__(self, sample_rate=256, metrics=(), channels=MUSE_CHANNELS):
+        self.sample_rate = sample_rate
+        # Extra registered metrics reported in last_result next to the score
+        self.metrics = tuple(metrics)
+        # Count AF7/AF8 by their signal quality when one of them is poor
+        self.quality_weighting = True
+        self.buffer_size = 3 * sample_rate  # 3 seconds of data
+        self.ring_capacity = 2 * self.buffer_size
+        self.set_channels(channels)
+        self.last_result = None  # WINDOW_COLUMNS (and metrics) of the latest score
+        # LSL timestamp of the last sample of the latest scored window; with
+        # motion gating that can be older than last_timestamp
+        self.last_score_timestamp = None
+        
+        # Calibration data
+        self.is_calibrated = False
+        self.calibration_baseline = {
+            'avg_rms': 50.0,     # Default baseline RMS
+            'smoothness': 0.01,   # Default smoothness baseline
+            'sync': 0.3          # Default synchronization baseline
+        }
+        # Running moments of the calibration signal (constant memory)
+        self.calibration_stats = CalibrationStats()
+        # Optional slow drift tracking of the calibrated baseline
+        self.adaptive_baseline = None
+        
+        # Optional motion_gate.MotionEstimator; windows overlapping head
+        # movement are not scored
+        self.motion = None
+        self.motion_paused = False  # ACC data stale: scoring ungated until it resumes
+        self.gated_windows = 0
+        self.last_score = 0.0
+        
+        # Optional heart_rate.HeartRateEngine; its latest values join last_result
+        self.heart = None
+        # Share of the score taken from heart_rate.heart_score (0 = EEG only,
+        # the default, so scores match EEG-only baselines and offline replays)
+        self.heart_weight = 0.0
+        self.heart_baseline = None  # heart summary at the end of calibration
+        
+    def set_channels(self, channels):
+        """Use a stream's channel map (labels in sample order); clears the buffer.
+        
+        Channels are rows of one 2-D ring and are only looked up by label,
+        so any layout that includes AF7 and AF8 can be scored.
+        """
+        self.channels = list(channels)
+        self.af7 = self.channels.index('AF7')
+        self.af8 = self.channels.index('AF8')
+        
+        # Single-producer/single-consumer ring: the ingest thread writes
+        # columns and then advances write_index; the scorer copies a snapshot
+        # and checks it wasn't overwritten meanwhile. Neither side ever waits.
+        # Twice the analysis window gives the producer room while we copy.
+        self.eeg_ring = np.zeros((len(self.channels), self.ring_capacity))
+        self.time_ring = np.full(self.ring_capacity, np.nan)  # LSL timestamps
+        self.write_index = 0  # Total samples written; published last
+        self.snapshot_end = 0  # write_index the last snapshot ends at (consumer side)
+        
+        # Theta/alpha coherence of AF7/AF8 and TP9/TP10, fed one segment at a time
+        self.coherence = CoherenceTracker(self.channels, self.sample_rate)
+        
+    def start_calibration(self):
+        """Start calibration data collection"""
+        self.calibration_stats = CalibrationStats()
+        self.is_calibrated = False
+        
+    def add_calibration_sample(self, sample):
+        """Add sample during calibration; O(1)"""
+        self.calibration_stats.add(sample[self.af7], sample[self.af8])
+        
+    def add_calibration_block(self, samples):
+        """Add an (n, channels) block during calibration"""
+        samples = np.asarray(samples, dtype=np.float64)
+        self.calibration_stats.add_block(samples[:, self.af7], samples[:, self.af8])
+                
+    def finish_calibration(self):
+        """Complete calibration and set baseline values"""
+        if self.calibration_stats.n_samples < 256:  # Need at least 1 second
+            return False, "Not enough calibration data"
+            
+        try:
+            baseline = self.calibration_stats.baseline()
+            if baseline['sync'] is None:
+                baseline['sync'] = self.calibration_baseline['sync']
+            self.set_baseline(baseline)
+            if self.heart is not None:
+                heart = self.heart.summary()
+                if not np.isnan(heart_score(heart)):
+                    self.heart_baseline = heart
+            return True, f"Calibration complete! Baseline RMS: {self.calibration_baseline['avg_rms']:.1f}µV"
+            
+        except Exception as e:
+            return False, f"Calibration failed: {e}"
+            
+    def set_baseline(self, baseline):
+        """Use a finished or previously saved baseline"""
+        self.calibration_baseline = {
+            'avg_rms': float(baseline['avg_rms']),
+            'smoothness': float(baseline['smoothness']),
+            'sync': float(baseline['sync']),
+        }
+        self.is_calibrated = True
+        if self.adaptive_baseline is not None:
+            self.adaptive_baseline.reset(self.calibration_baseline)
+            
+    def enable_adaptive_baseline(self, half_life=600.0):
+        """Let the calibrated baseline follow slow drift (half_life in seconds)"""
+        self.adaptive_baseline = AdaptiveBaseline(self.calibration_baseline, half_life)
+        
+    def add_sample(self, sample, timestamp=None):
+        """Add EEG sample for analysis (producer side, lock-free)"""
+        n = min(len(sample), len(self.channels))
+        slot = self.write_index % self.ring_capacity
+        self.eeg_ring[:n, slot] = sample[:n]
+        self.time_ring[slot] = np.nan if timestamp is None else timestamp
+        self.write_index += 1  # Publish only after the column is written
+        
+    def add_samples(self, samples, timestamps):
+        """Add an (n, channels) block with its timestamps in whole-array writes"""
+        samples = np.asarray(samples, dtype=np.float64)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        n_channels = min(samples.shape[1], len(self.channels))
+        # Publish at most buffer_size columns at a time: the reader's window
+        # must never overlap slots the writer is filling but hasn't published
+        for start in range(0, len(samples), self.buffer_size):
+            block = samples[start:start + self.buffer_size]
+            slots = (self.write_index + np.arange(len(block))) % self.ring_capacity
+            self.eeg_ring[:n_channels, slots] = block[:, :n_channels].T
+            self.time_ring[slots] = timestamps[start:start + self.buffer_size]
+            self.write_index += len(block)
+        
+    @property
+    def last_timestamp(self):
+        """LSL timestamp of the newest sample (None if unknown)"""
+        if self.write_index == 0:
+            return None
+        timestamp = self.time_ring[(self.write_index - 1) % self.ring_capacity]
+        return None if np.isnan(timestamp) else float(timestamp)
+        
+    def snapshot(self, n_samples, end_time=None):
+        """Copy the newest n_samples of every channel (consumer side).
+        
+        With end_time, the window ends at the newest sample stamped at or
+        before it (looking back at most buffer_size samples). Retries if the
+        producer lapped the copied region while copying, so the result is
+        always a consistent window. Returns (channels, n) array.
+        """
+        while True:
+            end = self.write_index
+            if end_time is not None:
+                recent = self.time_ring[(end - 1 - np.arange(min(end, self.buffer_size))) % self.ring_capacity]
+                covered = recent <= end_time
+                end -= int(np.argmax(covered)) if covered.any() else len(recent)
+            n = min(n_samples, end, self.buffer_size)
+            start = end - n
+            begin = start % self.ring_capacity
+            if begin + n <= self.ring_capacity:
+                window = self.eeg_ring[:, begin:begin + n].copy()
+            else:
+                window = np.concatenate((self.eeg_ring[:, begin:],
+                                         self.eeg_ring[:, :begin + n - self.ring_capacity]), axis=1)
+            # Slots [start, end) are intact unless the writer wrapped onto them
+            if self.write_index - start <= self.ring_capacity:
+                self.snapshot_end = end
+                return window
+                
+    def calculate_meditation_score(self):
+        """Calculate meditation score from EEG data using research-based approach"""
+        # With motion gating, score the newest window the ACC data already
+        # covers. Without ACC data (none yet, or stale beyond MAX_ACC_LAG)
+        # scoring goes on ungated, flagged by motion_paused
+        newest = self.last_timestamp
+        gating = self.motion is not None and newest is not None and self.motion.last_time is not None
+        self.motion_paused = gating and newest - self.motion.last_time > MAX_ACC_LAG
+        gating = gating and not self.motion_paused
+            
+        window = self.snapshot(self.buffer_size, self.motion.last_time if gating else None)  # Last 3 seconds
+        if window.shape[1] < 256:  # Need at least 1 second
+            return 0.0, COLLECTING_LABEL
+            
+        # Skip windows that overlap head movement (ACC on the same LSL timeline)
+        if gating:
+            end = self.time_ring[(self.snapshot_end - 1) % self.ring_capacity]
+            if self.motion.motion_between(end - window.shape[1] / self.sample_rate, end):
+                self.gated_windows += 1
+                return self.last_score, MOTION_LABEL
+            
+        # Score the whole buffer as one window of the vectorized offline path
+        baseline = self.calibration_baseline if self.is_calibrated else None
+        result = score_windows(window, window.shape[1], 1, self.channels, baseline,
+                               metrics=self.metrics, sample_rate=self.sample_rate,
+                               quality_weighting=self.quality_weighting)
+        self.last_result = {column: result[column][0] for column in WINDOW_COLUMNS + self.metrics}
+        self.last_result.update(self.heart.summary() if self.heart is not None
+                                else dict.fromkeys(HEART_COLUMNS, np.nan))
+        if self.heart_weight:
+            # Blend in how relaxed the heart looks, while heart rate and HRV are known
+            cardiac = heart_score(self.last_result, self.heart_baseline)
+            if not np.isnan(cardiac):
+                score = (1.0 - self.heart_weight) * self.last_result['score'] + self.heart_weight * cardiac
+                self.last_result['score'] = score
+                self.last_result['state'] = int(state_code(score))
+        self.coherence.update(window, self.snapshot_end)
+        self.last_result.update(self.coherence.values())
+        end = self.time_ring[(self.snapshot_end - 1) % self.ring_capacity]
+        self.last_score_timestamp = None if np.isnan(end) else float(end)
+        
+        # The next window is scored against the drift-adjusted baseline
+        if self.adaptive_baseline is not None and self.is_calibrated:
+            self.calibration_baseline = dict(self.adaptive_baseline.update(self.last_result,
+                                                                           self.last_score_timestamp))
+        
+        meditation_score = float(self.last_result['score'])
+        state = state_label(self.last_result['state'], self.is_calibrated)
+        self.last_score = meditation_score
+            
+        return meditation_score, state
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Window Metrics
+Registry of per-window EEG metrics and the intermediates they share.
+
+A metric declares the channels it reads and the intermediates it needs
+(squared signal, first difference, spectrum, signal quality, ...).
+evaluate() stacks only the channels the requested metrics use into one
+(channels, windows, samples) array and computes every intermediate once,
+over all of those channels in a single NumPy call, however many metrics
+read it. Adding a metric is one decorated function:
+
+    @metric('beta_power', channels=('AF7', 'AF8'), needs=('spectrum',))
+    def beta_power(data):
+        return data.band_power('AF7', (13, 30)) + data.band_power('AF8', (13, 30))
+
+The four meditation indicators (rms, smoothness, sync, stability) are
+registered here too and are what window_indicators() evaluates.
+"""
+
+import numpy as np
+
+from signal_quality import quality_index, QUALITY_GOOD
+
+
+INTERMEDIATES = {}  # name -> function(WindowData) -> (channels, windows, ...) array
+METRICS = {}        # name -> Metric
+
+BANDS = {
+    'theta': (4.0, 8.0),
+    'alpha': (8.0, 13.0),
+    'beta': (13.0, 30.0),
+}
+
+
+class Metric:
+    def __init__(self, name, function, channels, needs):
+        self.name = name
+        self.function = function
+        self.channels = tuple(channels)
+        self.needs = tuple(needs)
+
+
+def intermediate(name):
+    """Register a function computing an intermediate for every channel at once"""
+    def register(function):
+        INTERMEDIATES[name] = function
+        return function
+    return register
+
+
+def metric(name, channels=('AF7', 'AF8'), needs=()):
+    """Register a metric: function(WindowData) -> (windows,) array"""
+    def register(function):
+        unknown = [need for need in needs if need not in INTERMEDIATES]
+        if unknown:
+            raise KeyError(f"Metric '{name}' needs unknown intermediates {unknown}")
+        METRICS[name] = Metric(name, function, channels, needs)
+        return function
+    return register
+
+
+class WindowData:
+    """Windows of several channels plus the intermediates computed from them"""
+
+    def __init__(self, signal, channels, sample_rate=256, weighted=False):
+        self.signal = signal  # (channels, windows, samples)
+        self.channels = list(channels)
+        self.sample_rate = sample_rate
+        # Down-weight channels with poor signal quality in pair_mean
+        self.weighted = weighted
+        self.cache = {}
+
+    @property
+    def n_samples(self):
+        return self.signal.shape[-1]
+
+    def intermediate(self, name):
+        """An intermediate for all channels, computed on first use"""
+        if name not in self.cache:
+            self.cache[name] = INTERMEDIATES[name](self)
+        return self.cache[name]
+
+    def get(self, name, channel):
+        """(windows, ...) intermediate of one channel ('signal' for the raw windows)"""
+        values = self.signal if name == 'signal' else self.intermediate(name)
+        return values[self.channels.index(channel)]
+
+    def band_power(self, channel, band):
+        """Mean PSD (µV²/Hz) of one channel inside band, per window"""
+        mask = (self.frequencies >= band[0]) & (self.frequencies <= band[1])
+        if not mask.any():
+            return np.zeros(self.signal.shape[1])
+        # cumsum adds strictly in order (sum() switches to pairwise summation
+        # for a single row), so one window evaluates exactly like a batch
+        return np.cumsum(self.get('spectrum', channel)[:, mask], axis=1)[:, -1] / mask.sum()
+
+    @property
+    def frequencies(self):
+        return np.fft.rfftfreq(self.n_samples, 1.0 / self.sample_rate)
+
+    def pair_mean(self, af7, af8):
+        """Mean of an AF7 and an AF8 value per window; when weighted, channels
+        below QUALITY_GOOD count in proportion to their quality index"""
+        if not self.weighted:
+            return (af7 + af8) / 2
+        quality = self.intermediate('quality')
+        w7, w8 = (np.where(quality[self.channels.index(channel)] >= QUALITY_GOOD, 1.0,
+                           np.maximum(quality[self.channels.index(channel)], 1e-3))
+                  for channel in ('AF7', 'AF8'))
+        # Both good: exactly the unweighted mean
+        return np.where((w7 == 1.0) & (w8 == 1.0), (af7 + af8) / 2, (w7 * af7 + w8 * af8) / (w7 + w8))
+
+
+@intermediate('squared')
+def squared(data):
+    return data.signal ** 2
+
+
+@intermediate('diff')
+def first_difference(data):
+    return np.diff(data.signal, axis=-1)
+
+
+@intermediate('fft')
+def fourier(data):
+    # Mean removed so the DC bin doesn't leak into the low bands
+    return np.fft.rfft(data.signal - data.signal.mean(axis=-1, keepdims=True), axis=-1)
+
+
+@intermediate('spectrum')
+def spectrum(data):
+    """One-sided PSD in µV²/Hz, same scaling as session_archive.band_power"""
+    return (2.0 / (data.sample_rate * data.n_samples)) * np.abs(data.intermediate('fft')) ** 2
+
+
+@intermediate('quality')
+def quality(data):
+    """Signal quality index (signal_quality.py) from the shared diff and spectrum"""
+    return quality_index(data.signal, data.intermediate('diff'), data.intermediate('spectrum'),
+                         data.frequencies)
+
+
+def evaluate(names, signal, channels, sample_rate=256, weighted=False):
+    """Evaluate metrics over (channels, windows, samples) windows.
+
+    Only the channels the metrics read are used, and each intermediate is
+    computed once for all of them. weighted down-weights channels of poor
+    quality where metrics average AF7 and AF8. Returns {name: (windows,) array}
+    ({} for no names); raises ValueError if a metric's channels are missing.
+    """
+    metrics = [METRICS[name] for name in names]
+    if not metrics:
+        return {}
+    for m in metrics:
+        missing = [channel for channel in m.channels if channel not in channels]
+        if missing:
+            raise ValueError(f"Metric '{m.name}' needs channels {missing}, not in {list(channels)}")
+    used = [channel for channel in channels if any(channel in m.channels for m in metrics)]
+    rows = [list(channels).index(channel) for channel in used]
+    if rows == list(range(rows[0], rows[-1] + 1)):
+        signal = signal[rows[0]:rows[-1] + 1]  # A view, no copy of the windows
+    else:
+        signal = signal[rows]
+    data = WindowData(signal, used, sample_rate, weighted)
+    return {m.name: m.function(data) for m in metrics}
+
+
+# Meditation indicators (see window_indicators)
+
+@metric('rms', needs=('squared',))
+def rms(data):
+    """Signal strength; high amplitude = more mental activity"""
+    return data.pair_mean(np.sqrt(np.mean(data.get('squared', 'AF7'), axis=1)),
+                          np.sqrt(np.mean(data.get('squared', 'AF8'), axis=1)))
+
+
+@metric('smoothness', needs=('diff',))
+def smoothness(data):
+    """Inverse variance of the derivative; jagged = active, smooth = relaxed"""
+    return data.pair_mean(1.0 / (1.0 + np.var(data.get('diff', 'AF7'), axis=1)),
+                          1.0 / (1.0 + np.var(data.get('diff', 'AF8'), axis=1)))
+
+
+@metric('sync')
+def sync(data):
+    """Correlation between hemispheres; higher = more synchronized"""
+    af7 = data.get('signal', 'AF7')
+    af8 = data.get('signal', 'AF8')
+    if data.n_samples <= 100:
+        return np.zeros(len(af7))
+    a = af7 - af7.mean(axis=1, keepdims=True)
+    b = af8 - af8.mean(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlation = np.sum(a * b, axis=1) / np.sqrt(np.sum(a * a, axis=1) * np.sum(b * b, axis=1))
+    return np.abs(np.nan_to_num(correlation, nan=0.0))
+
+
+@metric('stability', channels=('AF7',), needs=('squared',))
+def stability(data):
+    """RMS of 0.5s sub-windows every 0.25s should stay consistent; NaN when
+    the window is too short to tell"""
+    squares = data.get('squared', 'AF7')
+    n_windows, window = squares.shape
+    starts = np.arange(0, window - 128, 64)
+    if len(starts) <= 2:
+        return np.full(n_windows, np.nan)
+    # 2-D row reductions keep the summation order independent of the
+    # number of windows, so one window scores exactly like a batch
+    sub = squares[:, starts[:, None] + np.arange(128)].reshape(-1, 128)
+    sub_rms = np.sqrt(np.mean(sub, axis=1)).reshape(n_windows, len(starts))
+    return 1.0 / (1.0 + np.var(sub_rms, axis=1))
+
+
+# Additional metrics (not part of the meditation score)
+
+@metric('focus_index', needs=('spectrum',))
+def focus_index(data):
+    """Frontal beta / (theta + alpha) engagement ratio"""
+    ratios = []
+    for channel in ('AF7', 'AF8'):
+        slow = data.band_power(channel, BANDS['theta']) + data.band_power(channel, BANDS['alpha'])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratios.append(data.band_power(channel, BANDS['beta']) / slow)
+    return (ratios[0] + ratios[1]) / 2
+
+
+@metric('alpha_asymmetry', needs=('spectrum',))
+def alpha_asymmetry(data):
+    """ln(alpha AF8) - ln(alpha AF7); positive = relatively more right alpha"""
+    return (np.log(data.band_power('AF8', BANDS['alpha']) + 1e-12) -
+            np.log(data.band_power('AF7', BANDS['alpha']) + 1e-12))
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Motion Gate
+Flags head movement from the Muse accelerometer (ACC) stream so windows
+containing it are not scored.
+
+Per ACC sample, in O(1):
+- gravity is tracked per axis with a slow exponential average and
+  subtracted, leaving the movement component
+- motion energy is a fast exponential average of its squared magnitude
+- while sqrt(energy) exceeds the threshold (in g) the head is moving;
+  each such episode is kept as a (start, end) span of LSL timestamps
+
+The ACC inlet (stream_profiler.open_inlet) uses clock synchronization like
+the EEG inlet, so both share the local LSL timeline and MeditationAnalyzer
+can ask whether an EEG window overlapped any motion. ACC arrives in its own
+packets, usually a little behind the EEG, so the analyzer scores the newest
+window the ACC data already covers (last_time). If the ACC stream lags more
+than MAX_ACC_LAG it is treated as lost: scoring continues ungated and the
+analyzer flags gating as paused until ACC data catches up.
+"""
+
+import math
+from collections import deque
+
+
+ACC_RATE = 52.0          # Muse 2 accelerometer rate (Hz)
+MOTION_THRESHOLD = 0.03  # g, RMS of the movement component
+GRAVITY_SECONDS = 1.0
+ENERGY_SECONDS = 0.25
+MAX_ACC_LAG = 1.0        # s the ACC stream may trail the EEG before gating pauses
+
+
+class MotionEstimator:
+    """Streaming motion energy and motion spans on the LSL timeline"""
+
+    def __init__(self, threshold=MOTION_THRESHOLD, sample_rate=ACC_RATE, max_spans=256):
+        self.threshold_energy = threshold ** 2
+        self.gravity_alpha = 1.0 - math.exp(-1.0 / (GRAVITY_SECONDS * sample_rate))
+        self.energy_alpha = 1.0 - math.exp(-1.0 / (ENERGY_SECONDS * sample_rate))
+        self.gravity = None
+        self.energy = 0.0
+        self.spans = deque(maxlen=max_spans)  # (start, end) of finished motion episodes
+        self.moving_since = None              # start of the ongoing episode
+        self.last_time = None
+
+    def add(self, sample, timestamp):
+        """Fold in one (x, y, z) sample in g; O(1)"""
+        x, y, z = sample[0], sample[1], sample[2]
+        if self.gravity is None:
+            self.gravity = [x, y, z]
+        g = self.gravity
+        a = self.gravity_alpha
+        g[0] += a * (x - g[0])
+        g[1] += a * (y - g[1])
+        g[2] += a * (z - g[2])
+        movement = (x - g[0]) ** 2 + (y - g[1]) ** 2 + (z - g[2]) ** 2
+        self.energy += self.energy_alpha * (movement - self.energy)
+
+        if self.energy > self.threshold_energy:
+            if self.moving_since is None:
+                self.moving_since = timestamp
+        elif self.moving_since is not None:
+            self.spans.append((self.moving_since, timestamp))
+            self.moving_since = None
+        self.last_time = timestamp
+
+    def add_chunk(self, samples, timestamps):
+        for sample, timestamp in zip(samples, timestamps):
+            self.add(sample, timestamp)
+
+    @property
+    def motion(self):
+        """Current motion level (RMS g of the movement component)"""
+        return math.sqrt(self.energy)
+
+    def motion_between(self, t0, t1):
+        """True if any motion overlapped the LSL time span [t0, t1]"""
+        since = self.moving_since
+        if since is not None and since <= t1:
+            return True
+        for start, end in reversed(list(self.spans)):
+            if end < t0:
+                break
+            if start <= t1:
+                return True
+        return False
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Multi-headset Meditation Engine
+Scores any number of concurrent Muse streams in one vectorized pass.
+
+Devices are told apart by their LSL source_id ('Muse<address>'). Their
+recent EEG lives in one stacked (devices x channels x samples) ring, so
+each scoring tick gathers every device's window at once and runs the same
+indicator metrics (with the same contact-quality weighting) and
+combine_indicators as MeditationAnalyzer on a (devices, samples) array
+instead of looping over N analyzers. Once a device has a full window, its
+results are identical to a single MeditationAnalyzer fed the same samples.
+
+Group metrics (mean score, dispersion, inter-brain synchrony) are printed
+with every tick, see group_synchrony.py.
+
+Usage:
+    python multi_headset.py                  # all Muse EEG streams on the network
+    python multi_headset.py --synthetic 4    # four local synthetic headsets
+"""
+
+import argparse
+import time
+
+import numpy as np
+from pylsl import resolve_streams, StreamInlet, proc_clocksync
+
+from meditation_analyzer import MEDITATION_STATES, WINDOW_COLUMNS, INDICATORS, combine_indicators
+from metrics import evaluate
+from synthetic_stream import SyntheticMuseOutlet
+from group_synchrony import GroupSynchrony
+
+
+def device_address(source_id):
+    """'Muse00:55:DA:B0:00:01' -> '00:55:DA:B0:00:01' (None if not a Muse stream)"""
+    if not source_id.startswith('Muse'):
+        return None
+    return source_id[len('Muse'):]
+
+
+class MultiHeadsetEngine:
+    """Stacked per-device EEG rings scored together every tick"""
+
+    def __init__(self, sample_rate=256, window_seconds=3.0, channels=('TP9', 'AF7', 'AF8', 'TP10')):
+        self.sample_rate = sample_rate
+        self.window = int(window_seconds * sample_rate)
+        self.channels = list(channels)
+        self.capacity = 2 * self.window
+        # As MeditationAnalyzer: count AF7/AF8 by their signal quality when one is poor
+        self.quality_weighting = True
+
+        self.devices = []       # addresses, in device-axis order
+        self.eeg = np.zeros((0, len(self.channels), self.capacity))
+        self.times = np.zeros((0, self.capacity))
+        self.write_index = np.zeros(0, dtype=np.int64)
+
+        # Per-device calibration baselines (NaN = uncalibrated)
+        self.baseline = {key: np.zeros(0) for key in ('avg_rms', 'smoothness', 'sync')}
+
+    def device_index(self, address):
+        """Index of a device on the stacked axis, adding it if new"""
+        if address in self.devices:
+            return self.devices.index(address)
+        self.devices.append(address)
+        self.eeg = np.concatenate((self.eeg, np.zeros((1,) + self.eeg.shape[1:])))
+        self.times = np.concatenate((self.times, np.full((1, self.capacity), np.nan)))
+        self.write_index = np.append(self.write_index, 0)
+        for key in self.baseline:
+            self.baseline[key] = np.append(self.baseline[key], np.nan)
+        return len(self.devices) - 1
+
+    def set_baseline(self, address, baseline):
+        """Calibrate one device with a MeditationAnalyzer-style baseline dict"""
+        index = self.device_index(address)
+        for key in self.baseline:
+            self.baseline[key][index] = baseline[key]
+
+    def add_samples(self, address, samples, timestamps):
+        """Append an (n, channels) chunk for one device"""
+        index = self.device_index(address)
+        samples = np.asarray(samples, dtype=np.float64)[-self.capacity:, :len(self.channels)]
+        timestamps = np.asarray(timestamps, dtype=np.float64)[-self.capacity:]
+        slots = (self.write_index[index] + np.arange(len(samples))) % self.capacity
+        # Advanced indices split by a slice: the indexed shape is (n, channels)
+        self.eeg[index, :samples.shape[1], slots] = samples
+        self.times[index, slots] = timestamps
+        self.write_index[index] += len(samples)
+
+    def score(self):
+        """Score every device's latest window in one vectorized pass.
+
+        Returns a dict of (devices,) arrays: timestamp (last sample of the
+        window) plus WINDOW_COLUMNS. Devices without a full window yet get
+        NaN (state -1).
+        """
+        n_devices = len(self.devices)
+        ready = self.write_index >= self.window
+        result = {column: np.full(n_devices, np.nan) for column in WINDOW_COLUMNS}
+        result['state'] = np.full(n_devices, -1)
+        result['timestamp'] = np.full(n_devices, np.nan)
+        if not ready.any():
+            return result
+
+        devices = np.flatnonzero(ready)
+        # (devices, window) ring slots of each device's newest window
+        slots = (self.write_index[devices, None] - self.window + np.arange(self.window)) % self.capacity
+        rows = devices[:, None]
+        af7 = self.eeg[rows, self.channels.index('AF7'), slots]
+        af8 = self.eeg[rows, self.channels.index('AF8'), slots]
+
+        indicators = evaluate(INDICATORS, np.stack((af7, af8)), ('AF7', 'AF8'), self.sample_rate,
+                              self.quality_weighting)
+        combined = combine_indicators(indicators)
+        calibrated = ~np.isnan(self.baseline['avg_rms'][devices])
+        if calibrated.any():
+            personal = combine_indicators(indicators, {key: values[devices]
+                                                       for key, values in self.baseline.items()})
+            for key in combined:
+                combined[key] = np.where(calibrated, personal[key], combined[key])
+        indicators.update(combined)
+
+        for column in WINDOW_COLUMNS:
+            result[column][devices] = indicators[column]
+        result['timestamp'][devices] = self.times[devices, slots[:, -1]]
+        return result
+
+
+class MultiHeadsetReceiver:
+    """One clock-synchronized inlet per Muse EEG stream feeding the engine"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.inlets = {}  # address -> inlet
+
+    def connect(self, wait_time=5.0):
+        """Open inlets for every Muse EEG stream not connected yet"""
+        for stream in resolve_streams(wait_time=wait_time):
+            address = device_address(stream.source_id())
+            if stream.type() != 'EEG' or address is None or address in self.inlets:
+                continue
+            self.inlets[address] = StreamInlet(stream, processing_flags=proc_clocksync)
+            self.engine.device_index(address)
+        return list(self.inlets)
+
+    def poll(self):
+        """Pull whatever every inlet has buffered (never blocks)"""
+        pulled = 0
+        for address, inlet in self.inlets.items():
+            chunk, timestamps = inlet.pull_chunk(timeout=0.0)
+            if timestamps:
+                self.engine.add_samples(address, chunk, timestamps)
+                pulled += len(timestamps)
+        return pulled
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score several Muse headsets at once")
+    parser.add_argument('--synthetic', type=int, default=0, help="start N synthetic headsets")
+    parser.add_argument('--interval', type=float, default=1.0, help="seconds between scores")
+    args = parser.parse_args()
+
+    outlets = [SyntheticMuseOutlet(address=f"00:00:00:00:00:{i:02X}", seed=i).start()
+               for i in range(args.synthetic)]
+    engine = MultiHeadsetEngine()
+    receiver = MultiHeadsetReceiver(engine)
+    group = GroupSynchrony(engine)
+    try:
+        devices = receiver.connect()
+        if not devices:
+            print("ERROR No Muse EEG streams found")
+            return
+        print(f"Scoring {len(devices)} headsets: {', '.join(devices)}")
+        next_score = time.time() + args.interval
+        while True:
+            receiver.poll()
+            if time.time() >= next_score:
+                next_score += args.interval
+                result = engine.score()
+                for i, address in enumerate(engine.devices):
+                    state = result['state'][i]
+                    label = MEDITATION_STATES[state] if state >= 0 else "Collecting data..."
+                    print(f"{address}  {result['score'][i]:5.1f}  {label}")
+                metrics = group.update(result)
+                print(f"GROUP {metrics['devices']} ready, mean {metrics['mean_score']:.1f} "
+                      f"± {metrics['score_std']:.1f}, synchrony {metrics['synchrony']:.2f}\n")
+            time.sleep(0.01)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for outlet in outlets:
+            outlet.stop()
+
+
+if __name__ == "__main__":
+    main()
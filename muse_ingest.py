@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Headless Muse Ingest Process
+Pulls EEG from LSL, runs the meditation analysis and publishes both the raw
+samples and the scores into shared-memory ring buffers.
+
+The GUI (or any number of viewers) attaches with:
+    python working_muse_gui.py --attach <name>
+
+Because ingestion runs in its own process, a frozen or crashed GUI can never
+cause dropped samples or lose the session. With --session-dir the raw EEG and
+the scores are also recorded to an indexed session archive.
+"""
+
+import argparse
+import getpass
+import signal
+import sys
+import time
+
+import numpy as np
+from pylsl import resolve_streams, StreamInlet, proc_clocksync
+
+from meditation_analyzer import MeditationAnalyzer, UNSCORED_LABELS, state_code_from_score
+from motion_gate import MotionEstimator, MOTION_THRESHOLD
+from heart_rate import HeartRateEngine
+from session_archive import SessionWriter, CODECS
+from session_export import export_session, PARQUET_AVAILABLE
+from score_outlet import ScoreOutlet
+from score_server import ScoreServer, ENCODINGS
+from calibration import BaselineStore
+from multi_headset import device_address
+from shared_ring_buffer import SharedRingBuffer
+from stream_profiler import channel_map, open_inlet
+from stream_timeline import TimelineMonitor, format_report
+
+
+DEFAULT_NAME = "muse_meditation"
+SAMPLE_CAPACITY = 1 << 16    # ~4 minutes at 256Hz
+SCORE_CAPACITY = 1 << 14     # ~9 hours at 2s per score
+SCORE_WIDTH = 4              # timestamp, score, state code, calibrated flag
+
+# Control words written by viewers into the score buffer
+CONTROL_START_CALIBRATION = 1
+CONTROL_FINISH_CALIBRATION = 2
+
+# Calibration status words published in the score buffer
+CALIBRATION_IDLE = 0
+CALIBRATION_RUNNING = 1
+CALIBRATION_DONE = 2
+CALIBRATION_FAILED = 3
+
+
+def sample_buffer_name(name):
+    return f"{name}_eeg"
+
+
+def score_buffer_name(name):
+    return f"{name}_scores"
+
+
+class MuseIngest:
+    """Owns the LSL inlet, the analyzer and the shared ring buffers"""
+
+    def __init__(self, name=DEFAULT_NAME, score_interval=2.0, session_dir=None, codec='float32',
+                 lsl_outlet=False, serve_port=None, serve_encoding='json', user=None,
+                 adaptive_baseline=None, motion_threshold=MOTION_THRESHOLD, heart_weight=0.0):
+        self.name = name
+        self.score_interval = score_interval
+        self.session_dir = session_dir
+        self.codec = codec
+        self.lsl_outlet = lsl_outlet
+        self.score_outlet = None
+        self.serve_port = serve_port
+        self.serve_encoding = serve_encoding
+        self.score_server = None
+        self.user = user or getpass.getuser()
+        self.baseline_store = BaselineStore()
+        self.address = None
+        self.session = None
+        self.analyzer = MeditationAnalyzer()
+        if adaptive_baseline:
+            self.analyzer.enable_adaptive_baseline(adaptive_baseline * 60.0)
+        self.motion_threshold = motion_threshold
+        self.analyzer.heart_weight = heart_weight
+        self.acc_inlet = None
+        self.ppg_inlet = None
+        self.sample_buffer = None
+        self.score_buffer = None
+        self.running = False
+        self.is_calibrating = False
+
+    def connect(self, wait_time=15.0):
+        """Resolve the EEG stream and create the ring buffers"""
+        print("Looking for LSL EEG stream...")
+        streams = resolve_streams(wait_time=wait_time)
+        eeg_streams = [s for s in streams if s.type() == 'EEG']
+        if not eeg_streams:
+            raise RuntimeError("No LSL EEG stream found")
+
+        self.inlet = StreamInlet(eeg_streams[0], processing_flags=proc_clocksync)
+        self.timeline = TimelineMonitor(eeg_streams[0].nominal_srate() or 256.0)
+        self.address = device_address(eeg_streams[0].source_id())
+        channels = eeg_streams[0].channel_count()
+        labels = channel_map(eeg_streams[0])
+        self.analyzer.set_channels(labels)
+        print(f"Connected to: {eeg_streams[0].name()} ({', '.join(labels)})")
+
+        # Row layout: LSL timestamp followed by every channel of the stream,
+        # labelled with the resolved channel map and rate for viewers
+        self.sample_buffer = SharedRingBuffer.create(
+            sample_buffer_name(self.name), SAMPLE_CAPACITY, 1 + channels, ['timestamp'] + labels,
+            eeg_streams[0].nominal_srate() or 256.0)
+        self.score_buffer = SharedRingBuffer.create(
+            score_buffer_name(self.name), SCORE_CAPACITY, SCORE_WIDTH)
+
+        if self.motion_threshold:
+            self.acc_inlet = open_inlet('ACC', eeg_streams[0].source_id())
+            if self.acc_inlet is not None:
+                self.analyzer.motion = MotionEstimator(self.motion_threshold)
+                print(f"Motion gating on ACC above {self.motion_threshold}g")
+            else:
+                print("No ACC stream found, motion gating disabled")
+
+        self.ppg_inlet = open_inlet('PPG', eeg_streams[0].source_id())
+        if self.ppg_inlet is not None:
+            self.analyzer.heart = HeartRateEngine(self.ppg_inlet.info().nominal_srate() or 64.0)
+            print("Tracking heart rate and HRV on PPG")
+
+        baseline = self.baseline_store.get(self.address, self.user)
+        if baseline is not None:
+            self.analyzer.set_baseline(baseline)
+            self.score_buffer.set_status(CALIBRATION_DONE)
+            print(f"Loaded saved baseline for {self.user} on {self.address}")
+
+        if self.session_dir:
+            self.session = SessionWriter(self.session_dir, labels,
+                                         eeg_streams[0].nominal_srate() or 256.0,
+                                         eeg_streams[0].source_id(), codec=self.codec)
+            print(f"Recording session to {self.session_dir}")
+
+        if self.lsl_outlet:
+            self.score_outlet = ScoreOutlet(eeg_streams[0].source_id(), 1.0 / self.score_interval)
+            print("Publishing scores on LSL stream 'MuseMeditation'")
+
+        if self.serve_port is not None:
+            self.score_server = ScoreServer(port=self.serve_port, encoding=self.serve_encoding).start()
+            print(f"Serving scores on 127.0.0.1:{self.score_server.port}")
+
+    def handle_control(self):
+        """Serve calibration requests posted by viewers"""
+        control = self.score_buffer.take_control()
+        if control == CONTROL_START_CALIBRATION:
+            self.analyzer.start_calibration()
+            self.is_calibrating = True
+            self.score_buffer.set_status(CALIBRATION_RUNNING)
+            print("Calibration started")
+        elif control == CONTROL_FINISH_CALIBRATION and self.is_calibrating:
+            self.is_calibrating = False
+            success, message = self.analyzer.finish_calibration()
+            self.score_buffer.set_status(CALIBRATION_DONE if success else CALIBRATION_FAILED)
+            print(message)
+            if success:
+                self.baseline_store.put(self.address, self.user, self.analyzer.calibration_baseline,
+                                        self.analyzer.calibration_stats.n_samples)
+
+    def publish_score(self):
+        paused = self.analyzer.motion_paused
+        score, state = self.analyzer.calculate_meditation_score()
+        if self.analyzer.motion_paused != paused:
+            print("ACC data stalled, scoring without motion gating" if self.analyzer.motion_paused
+                  else "Motion gating resumed")
+        if state in UNSCORED_LABELS:
+            return
+        # Stamped with the end of the analysed EEG window
+        row = [self.analyzer.last_score_timestamp, score, state_code_from_score(score),
+               float(self.analyzer.is_calibrated)]
+        self.score_buffer.write([row])
+        if self.score_outlet is not None:
+            self.score_outlet.publish(self.analyzer.last_result, row[0], self.analyzer.is_calibrated)
+        if self.score_server is not None:
+            self.score_server.publish_result(self.analyzer.last_result, row[0], self.analyzer.is_calibrated)
+        if self.session is not None:
+            self.session.append_score(dict(self.analyzer.last_result, timestamp=row[0],
+                                           calibrated=row[3]))
+
+    def run(self):
+        """Main ingest loop; returns when stop() is called"""
+        self.running = True
+        next_score = time.time() + self.score_interval
+
+        while self.running:
+            chunk, timestamps = self.inlet.pull_chunk(timeout=0.5)
+            if timestamps:
+                data = np.asarray(chunk, dtype=np.float64)
+                stamps, report = self.timeline.add(timestamps)
+                if report:
+                    print(format_report(report))
+                self.sample_buffer.write(np.column_stack((stamps, data)))
+                if self.session is not None:
+                    self.session.append_samples(stamps, data)
+
+                self.analyzer.add_samples(data, stamps)
+                if self.is_calibrating:
+                    self.analyzer.add_calibration_block(data)
+
+            if self.acc_inlet is not None:
+                chunk, timestamps = self.acc_inlet.pull_chunk(timeout=0.0)
+                if timestamps:
+                    self.analyzer.motion.add_chunk(chunk, timestamps)
+            if self.ppg_inlet is not None:
+                chunk, timestamps = self.ppg_inlet.pull_chunk(timeout=0.0)
+                if timestamps:
+                    self.analyzer.heart.add_chunk(chunk, timestamps)
+
+            self.handle_control()
+            now = time.time()
+            if now >= next_score:
+                next_score = now + self.score_interval
+                self.publish_score()
+
+    def stop(self):
+        self.running = False
+
+    def close(self):
+        if self.score_server is not None:
+            self.score_server.stop()
+        if self.session is not None:
+            self.session.close()
+            if PARQUET_AVAILABLE:
+                path, rows = export_session(self.session_dir)
+                if path:
+                    print(f"Exported {rows} scores to {path}")
+        for buffer in (self.sample_buffer, self.score_buffer):
+            if buffer is not None:
+                buffer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Muse ingest process")
+    parser.add_argument('--name', default=DEFAULT_NAME,
+                        help="shared memory name prefix viewers attach to")
+    parser.add_argument('--score-interval', type=float, default=2.0,
+                        help="seconds between published meditation scores")
+    parser.add_argument('--user', help="whose calibration baseline to load and save (default: login name)")
+    parser.add_argument('--adaptive-baseline', type=float, metavar='MINUTES',
+                        help="let the calibrated baseline follow drift with this half-life")
+    parser.add_argument('--motion-threshold', type=float, default=MOTION_THRESHOLD,
+                        help="skip windows with head movement above this RMS acceleration in g (0 = off)")
+    parser.add_argument('--heart-weight', type=float, default=0.0,
+                        help="share (0-1) of the meditation score taken from heart rate and HRV (default off)")
+    parser.add_argument('--lsl-outlet', action='store_true',
+                        help="also publish scores, state and sub-scores as an LSL stream")
+    parser.add_argument('--serve-port', type=int,
+                        help="serve scores and features to local TCP subscribers on this port")
+    parser.add_argument('--serve-encoding', choices=ENCODINGS, default='json',
+                        help="record encoding for --serve-port subscribers")
+    parser.add_argument('--session-dir',
+                        help="record raw EEG and scores to this session folder")
+    parser.add_argument('--codec', choices=sorted(CODECS), default='float32',
+                        help="raw EEG storage codec ('delta' is quantized and compressed)")
+    args = parser.parse_args()
+
+    ingest = MuseIngest(args.name, args.score_interval, args.session_dir, args.codec,
+                        args.lsl_outlet, args.serve_port, args.serve_encoding, args.user,
+                        args.adaptive_baseline, args.motion_threshold, args.heart_weight)
+    signal.signal(signal.SIGTERM, lambda *_: ingest.stop())
+
+    try:
+        ingest.connect()
+        print(f"Publishing to shared memory '{args.name}'")
+        ingest.run()
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    finally:
+        ingest.close()
+
+
+if __name__ == "__main__":
+    main()
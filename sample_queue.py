@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Bounded Sample Queue
+Hand-off between the LSL receiver thread and the GUI thread.
+
+Instead of posting one Qt event per sample, the receiver puts samples into
+this queue and only signals the GUI when the queue goes from empty to
+non-empty. The GUI then drains everything in one go. The queue is bounded,
+so a slow GUI can never make memory or latency grow without limit; what
+happens on overflow is an explicit policy:
+
+    'block'        producer waits for space (the LSL inlet keeps buffering
+                   upstream); after block_timeout it falls back to dropping
+    'drop_oldest'  discard the oldest queued sample
+    'coalesce'     the incoming sample replaces the newest queued one
+"""
+
+import threading
+import time
+from collections import deque
+
+
+OVERFLOW_POLICIES = ('block', 'drop_oldest', 'coalesce')
+
+
+class BoundedSampleQueue:
+    """Thread-safe bounded FIFO with an explicit overflow policy"""
+
+    def __init__(self, maxsize=1024, policy='block', block_timeout=1.0):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{policy}', "
+                             f"expected one of {OVERFLOW_POLICIES}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.items = deque()
+        self.lock = threading.Lock()
+        self.not_full = threading.Condition(self.lock)
+
+        # Counters
+        self.dropped = 0
+        self.coalesced = 0
+        self.blocked_time = 0.0
+        self.high_watermark = 0
+
+    def put(self, item):
+        """Queue an item; returns True if the consumer needs to be woken up"""
+        with self.lock:
+            if len(self.items) >= self.maxsize:
+                if self.policy == 'coalesce':
+                    self.items[-1] = item
+                    self.coalesced += 1
+                    return False
+
+                if self.policy == 'block':
+                    start = time.perf_counter()
+                    self.not_full.wait_for(lambda: len(self.items) < self.maxsize,
+                                           timeout=self.block_timeout)
+                    self.blocked_time += time.perf_counter() - start
+
+                if len(self.items) >= self.maxsize:
+                    self.items.popleft()
+                    self.dropped += 1
+
+            was_empty = not self.items
+            self.items.append(item)
+            self.high_watermark = max(self.high_watermark, len(self.items))
+            return was_empty
+
+    def drain(self):
+        """Remove and return all queued items, oldest first"""
+        with self.lock:
+            items = list(self.items)
+            self.items.clear()
+            self.not_full.notify_all()
+            return items
+
+    @property
+    def backlog(self):
+        """Number of samples waiting for the consumer"""
+        return len(self.items)
+
+    def stats(self):
+        """Snapshot of the queue counters"""
+        with self.lock:
+            return {
+                'backlog': len(self.items),
+                'high_watermark': self.high_watermark,
+                'dropped': self.dropped,
+                'coalesced': self.coalesced,
+                'blocked_time': self.blocked_time,
+            }
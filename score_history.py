@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Hierarchical Score History
+Multi-resolution store for meditation scores over sessions of any length.
+
+Every score is folded into all tiers at once (1s, 10s, 1min and 10min by
+default), so each tier always holds up-to-date min, max, mean and count per
+bucket and nothing is ever recomputed from raw scores.
+
+Buckets are stored densely: row i of a tier covers
+[origin + i * period, origin + (i + 1) * period). Looking up a time range is
+therefore plain index arithmetic, and rendering any zoom level only touches
+about max_points rows of the most suitable tier.
+
+Each tier keeps its newest rows in memory. When a tier fills up, the oldest
+half is appended to <spill_dir>/tier_<period>s.bin (float64 rows of min, max,
+sum, count) and read back from there on demand; <spill_dir>/tiers.json holds
+the origin and periods. Without a spill_dir the oldest rows are simply dropped.
+"""
+
+import json
+import os
+
+import numpy as np
+
+
+TIER_PERIODS = (1, 10, 60, 600)  # seconds
+
+# Row layout
+MIN, MAX, SUM, COUNT = range(4)
+ROW_WIDTH = 4
+
+
+class ScoreTier:
+    """Dense fixed-period aggregates with in-memory window and disk spill"""
+
+    def __init__(self, period, origin, capacity=3600, spill_path=None):
+        self.period = period
+        self.origin = origin
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.rows = np.empty((capacity, ROW_WIDTH))
+        self.first = 0      # absolute bucket index of rows[0]
+        self.length = 0     # buckets in memory
+        self.spilled = 0    # buckets written to disk, always [0, spilled)
+        if spill_path is not None and os.path.exists(spill_path):
+            os.remove(spill_path)
+
+    @property
+    def end(self):
+        """Absolute index one past the newest bucket"""
+        return self.first + self.length
+
+    def bucket(self, timestamp):
+        return int((timestamp - self.origin) // self.period)
+
+    def add(self, index, score):
+        """Fold one score into bucket index"""
+        if index < self.first:
+            return  # Too old: already spilled or dropped
+        if index >= self.end:
+            self.extend_to(index + 1)
+        row = self.rows[index - self.first]
+        if row[COUNT] == 0:
+            row[:] = (score, score, score, 1)
+        else:
+            row[MIN] = min(row[MIN], score)
+            row[MAX] = max(row[MAX], score)
+            row[SUM] += score
+            row[COUNT] += 1
+
+    def extend_to(self, end):
+        """Open empty buckets up to (not including) end"""
+        if end - self.first > self.capacity:
+            self.spill(max(end - self.first - self.capacity, self.capacity // 2))
+        if end - self.first > self.capacity:
+            # A jump beyond the whole window: everything in memory is old
+            self.first = end - self.capacity
+            self.length = 0
+        start = self.length
+        self.length = end - self.first
+        self.rows[start:self.length] = (np.nan, np.nan, 0.0, 0)
+
+    def spill(self, n):
+        """Move the oldest n in-memory buckets to disk (or drop them)"""
+        n = min(n, self.length)
+        if self.spill_path is not None and n:
+            with open(self.spill_path, 'ab') as f:
+                # Keep the file dense even if buckets were dropped earlier
+                if self.first > self.spilled:
+                    empty = np.tile([np.nan, np.nan, 0.0, 0.0], (self.first - self.spilled, 1))
+                    f.write(empty.tobytes())
+                f.write(self.rows[:n].tobytes())
+            self.spilled = self.first + n
+        self.rows[:self.length - n] = self.rows[n:self.length]
+        self.first += n
+        self.length -= n
+
+    def read(self, start, stop):
+        """Rows for absolute bucket indices [start, stop), from disk and memory"""
+        start = max(start, 0)
+        stop = min(stop, self.end)
+        if stop <= start:
+            return np.empty((0, ROW_WIDTH))
+
+        parts = []
+        if start < self.first:
+            disk_stop = min(stop, self.first)
+            parts.append(self.read_spilled(start, disk_stop))
+        if stop > self.first:
+            parts.append(self.rows[max(start, self.first) - self.first:stop - self.first])
+        return np.concatenate(parts) if len(parts) > 1 else parts[0].copy()
+
+    def read_spilled(self, start, stop):
+        """Spilled rows [start, stop); missing ones come back empty"""
+        out = np.tile([np.nan, np.nan, 0.0, 0.0], (stop - start, 1))
+        available = min(stop, self.spilled)
+        if self.spill_path is not None and available > start:
+            rows = np.fromfile(self.spill_path, dtype=np.float64,
+                               count=(available - start) * ROW_WIDTH,
+                               offset=start * ROW_WIDTH * 8)
+            out[:available - start] = rows.reshape(-1, ROW_WIDTH)
+        return out
+
+    def flush(self):
+        """Spill everything in memory, e.g. at the end of a session"""
+        if self.spill_path is not None:
+            self.spill(self.length)
+
+
+class ScoreHistory:
+    """1s base scores rolled up incrementally into coarser tiers"""
+
+    def __init__(self, origin, periods=TIER_PERIODS, capacity=3600, spill_dir=None):
+        self.origin = origin
+        self.spill_dir = spill_dir
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+            # Readers need the origin to map bucket rows back to time
+            with open(os.path.join(spill_dir, 'tiers.json'), 'w') as f:
+                json.dump({'origin': origin, 'periods': list(periods)}, f)
+        self.tiers = [
+            ScoreTier(period, origin, capacity,
+                      None if spill_dir is None else os.path.join(spill_dir, f"tier_{period}s.bin"))
+            for period in periods
+        ]
+        self.latest_time = None
+
+    def add(self, timestamp, score):
+        """Record one score; O(number of tiers)"""
+        for tier in self.tiers:
+            tier.add(tier.bucket(timestamp), score)
+        self.latest_time = timestamp if self.latest_time is None else max(self.latest_time, timestamp)
+
+    def tier(self, period):
+        for tier in self.tiers:
+            if tier.period == period:
+                return tier
+        raise KeyError(f"No {period}s tier")
+
+    def choose_tier(self, span, max_points):
+        """Finest tier that covers span seconds in at most max_points buckets"""
+        for tier in self.tiers:
+            if span / tier.period <= max_points:
+                return tier
+        return self.tiers[-1]
+
+    def query(self, t0, t1, max_points=600, period=None):
+        """Aggregates covering [t0, t1] from the finest tier that fits.
+
+        Returns a dict of equally long arrays: time (bucket start), min, max,
+        mean and count, plus the tier period used. Empty buckets have count 0
+        and NaN statistics.
+        """
+        tier = self.tier(period) if period is not None else self.choose_tier(t1 - t0, max_points)
+        start, stop = tier.bucket(t0), tier.bucket(t1) + 1
+        rows = tier.read(start, stop)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = rows[:, SUM] / rows[:, COUNT]
+        return {
+            'period': tier.period,
+            'time': self.origin + (max(start, 0) + np.arange(len(rows))) * tier.period,
+            'min': rows[:, MIN],
+            'max': rows[:, MAX],
+            'mean': mean,
+            'count': rows[:, COUNT],
+        }
+
+    def recent(self, seconds, period, now=None):
+        """Aggregates of the last `seconds` on a given tier"""
+        now = self.latest_time if now is None else now
+        if now is None:
+            return None
+        return self.query(now - seconds, now, period=period)
+
+    def close(self):
+        """Flush every tier to disk (no-op without a spill_dir)"""
+        for tier in self.tiers:
+            tier.flush()
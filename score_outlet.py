@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Meditation Score LSL Outlet
+Publishes the analyzer's results as their own LSL stream, so other tools on
+the network can consume scores without opening an EEG inlet and recomputing
+everything.
+
+Stream type 'Meditation', one float32 sample per score:
+    score, state (MEDITATION_STATES index), calibrated (0/1),
+    amplitude_score, smoothness_score, sync_score, stability_score
+
+Each sample carries the LSL timestamp of the last EEG sample of the window
+it was computed from, so consumers can line scores up with the raw EEG.
+The stream's source_id is the EEG source_id plus '_meditation'.
+"""
+
+import numpy as np
+from pylsl import StreamInfo, StreamOutlet, IRREGULAR_RATE
+
+
+SCORE_OUTLET_TYPE = 'Meditation'
+SCORE_OUTLET_CHANNELS = ['score', 'state', 'calibrated', 'amplitude_score',
+                         'smoothness_score', 'sync_score', 'stability_score']
+
+
+def score_stream_info(eeg_source_id='', rate=1.0, name='MuseMeditation', window_seconds=3.0):
+    """StreamInfo of the score outlet for a given EEG source"""
+    info = StreamInfo(name, SCORE_OUTLET_TYPE, len(SCORE_OUTLET_CHANNELS),
+                      rate if rate > 0 else IRREGULAR_RATE, 'float32',
+                      f"{eeg_source_id}_meditation")
+    desc = info.desc()
+    desc.append_child_value("source_eeg", eeg_source_id)
+    desc.append_child_value("window_seconds", str(window_seconds))
+    desc.append_child_value("timestamps", "last EEG sample of the scored window")
+    channels = desc.append_child("channels")
+    for label in SCORE_OUTLET_CHANNELS:
+        channels.append_child("channel") \
+            .append_child_value("label", label) \
+            .append_child_value("type", "Meditation")
+    return info
+
+
+class ScoreOutlet:
+    """Throttled LSL outlet for analyzer results"""
+
+    def __init__(self, eeg_source_id='', rate=1.0, name='MuseMeditation'):
+        self.rate = rate
+        self.min_interval = 1.0 / rate if rate > 0 else 0.0
+        self.outlet = StreamOutlet(score_stream_info(eeg_source_id, rate, name))
+        self.last_timestamp = None
+        self.published = 0
+
+    def publish(self, result, timestamp, calibrated):
+        """Push one analyzer result (a last_result dict) stamped with timestamp.
+
+        Results closer than 1/rate seconds (on the EEG timeline) to the last
+        published one are skipped. Returns True if a sample was pushed.
+        """
+        if result is None or timestamp is None:
+            return False
+        # 10% slack so ticks arriving exactly at the rate aren't halved by jitter
+        if self.last_timestamp is not None and \
+                timestamp - self.last_timestamp < 0.9 * self.min_interval:
+            return False
+        values = dict(result, calibrated=float(calibrated))
+        sample = np.array([values[label] for label in SCORE_OUTLET_CHANNELS], dtype=np.float32)
+        self.outlet.push_sample(sample.tolist(), timestamp)
+        self.last_timestamp = timestamp
+        self.published += 1
+        return True
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Score Fan-out Server
+Serves live analyzer results to any number of local subscribers over TCP,
+so dashboards and loggers don't each open an EEG inlet and rerun the
+analysis.
+
+Every client first receives one JSON header line describing the fields,
+then one record per analyzer tick, either:
+    json    - one JSON object per line
+    binary  - fixed-size little-endian records: float64 timestamp followed
+              by float32 values, layout given by the header's record_format
+
+Each message is encoded once and fanned out through a bounded per-client
+queue. A client whose queue fills up (it stopped reading, or reads slower
+than results are produced) is disconnected instead of slowing down the
+producer or the other clients.
+
+The server runs its own asyncio loop in a background thread; publish() can
+be called from any thread.
+
+Usage:
+    python score_server.py --demo              # serve synthetic scores on localhost
+    python score_server.py --listen            # print what a server sends
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+from meditation_analyzer import WINDOW_COLUMNS
+
+
+DEFAULT_PORT = 8765
+ENCODINGS = ('json', 'binary')
+SERVER_FIELDS = ['timestamp'] + list(WINDOW_COLUMNS) + ['calibrated']
+
+
+class ScoreServer:
+    """asyncio TCP fan-out of analyzer results with slow-client eviction"""
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, encoding='json', queue_size=64,
+                 fields=SERVER_FIELDS):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding '{encoding}', expected one of {ENCODINGS}")
+        self.host = host
+        self.port = port
+        self.encoding = encoding
+        self.queue_size = queue_size
+        self.fields = list(fields)
+        self.record = struct.Struct('<d' + 'f' * (len(self.fields) - 1))
+        self.header = (json.dumps({
+            'fields': self.fields,
+            'encoding': encoding,
+            'record_format': self.record.format,
+            'record_size': self.record.size,
+        }) + "\n").encode()
+
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.clients = {}  # writer -> queue, only touched in the loop thread
+
+        # Counters
+        self.published = 0
+        self.connected = 0
+        self.evicted = 0
+
+    def start(self):
+        """Start serving in a background thread; returns once listening"""
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        self.ready.wait(timeout=5.0)
+        if self.server is None:
+            raise RuntimeError(f"Could not listen on {self.host}:{self.port}")
+        return self
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self.handle_client, self.host, self.port))
+            # Port 0 picks a free port
+            self.port = self.server.sockets[0].getsockname()[1]
+        except OSError:
+            self.ready.set()
+            return
+        self.ready.set()
+        self.loop.run_forever()
+
+        # Shut down: stop accepting, end every client handler, close the loop
+        self.server.close()
+        for writer, queue in list(self.clients.items()):
+            self.clients.pop(writer)
+            writer.transport.abort()
+            if not queue.full():
+                queue.put_nowait(b'')  # Wake the handler so it sees it was dropped
+        tasks = asyncio.all_tasks(self.loop)
+        if tasks:
+            self.loop.run_until_complete(asyncio.wait(tasks, timeout=1.0))
+        self.loop.run_until_complete(self.server.wait_closed())
+        self.loop.close()
+
+    async def handle_client(self, reader, writer):
+        queue = asyncio.Queue(self.queue_size)
+        self.clients[writer] = queue
+        self.connected += 1
+        try:
+            writer.write(self.header)
+            await writer.drain()
+            while writer in self.clients:
+                data = await queue.get()
+                if writer not in self.clients:
+                    break  # Evicted while waiting
+                writer.write(data)
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.clients.pop(writer, None)
+            writer.close()
+
+    def broadcast(self, data):
+        """Queue one encoded message for every client (loop thread)"""
+        for writer, queue in list(self.clients.items()):
+            try:
+                queue.put_nowait(data)
+            except asyncio.QueueFull:
+                # Too slow: drop the client, not the data of everyone else
+                self.clients.pop(writer, None)
+                self.evicted += 1
+                writer.transport.abort()
+
+    def encode(self, values):
+        if self.encoding == 'binary':
+            return self.record.pack(*(float(values[field]) for field in self.fields))
+        message = {field: float(values[field]) for field in self.fields}
+        return (json.dumps(message, separators=(',', ':')) + "\n").encode()
+
+    def publish(self, values):
+        """Send one result (a dict holding every field) to all clients; thread-safe"""
+        if self.loop is None or not self.loop.is_running():
+            return
+        self.loop.call_soon_threadsafe(self.broadcast, self.encode(values))
+        self.published += 1
+
+    def publish_result(self, result, timestamp, calibrated):
+        """Convenience wrapper for an analyzer last_result dict"""
+        if result is None or timestamp is None:
+            return
+        self.publish(dict(result, timestamp=timestamp, calibrated=float(calibrated)))
+
+    def stats(self):
+        return {
+            'clients': len(self.clients),
+            'connected': self.connected,
+            'evicted': self.evicted,
+            'published': self.published,
+        }
+
+    def stop(self):
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+
+
+def listen(host, port):
+    """Minimal subscriber: print the header and every record"""
+    with socket.create_connection((host, port)) as sock:
+        stream = sock.makefile('rb')
+        header = json.loads(stream.readline())
+        print(header)
+        record = struct.Struct(header['record_format'])
+        while True:
+            if header['encoding'] == 'binary':
+                data = stream.read(record.size)
+                if len(data) < record.size:
+                    break
+                print(dict(zip(header['fields'], record.unpack(data))))
+            else:
+                line = stream.readline()
+                if not line:
+                    break
+                print(json.loads(line))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fan-out server for meditation scores")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--encoding', choices=ENCODINGS, default='json')
+    parser.add_argument('--demo', action='store_true', help="serve synthetic scores")
+    parser.add_argument('--rate', type=float, default=10.0, help="demo results per second")
+    parser.add_argument('--listen', action='store_true', help="connect and print records")
+    args = parser.parse_args()
+
+    if args.listen:
+        listen(args.host, args.port)
+        return
+
+    server = ScoreServer(args.host, args.port, args.encoding).start()
+    print(f"Serving on {args.host}:{server.port} ({args.encoding})")
+    rng = np.random.default_rng()
+    try:
+        while args.demo:
+            values = {field: rng.uniform(0, 100) for field in SERVER_FIELDS}
+            values.update(timestamp=time.time(), state=rng.integers(5), calibrated=0.0)
+            server.publish(values)
+            time.sleep(1.0 / args.rate)
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        print(server.stats())
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
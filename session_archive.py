@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Session Archive
+Indexed on-disk format for recorded sessions, with time-range queries that
+only map the bytes they need.
+
+One directory per session:
+    meta.json       channels, sample rate, source, clocks, score columns
+    raw.bin         raw EEG blocks, encoded by the session's codec:
+                    'float32' (float64 timestamps then float32 samples) or
+                    'delta' (quantized and compressed, see eeg_codec.py)
+    raw_index.bin   one float64 row per block: time span, byte range,
+                    sample range and per-channel RMS / alpha band power
+    scores.bin      one float64 row per analyzer tick (see score_columns)
+    score_history/  multi-resolution score tiers (see score_history.py)
+
+Queries binary-search the block index and memory-map just the matching byte
+range of raw.bin, so pulling "minutes 12-18" of a multi-hour session or
+scanning a month of sessions for high alpha never reads whole files.
+
+Timestamps are LSL clock seconds; meta.json stores the offset to wall clock
+time so sessions can be selected by date.
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+import eeg_codec
+
+
+DEFAULT_SESSION_DIR = os.path.join(os.path.expanduser('~'), '.musemeditation', 'sessions')
+
+BLOCK_SIZE = 1024  # samples per raw block (4s at 256Hz)
+# Analyzer tick: score and state, then indicators and sub-scores
+# (meditation_analyzer.WINDOW_COLUMNS), then heart_rate.HEART_COLUMNS and
+# coherence.COHERENCE_COLUMNS
+SCORE_COLUMNS = ['timestamp', 'score', 'state', 'calibrated',
+                 'rms', 'smoothness', 'sync', 'stability',
+                 'amplitude_score', 'smoothness_score', 'sync_score', 'stability_score',
+                 'heart_rate', 'rmssd',
+                 'coherence_theta_frontal', 'coherence_alpha_frontal',
+                 'coherence_theta_temporal', 'coherence_alpha_temporal']
+
+# Raw index row layout; per-channel features follow the fixed columns
+T_START, T_END, OFFSET, NBYTES, SAMPLE_START, N_SAMPLES = range(6)
+INDEX_FIXED = 6
+BLOCK_FEATURES = ('rms', 'alpha')
+ALPHA_BAND = (8.0, 13.0)
+
+
+def band_power(block, sample_rate, band):
+    """Mean power spectral density (µV²/Hz) per channel inside band.
+
+    block is (n_samples, channels); one rfft over the sample axis.
+    """
+    n = len(block)
+    if n < 2:
+        return np.zeros(block.shape[1])
+    spectrum = np.fft.rfft(block - block.mean(axis=0), axis=0)
+    freqs = np.fft.rfftfreq(n, 1.0 / sample_rate)
+    mask = (freqs >= band[0]) & (freqs <= band[1])
+    if not mask.any():
+        return np.zeros(block.shape[1])
+    psd = (2.0 / (sample_rate * n)) * np.abs(spectrum[mask]) ** 2
+    return psd.mean(axis=0)
+
+
+def encode_raw_block(times, data):
+    """Uncompressed block: float64 timestamps followed by float32 samples"""
+    return times.astype(np.float64).tobytes() + data.astype(np.float32).tobytes()
+
+
+def decode_raw_block(buffer, n_samples, n_channels):
+    times = np.frombuffer(buffer, dtype=np.float64, count=n_samples)
+    data = np.frombuffer(buffer, dtype=np.float32, count=n_samples * n_channels,
+                         offset=n_samples * 8)
+    return times, data.reshape(n_samples, n_channels)
+
+
+CODECS = {
+    'float32': (encode_raw_block, decode_raw_block),
+    'delta': (eeg_codec.encode_block, eeg_codec.decode_block),
+}
+
+
+class SessionWriter:
+    """Appends raw EEG blocks, their index and analyzer outputs to a session"""
+
+    def __init__(self, session_dir, channels, sample_rate=256, source_id='',
+                 score_columns=SCORE_COLUMNS, block_size=BLOCK_SIZE, codec='float32',
+                 metadata=None):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec '{codec}', expected one of {sorted(CODECS)}")
+        self.session_dir = session_dir
+        self.channels = list(channels)
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.score_columns = list(score_columns)
+        self.encode = CODECS[codec][0]
+        os.makedirs(session_dir, exist_ok=True)
+
+        self.meta = {
+            'format': 1,
+            'channels': self.channels,
+            'sample_rate': sample_rate,
+            'source_id': source_id,
+            'block_size': block_size,
+            'codec': codec,
+            'block_features': list(BLOCK_FEATURES),
+            'alpha_band': list(ALPHA_BAND),
+            'score_columns': self.score_columns,
+            'created': time.time(),
+            'start_time': None,
+            'end_time': None,
+            'wall_clock_offset': None,
+            'n_samples': 0,
+            'n_blocks': 0,
+        }
+        self.meta.update(metadata or {})
+
+        self.raw_file = open(os.path.join(session_dir, 'raw.bin'), 'wb')
+        self.index_file = open(os.path.join(session_dir, 'raw_index.bin'), 'wb')
+        self.score_file = open(os.path.join(session_dir, 'scores.bin'), 'wb')
+        self.offset = 0
+
+        # Current block being filled
+        self.block_times = np.empty(block_size)
+        self.block_data = np.empty((block_size, len(self.channels)), dtype=np.float32)
+        self.fill = 0
+        self.write_meta()
+
+    def append_samples(self, timestamps, samples):
+        """Append (n,) timestamps and (n, channels) samples"""
+        timestamps = np.atleast_1d(np.asarray(timestamps, dtype=np.float64))
+        samples = np.asarray(samples, dtype=np.float32).reshape(len(timestamps), -1)
+        if self.meta['start_time'] is None and len(timestamps):
+            self.meta['start_time'] = float(timestamps[0])
+            # Live data: LSL clock -> wall clock, good to a few milliseconds
+            self.meta['wall_clock_offset'] = time.time() - float(timestamps[-1])
+            self.write_meta()
+
+        pos = 0
+        while pos < len(timestamps):
+            n = min(self.block_size - self.fill, len(timestamps) - pos)
+            self.block_times[self.fill:self.fill + n] = timestamps[pos:pos + n]
+            self.block_data[self.fill:self.fill + n] = samples[pos:pos + n, :len(self.channels)]
+            self.fill += n
+            pos += n
+            if self.fill == self.block_size:
+                self.flush_block()
+
+    def flush_block(self):
+        """Write the current (possibly partial) block and its index row"""
+        if self.fill == 0:
+            return
+        times = self.block_times[:self.fill]
+        data = self.block_data[:self.fill]
+        payload = self.encode(times, data)
+        self.raw_file.write(payload)
+
+        block = data.astype(np.float64)
+        rms = np.sqrt(np.mean(block ** 2, axis=0))
+        alpha = band_power(block, self.sample_rate, ALPHA_BAND)
+        row = np.concatenate(([times[0], times[-1], self.offset, len(payload),
+                               self.meta['n_samples'], self.fill], rms, alpha))
+        self.index_file.write(row.tobytes())
+
+        self.offset += len(payload)
+        self.meta['n_samples'] += self.fill
+        self.meta['n_blocks'] += 1
+        self.meta['end_time'] = float(times[-1])
+        self.fill = 0
+
+    def append_score(self, values):
+        """Append one analyzer output row: a dict by column name, or a
+        sequence ordered like score_columns"""
+        if isinstance(values, dict):
+            values = [values[column] for column in self.score_columns]
+        row = np.asarray(values, dtype=np.float64)
+        if row.size != len(self.score_columns):
+            raise ValueError(f"Expected {len(self.score_columns)} score values, got {row.size}")
+        self.score_file.write(row.tobytes())
+
+    def write_meta(self):
+        path = os.path.join(self.session_dir, 'meta.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.meta, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+    def close(self):
+        """Flush the partial block and finalize meta.json"""
+        self.flush_block()
+        for f in (self.raw_file, self.index_file, self.score_file):
+            f.close()
+        self.write_meta()
+
+
+class Session:
+    """Read-only view of one recorded session"""
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(os.path.normpath(path))
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.channels = self.meta['channels']
+        self.sample_rate = self.meta['sample_rate']
+        self.score_columns = self.meta['score_columns']
+        self.decode = CODECS[self.meta.get('codec', 'float32')][1]
+        self._index = None
+
+    @property
+    def index(self):
+        """Block index as (n_blocks, columns) array"""
+        if self._index is None:
+            width = INDEX_FIXED + len(BLOCK_FEATURES) * len(self.channels)
+            path = os.path.join(self.path, 'raw_index.bin')
+            rows = np.fromfile(path, dtype=np.float64) if os.path.exists(path) else np.empty(0)
+            self._index = rows[:len(rows) // width * width].reshape(-1, width)
+        return self._index
+
+    @property
+    def start_time(self):
+        return self.meta['start_time']
+
+    @property
+    def end_time(self):
+        index = self.index
+        return float(index[-1, T_END]) if len(index) else self.meta['end_time']
+
+    def to_wall_clock(self, timestamps):
+        return np.asarray(timestamps) + (self.meta['wall_clock_offset'] or 0.0)
+
+    def channel_indices(self, channels):
+        if channels is None:
+            return list(range(len(self.channels)))
+        return [self.channels.index(c) for c in channels]
+
+    def block_range(self, t0, t1):
+        """Indices [first, last) of blocks overlapping [t0, t1]"""
+        index = self.index
+        first = int(np.searchsorted(index[:, T_END], t0, side='left'))
+        last = int(np.searchsorted(index[:, T_START], t1, side='right'))
+        return first, max(first, last)
+
+    def raw(self, t0, t1, channels=None):
+        """Raw EEG in [t0, t1] (LSL clock) as (timestamps, (n, channels) data)"""
+        columns = self.channel_indices(channels)
+        first, last = self.block_range(t0, t1)
+        if first == last:
+            return np.empty(0), np.empty((0, len(columns)), dtype=np.float32)
+
+        index = self.index
+        start = int(index[first, OFFSET])
+        stop = int(index[last - 1, OFFSET] + index[last - 1, NBYTES])
+        mapped = np.memmap(os.path.join(self.path, 'raw.bin'), dtype=np.uint8, mode='r',
+                           offset=start, shape=(stop - start,))
+
+        times, data = [], []
+        for row in index[first:last]:
+            begin = int(row[OFFSET]) - start
+            block_times, block_data = self.decode(
+                mapped[begin:begin + int(row[NBYTES])], int(row[N_SAMPLES]), len(self.channels))
+            times.append(block_times)
+            data.append(block_data[:, columns])
+        times = np.concatenate(times)
+        data = np.concatenate(data)
+        mask = (times >= t0) & (times <= t1)
+        return times[mask], data[mask]
+
+    def raw_minutes(self, start_minute, end_minute, channels=None):
+        """Raw EEG between two offsets (in minutes) from the session start"""
+        return self.raw(self.start_time + 60.0 * start_minute,
+                        self.start_time + 60.0 * end_minute, channels)
+
+    def scores(self, t0=-np.inf, t1=np.inf):
+        """Analyzer outputs in [t0, t1] as a dict of column arrays"""
+        path = os.path.join(self.path, 'scores.bin')
+        width = len(self.score_columns)
+        n_rows = os.path.getsize(path) // (8 * width) if os.path.exists(path) else 0
+        if n_rows == 0:
+            return {column: np.empty(0) for column in self.score_columns}
+        rows = np.memmap(path, dtype=np.float64, mode='r', shape=(n_rows, width))
+        times = rows[:, 0]
+        first = int(np.searchsorted(times, t0, side='left'))
+        last = int(np.searchsorted(times, t1, side='right'))
+        selected = np.array(rows[first:last])
+        return {column: selected[:, i] for i, column in enumerate(self.score_columns)}
+
+    def score_tier(self, period, t0=-np.inf, t1=np.inf):
+        """Spilled score history tier rows in [t0, t1] (time, min, max, mean, count)"""
+        history_dir = os.path.join(self.path, 'score_history')
+        path = os.path.join(history_dir, f"tier_{period}s.bin")
+        if not os.path.exists(path):
+            return None
+        with open(os.path.join(history_dir, 'tiers.json')) as f:
+            origin = json.load(f)['origin']
+        n_rows = os.path.getsize(path) // 32
+        rows = np.memmap(path, dtype=np.float64, mode='r', shape=(n_rows, 4))
+        first = int(np.clip((t0 - origin) // period, 0, n_rows)) if np.isfinite(t0) else 0
+        last = int(np.clip((t1 - origin) // period + 1, 0, n_rows)) if np.isfinite(t1) else n_rows
+        selected = np.array(rows[first:last])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = selected[:, 2] / selected[:, 3]
+        return {
+            'time': origin + (first + np.arange(len(selected))) * period,
+            'min': selected[:, 0],
+            'max': selected[:, 1],
+            'mean': mean,
+            'count': selected[:, 3],
+        }
+
+    def block_feature(self, feature, channel):
+        """Per-block feature values: (t_start, t_end, values)"""
+        column = (INDEX_FIXED + BLOCK_FEATURES.index(feature) * len(self.channels)
+                  + self.channels.index(channel))
+        index = self.index
+        return index[:, T_START], index[:, T_END], index[:, column]
+
+
+class SessionArchive:
+    """All sessions below a root directory"""
+
+    def __init__(self, root=DEFAULT_SESSION_DIR):
+        self.root = root
+
+    def sessions(self, since=None, until=None):
+        """Sessions overlapping [since, until] (wall clock, seconds since epoch)"""
+        found = []
+        if not os.path.isdir(self.root):
+            return found
+        for name in sorted(os.listdir(self.root)):
+            path = os.path.join(self.root, name)
+            if not os.path.exists(os.path.join(path, 'meta.json')):
+                continue
+            session = Session(path)
+            if session.start_time is None:
+                continue
+            wall_start, wall_end = session.to_wall_clock([session.start_time, session.end_time])
+            if since is not None and wall_end < since:
+                continue
+            if until is not None and wall_start > until:
+                continue
+            found.append(session)
+        return found
+
+    def session(self, name):
+        return Session(os.path.join(self.root, name))
+
+    def find_blocks(self, feature, channel, above=None, below=None, since=None, until=None):
+        """Blocks whose feature value passes the thresholds, across sessions.
+
+        Only the block indexes are read. Returns a list of dicts with the
+        session, block start/end (LSL clock and wall clock) and the value.
+        """
+        matches = []
+        for session in self.sessions(since, until):
+            starts, ends, values = session.block_feature(feature, channel)
+            mask = np.ones(len(values), dtype=bool)
+            if above is not None:
+                mask &= values > above
+            if below is not None:
+                mask &= values < below
+            wall_starts = session.to_wall_clock(starts)
+            if since is not None:
+                mask &= wall_starts >= since
+            if until is not None:
+                mask &= wall_starts <= until
+            for i in np.flatnonzero(mask):
+                matches.append({
+                    'session': session.name,
+                    'start': float(starts[i]),
+                    'end': float(ends[i]),
+                    'wall_start': float(wall_starts[i]),
+                    'value': float(values[i]),
+                })
+        return matches
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Session Export
+Columnar (Parquet) export of a recorded session for analysis notebooks.
+
+One row per analyzer tick: timestamp, score, state code, calibration flag,
+the indicators (RMS, smoothness, sync, stability) and the sub-scores. With
+channel_features, per-channel RMS and delta/theta/alpha/beta band power of
+the raw EEG window behind each tick are added as <channel>_<feature>
+columns.
+
+Ticks are converted and written chunk_rows at a time (one Parquet row group
+per chunk), so memory stays bounded and multi-hour sessions export in well
+under a second. Load with pandas.read_parquet(path).
+
+Usage:
+    python session_export.py SESSION [--channel-features] [--output scores.parquet]
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from session_archive import Session, band_power
+
+try:
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+
+EXPORT_FILE = 'scores.parquet'
+EXPORT_CHUNK = 8192  # ticks per row group
+FEATURE_WINDOW = 3.0  # seconds of raw EEG behind each tick, as in the analyzer
+BANDS = {
+    'delta': (1.0, 4.0),
+    'theta': (4.0, 8.0),
+    'alpha': (8.0, 13.0),
+    'beta': (13.0, 30.0),
+}
+
+
+def channel_features(session, tick_times, window_seconds=FEATURE_WINDOW):
+    """Per-channel RMS and band powers of the window ending at each tick.
+
+    Returns a dict of <channel>_<feature> arrays; ticks without a full
+    window of raw EEG get NaN.
+    """
+    window = int(round(window_seconds * session.sample_rate))
+    times, data = session.raw(tick_times[0] - window_seconds - 1.0, tick_times[-1])
+    ends = np.searchsorted(times, tick_times, side='right') - 1
+    valid = ends >= window - 1
+    # (ticks, window) sample indices of every tick's window
+    indices = np.maximum(ends[:, None] - window + 1, 0) + np.arange(window)
+    indices = np.minimum(indices, max(len(times) - 1, 0))
+
+    features = {}
+    for c, channel in enumerate(session.channels):
+        if len(times) == 0:
+            windows = np.zeros((len(tick_times), window))
+        else:
+            windows = data[:, c].astype(np.float64)[indices]
+        values = {'rms': np.sqrt(np.mean(windows ** 2, axis=1))}
+        for band, limits in BANDS.items():
+            values[band] = band_power(windows.T, session.sample_rate, limits)
+        for feature, value in values.items():
+            features[f"{channel}_{feature}"] = np.where(valid, value, np.nan)
+    return features
+
+
+def export_session(session, path=None, channel_features_enabled=False, chunk_rows=EXPORT_CHUNK):
+    """Write a session's analyzer ticks to a Parquet file.
+
+    Returns (path, rows) or (None, 0) when the session has no scores.
+    """
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError("Parquet export needs pandas and pyarrow (pip install pandas pyarrow)")
+    if isinstance(session, str):
+        session = Session(session)
+    path = path or os.path.join(session.path, EXPORT_FILE)
+
+    scores = session.scores()
+    n_rows = len(scores['timestamp'])
+    if n_rows == 0:
+        return None, 0
+
+    writer = None
+    try:
+        for start in range(0, n_rows, chunk_rows):
+            columns = {name: values[start:start + chunk_rows] for name, values in scores.items()}
+            frame = pd.DataFrame(columns)
+            if 'state' in frame:
+                frame['state'] = frame['state'].astype(np.int8)
+            if 'calibrated' in frame:
+                frame['calibrated'] = frame['calibrated'].astype(bool)
+            if channel_features_enabled:
+                frame = frame.assign(**channel_features(session, columns['timestamp']))
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path, n_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a recorded session to Parquet")
+    parser.add_argument('session', help="session folder")
+    parser.add_argument('--channel-features', action='store_true',
+                        help="add per-channel RMS and band power columns")
+    parser.add_argument('--output', help=f"output file (default: <session>/{EXPORT_FILE})")
+    args = parser.parse_args()
+
+    try:
+        path, rows = export_session(args.session, args.output, args.channel_features)
+    except Exception as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    if path is None:
+        print("Session has no scores to export")
+        sys.exit(1)
+    print(f"Exported {rows} ticks to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -215,7 +215,7 @@ main() {
         echo ""
         print_info "Ready to use! Try these commands:"
         echo "  python3 working_muse_gui.py  # Launch GUI"
-        echo "  python3 test_lsl_working.py  # Test LSL streaming"
+        echo "  python3 stream_profiler.py --duration 5  # Profile LSL streaming"
         echo "  python3 system_check.py      # Run diagnostic anytime"
         echo ""
     else
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Shared-Memory Ring Buffer
+Lets the ingest/analysis process and one or more GUI processes exchange
+EEG samples and meditation scores without pipes, sockets or extra copies.
+
+Layout of each segment:
+    int64 header[HEADER_SLOTS]  - write sequence, capacity, width, control words
+    float64 rows[capacity, width]
+    utf-8 labels                - optional newline-separated column labels
+
+The single writer fills rows first and then publishes them by advancing the
+write sequence. Every reader keeps its own read sequence, so any number of
+viewers can attach to the same buffer. A reader that falls more than
+`capacity` rows behind simply skips ahead and reports the rows it lost.
+"""
+
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+
+
+HEADER_SLOTS = 8
+
+# Header slot indices
+SEQ_SLOT = 0        # total rows ever written (monotonic)
+CAPACITY_SLOT = 1   # number of rows the ring can hold
+WIDTH_SLOT = 2      # float64 values per row
+CLOSED_SLOT = 3     # set to 1 by the writer when it shuts down
+CONTROL_SLOT = 4    # free-form request word written by readers (see muse_ingest)
+STATUS_SLOT = 5     # free-form status word written by the writer
+LABELS_SLOT = 6     # byte length of the labels after the rows (0 = none)
+RATE_SLOT = 7       # nominal rows per second in mHz (0 = unknown)
+
+
+class SharedRingBuffer:
+    """Single-producer, multi-consumer ring of float64 rows in shared memory"""
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=shm.buf)
+        self.capacity = int(self.header[CAPACITY_SLOT])
+        self.width = int(self.header[WIDTH_SLOT])
+        self.rows = np.ndarray((self.capacity, self.width), dtype=np.float64,
+                               buffer=shm.buf, offset=HEADER_SLOTS * 8)
+
+    @classmethod
+    def create(cls, name, capacity, width, labels=None, rate=None):
+        """Create a new ring buffer segment (writer side); labels name the
+        columns and rate is the nominal rows per second, for readers"""
+        text = '\n'.join(labels).encode('utf-8') if labels else b''
+        size = HEADER_SLOTS * 8 + capacity * width * 8
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size + len(text))
+        shm.buf[size:size + len(text)] = text
+        header = np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[CAPACITY_SLOT] = capacity
+        header[WIDTH_SLOT] = width
+        header[LABELS_SLOT] = len(text)
+        header[RATE_SLOT] = int(round(rate * 1000)) if rate else 0
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Attach to an existing ring buffer segment (reader side)"""
+        shm = shared_memory.SharedMemory(name=name)
+        # Readers must not unlink the segment when they exit; only the
+        # creating process owns it (Python < 3.13 registers every attach)
+        try:
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+        return cls(shm, owner=False)
+
+    @property
+    def write_seq(self):
+        """Total number of rows published so far"""
+        return int(self.header[SEQ_SLOT])
+
+    @property
+    def labels(self):
+        """Column labels given at creation, or None"""
+        n = int(self.header[LABELS_SLOT])
+        if not n:
+            return None
+        offset = HEADER_SLOTS * 8 + self.capacity * self.width * 8
+        return bytes(self.shm.buf[offset:offset + n]).decode('utf-8').split('\n')
+
+    @property
+    def rate(self):
+        """Nominal rows per second given at creation, or None"""
+        return int(self.header[RATE_SLOT]) / 1000 or None
+
+    @property
+    def closed(self):
+        return bool(self.header[CLOSED_SLOT])
+
+    def write(self, rows):
+        """Append rows of shape (n, width) and publish them"""
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, self.width)
+        n = len(rows)
+        if n == 0:
+            return
+        if n > self.capacity:
+            # Only the newest rows can survive anyway
+            skipped = n - self.capacity
+            self.header[SEQ_SLOT] += skipped
+            rows = rows[skipped:]
+            n = self.capacity
+
+        seq = int(self.header[SEQ_SLOT])
+        start = seq % self.capacity
+        first = min(n, self.capacity - start)
+        self.rows[start:start + first] = rows[:first]
+        if first < n:
+            self.rows[:n - first] = rows[first:]
+
+        # Publish after the data is in place
+        self.header[SEQ_SLOT] = seq + n
+
+    def read_since(self, read_seq, max_rows=None):
+        """Copy rows published after read_seq.
+
+        Returns (rows, new_read_seq, lost) where lost counts rows that were
+        overwritten before this reader could copy them.
+        """
+        write_seq = self.write_seq
+        start = max(read_seq, write_seq - self.capacity)
+        if max_rows is not None:
+            write_seq = min(write_seq, start + max_rows)
+        lost = start - read_seq
+        n = write_seq - start
+        if n <= 0:
+            return np.empty((0, self.width)), read_seq + lost, lost
+
+        begin = start % self.capacity
+        first = min(n, self.capacity - begin)
+        if first == n:
+            out = self.rows[begin:begin + n].copy()
+        else:
+            out = np.concatenate((self.rows[begin:], self.rows[:n - first]))
+
+        # The writer may have lapped us while copying; drop torn rows
+        overrun = self.write_seq - self.capacity - start
+        if overrun > 0:
+            out = out[overrun:]
+            lost += overrun
+        return out, write_seq, lost
+
+    def latest(self, n):
+        """Copy the newest n rows (fewer if not yet written)"""
+        write_seq = self.write_seq
+        n = min(n, write_seq, self.capacity)
+        rows, _, _ = self.read_since(write_seq - n)
+        return rows
+
+    def set_control(self, value):
+        """Post a control word for the writer process"""
+        self.header[CONTROL_SLOT] = value
+
+    def take_control(self):
+        """Read and clear the pending control word (writer side)"""
+        value = int(self.header[CONTROL_SLOT])
+        if value:
+            self.header[CONTROL_SLOT] = 0
+        return value
+
+    @property
+    def status(self):
+        return int(self.header[STATUS_SLOT])
+
+    def set_status(self, value):
+        """Publish a status word for readers (writer side)"""
+        self.header[STATUS_SLOT] = value
+
+    def close(self):
+        """Detach; the owner also marks the buffer closed and unlinks it"""
+        if self.owner:
+            self.header[CLOSED_SLOT] = 1
+        self.header = None
+        self.rows = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Signal Quality Index
+Cheap per-channel electrode contact estimate, vectorized across channels
+(and windows).
+
+Three factors in [0, 1], multiplied into one index:
+- amplitude: the standard deviation should lie in QUALITY_STD_RANGE; lower
+  means no signal (lifted or dry electrode), higher means artifacts
+- line noise: share of the 1Hz+ power within 1Hz of 50 or 60Hz; a loose
+  electrode picks up mains hum
+- flat line: share of consecutive samples that don't change at all
+
+The analyzer evaluates it for AF7/AF8 from intermediates it already has
+(see metrics.py) and down-weights channels below QUALITY_GOOD; the GUI
+shows it next to each EEG plot.
+"""
+
+import numpy as np
+
+
+QUALITY_STD_RANGE = (2.0, 150.0)  # µV
+LINE_FREQUENCIES = (50.0, 60.0)   # Hz
+LINE_RATIO_LIMIT = 0.5            # line noise share that scores 0
+FLAT_EPSILON = 1e-6               # µV; smaller steps count as unchanged
+
+QUALITY_GOOD = 0.8
+QUALITY_FAIR = 0.5
+
+
+def quality_index(signal, diff, spectrum, frequencies):
+    """Index in [0, 1] per leading index of (..., samples) arrays.
+
+    diff is the first difference of signal and spectrum its power spectrum
+    over frequencies (any scaling), both along the last axis.
+    """
+    std = signal.std(axis=-1)
+    low, high = QUALITY_STD_RANGE
+    with np.errstate(divide='ignore'):
+        amplitude = np.minimum(1.0, std / low) * np.minimum(1.0, high / std)
+
+    band = frequencies >= 1.0
+    line = np.zeros(band.shape, dtype=bool)
+    for frequency in LINE_FREQUENCIES:
+        line |= np.abs(frequencies - frequency) <= 1.0
+    if line.any():
+        # In-order sums, see metrics.WindowData.band_power
+        with np.errstate(invalid='ignore', divide='ignore'):
+            line_ratio = (np.cumsum(spectrum[..., line], axis=-1)[..., -1] /
+                          np.cumsum(spectrum[..., band], axis=-1)[..., -1])
+    else:
+        line_ratio = np.zeros(std.shape)  # Too short to resolve mains frequencies
+    line_factor = np.clip(1.0 - np.nan_to_num(line_ratio, nan=1.0) / LINE_RATIO_LIMIT, 0.0, 1.0)
+
+    flat = np.mean(np.abs(diff) <= FLAT_EPSILON, axis=-1)
+    return np.nan_to_num(amplitude) * line_factor * (1.0 - flat)
+
+
+def channel_quality(signal, sample_rate=256):
+    """Index per channel of a (channels, samples) block"""
+    signal = np.asarray(signal, dtype=np.float64)
+    if signal.shape[-1] < 2:
+        return np.zeros(signal.shape[:-1])
+    centered = signal - signal.mean(axis=-1, keepdims=True)
+    spectrum = np.abs(np.fft.rfft(centered, axis=-1)) ** 2
+    frequencies = np.fft.rfftfreq(signal.shape[-1], 1.0 / sample_rate)
+    return quality_index(signal, np.diff(signal, axis=-1), spectrum, frequencies)
+
+
+def quality_label(quality):
+    if quality >= QUALITY_GOOD:
+        return "good"
+    if quality >= QUALITY_FAIR:
+        return "fair"
+    return "poor"
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Rolling Spectrogram
+Short-time Fourier transform of one EEG channel, computed incrementally for
+a scrolling image.
+
+Samples go into a small ring holding the last segment. Every hop samples,
+that segment is Hann-tapered and transformed once, and its log power up to
+max_frequency becomes the next column of the image; history is never
+recomputed.
+
+The image buffer is allocated once at twice the displayed width and every
+column is written to slot and slot + columns, so the newest `columns`
+columns are always one contiguous slice of it (image()); scrolling needs
+neither a roll nor a new array.
+"""
+
+import numpy as np
+
+
+SPECTROGRAM_SECONDS = 300.0  # Displayed history
+SPECTROGRAM_HOP = 0.25       # s between columns
+MAX_FREQUENCY = 40.0         # Hz
+
+
+class RollingSpectrogram:
+    """Circular (time, frequency) image of log power in dB"""
+
+    def __init__(self, sample_rate=256, seconds=SPECTROGRAM_SECONDS, hop_seconds=SPECTROGRAM_HOP,
+                 segment_seconds=1.0, max_frequency=MAX_FREQUENCY):
+        self.segment = int(segment_seconds * sample_rate)
+        self.hop = int(hop_seconds * sample_rate)
+        self.hop_seconds = self.hop / sample_rate
+        self.taper = np.hanning(self.segment)
+        self.scale = 2.0 / (sample_rate * np.sum(self.taper ** 2))  # One-sided PSD, µV²/Hz
+        frequencies = np.fft.rfftfreq(self.segment, 1.0 / sample_rate)
+        self.bins = int(np.searchsorted(frequencies, max_frequency, side='right'))
+        self.max_frequency = frequencies[self.bins - 1]
+
+        self.samples = np.zeros(self.segment)  # Ring of the last segment
+        self.sample_count = 0
+        self.columns = int(round(seconds / self.hop_seconds))
+        self.buffer = np.zeros((2 * self.columns, self.bins))
+        self.column_count = 0
+
+    @property
+    def seconds(self):
+        return self.columns * self.hop_seconds
+
+    def add(self, value):
+        """Fold in one sample; one FFT every hop samples"""
+        self.samples[self.sample_count % self.segment] = value
+        self.sample_count += 1
+        if self.sample_count >= self.segment and self.sample_count % self.hop == 0:
+            self.add_column()
+
+    def add_column(self):
+        start = self.sample_count % self.segment
+        segment = np.concatenate((self.samples[start:], self.samples[:start]))  # Oldest first
+        spectrum = np.fft.rfft((segment - segment.mean()) * self.taper)[:self.bins]
+        column = 10.0 * np.log10(self.scale * np.abs(spectrum) ** 2 + 1e-12)
+        slot = self.column_count % self.columns
+        self.buffer[slot] = column
+        self.buffer[slot + self.columns] = column
+        self.column_count += 1
+
+    def image(self):
+        """The last `columns` columns, oldest first: a view into the buffer"""
+        start = self.column_count % self.columns
+        return self.buffer[start:start + self.columns]
+
+    def levels(self):
+        """Color range (dB) covering the columns written so far"""
+        n = min(self.column_count, self.columns)
+        if n == 0:
+            return (0.0, 1.0)
+        written = self.image()[self.columns - n:]
+        low, high = np.percentile(written, (5, 99.5))
+        return (low, max(high, low + 1.0))
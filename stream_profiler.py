@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+LSL Stream Quality Profiler
+Pulls an LSL stream in chunks for a fixed duration and writes a JSON report:
+
+- effective vs nominal sample rate
+- timestamp jitter histogram (deviation of inter-sample intervals)
+- gap count, gap lengths and estimated sample loss
+- chunk size distribution
+- per-channel flat-line and clipping ratios
+- CPU cost of the pull loop
+
+Works against any EEG outlet: a Muse streamed by the patched muselsl, or a
+local synthetic one started by the profiler itself.
+
+Usage:
+    python stream_profiler.py                      # profile the first EEG stream for 10s
+    python stream_profiler.py --synthetic          # no headset needed
+    python stream_profiler.py --duration 60 --output report.json
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+from pylsl import resolve_streams, StreamInlet, proc_clocksync
+
+from synthetic_stream import SyntheticMuseOutlet, MUSE_UV_RANGE, MUSE_CHANNELS
+
+
+def channel_labels(info):
+    """Channel labels from an LSL stream description (generic names if absent)"""
+    labels = []
+    channel = info.desc().child("channels").child("channel")
+    for i in range(info.channel_count()):
+        labels.append(channel.child_value("label") or f"ch{i + 1}")
+        channel = channel.next_sibling()
+    return labels
+
+
+def channel_map(info):
+    """Channel labels of an EEG stream, assuming the Muse order when the
+    description doesn't name AF7 and AF8"""
+    labels = channel_labels(info)
+    if 'AF7' in labels and 'AF8' in labels:
+        return labels
+    return (MUSE_CHANNELS + labels[len(MUSE_CHANNELS):])[:len(labels)]
+
+
+def find_stream(stream_type='EEG', name=None, source_id=None, wait_time=5.0):
+    """First stream matching type (and name / source_id, if given)"""
+    for stream in resolve_streams(wait_time=wait_time):
+        if stream.type() != stream_type:
+            continue
+        if name is not None and stream.name() != name:
+            continue
+        if source_id is not None and stream.source_id() != source_id:
+            continue
+        return stream
+    return None
+
+
+def open_inlet(stream_type, source_id=None, wait_time=2.0):
+    """Clock-synchronized inlet of a stream of this type from the same device
+    (e.g. the ACC or PPG stream next to an EEG source_id); None if absent"""
+    stream = find_stream(stream_type, source_id=source_id or None, wait_time=wait_time)
+    if stream is None:
+        return None
+    return StreamInlet(stream, processing_flags=proc_clocksync)
+
+
+def pull_for(inlet, duration, max_chunk=1024):
+    """Pull chunks for duration seconds.
+
+    Returns (timestamps, data, chunk_sizes, cpu_seconds, wall_seconds); the CPU
+    time is measured for the pulling thread only.
+    """
+    timestamps, data, chunk_sizes = [], [], []
+    cpu_start = time.thread_time()
+    wall_start = time.perf_counter()
+    while time.perf_counter() - wall_start < duration:
+        chunk, stamps = inlet.pull_chunk(timeout=0.2, max_samples=max_chunk)
+        if stamps:
+            timestamps.extend(stamps)
+            data.extend(chunk)
+            chunk_sizes.append(len(stamps))
+    cpu = time.thread_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    return (np.asarray(timestamps, dtype=np.float64), np.asarray(data, dtype=np.float64),
+            np.asarray(chunk_sizes, dtype=np.int64), cpu, wall)
+
+
+def flat_line_ratio(data, min_run=26, epsilon=1e-6):
+    """Per-channel fraction of samples inside runs of >= min_run unchanged values"""
+    n, channels = data.shape
+    ratios = np.zeros(channels)
+    if n < 2:
+        return ratios
+    changed = np.abs(np.diff(data, axis=0)) > epsilon
+    for c in range(channels):
+        # Each change starts a new run; count the length of every run
+        run_ids = np.concatenate(([0], np.cumsum(changed[:, c])))
+        lengths = np.bincount(run_ids)
+        ratios[c] = lengths[lengths >= min_run].sum() / n
+    return ratios
+
+
+def build_report(timestamps, data, chunk_sizes, nominal_rate, labels, cpu, wall,
+                 gap_factor=2.0, clip_level=None, jitter_bins_ms=None):
+    """Stream quality metrics as a JSON-serializable dict"""
+    n = len(timestamps)
+    report = {
+        'samples': n,
+        'duration_s': wall,
+        'nominal_rate': nominal_rate,
+        'channels': labels,
+    }
+    if n < 2:
+        report['error'] = "not enough samples received"
+        return report
+
+    period = 1.0 / nominal_rate if nominal_rate > 0 else np.median(np.diff(timestamps))
+    deltas = np.diff(timestamps)
+    gap_mask = deltas > gap_factor * period
+    gap_lengths = deltas[gap_mask]
+    missing = int(np.maximum(np.round(gap_lengths / period) - 1, 0).sum())
+
+    # Jitter of regular intervals only; gaps are reported separately
+    jitter_ms = (deltas[~gap_mask] - period) * 1000.0
+    if jitter_bins_ms is None:
+        jitter_bins_ms = np.array([-np.inf, -2, -1, -0.5, -0.1, 0.1, 0.5, 1, 2, np.inf])
+    counts, _ = np.histogram(jitter_ms, bins=jitter_bins_ms)
+    edges = [str(e) for e in jitter_bins_ms]
+
+    sizes, size_counts = np.unique(chunk_sizes, return_counts=True)
+    if clip_level is None:
+        clip_level = min(abs(MUSE_UV_RANGE[0]), abs(MUSE_UV_RANGE[1])) - 1.0
+    span = timestamps[-1] - timestamps[0]
+
+    report.update({
+        'effective_rate': (n - 1) / span if span > 0 else 0.0,
+        'timestamp_span_s': span,
+        'jitter': {
+            'std_ms': float(jitter_ms.std()) if jitter_ms.size else 0.0,
+            'max_abs_ms': float(np.abs(jitter_ms).max()) if jitter_ms.size else 0.0,
+            'histogram_ms': {f"{lo}..{hi}": int(c) for lo, hi, c in zip(edges[:-1], edges[1:], counts)},
+        },
+        'gaps': {
+            'count': int(gap_mask.sum()),
+            'missing_samples': missing,
+            'loss_percent': 100.0 * missing / (n + missing),
+            'lengths_ms': [round(float(g) * 1000.0, 2) for g in gap_lengths],
+        },
+        'chunks': {
+            'count': int(len(chunk_sizes)),
+            'mean_size': float(chunk_sizes.mean()) if len(chunk_sizes) else 0.0,
+            'size_distribution': {int(s): int(c) for s, c in zip(sizes, size_counts)},
+        },
+        'channel_quality': {
+            label: {'flat_line_ratio': float(flat), 'clipping_ratio': float(clip)}
+            for label, flat, clip in zip(labels, flat_line_ratio(data),
+                                         (np.abs(data) >= clip_level).mean(axis=0))
+        },
+        'pull_loop_cpu': {
+            'cpu_seconds': cpu,
+            'cpu_percent': 100.0 * cpu / wall if wall > 0 else 0.0,
+            'us_per_sample': 1e6 * cpu / n,
+        },
+    })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the quality of an LSL stream")
+    parser.add_argument('--type', default='EEG', help="LSL stream type to profile")
+    parser.add_argument('--name', help="only profile the stream with this name")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds to record")
+    parser.add_argument('--max-chunk', type=int, default=1024, help="max samples per pull")
+    parser.add_argument('--synthetic', action='store_true',
+                        help="profile a local synthetic Muse outlet instead of a headset")
+    parser.add_argument('--drop-rate', type=float, default=0.0,
+                        help="packet drop rate of the synthetic outlet")
+    parser.add_argument('--clip-level', type=float,
+                        help="absolute value treated as clipped (default: Muse ADC limit)")
+    parser.add_argument('--output', help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    synthetic = None
+    source_id = None
+    if args.synthetic:
+        synthetic = SyntheticMuseOutlet(address='00:00:00:00:00:00', drop_rate=args.drop_rate).start()
+        source_id = 'Muse' + synthetic.address
+
+    try:
+        print(f"Looking for {args.type} stream...", file=sys.stderr)
+        stream = find_stream(args.type, args.name, source_id)
+        if stream is None:
+            print(f"ERROR No {args.type} stream found", file=sys.stderr)
+            sys.exit(1)
+
+        inlet = StreamInlet(stream, max_chunklen=args.max_chunk)
+        info = inlet.info()
+        print(f"Profiling {info.name()} ({info.source_id()}) for {args.duration:.0f}s...",
+              file=sys.stderr)
+        timestamps, data, chunk_sizes, cpu, wall = pull_for(inlet, args.duration, args.max_chunk)
+        data = data.reshape(len(timestamps), info.channel_count())
+
+        report = build_report(timestamps, data, chunk_sizes, info.nominal_srate(),
+                              channel_labels(info), cpu, wall, clip_level=args.clip_level)
+        report['stream'] = {'name': info.name(), 'type': info.type(), 'source_id': info.source_id()}
+    finally:
+        if synthetic is not None:
+            synthetic.stop()
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    # Non-zero exit lets scripts use the profiler as a streaming check
+    sys.exit(0 if report['samples'] > 10 else 1)
+
+
+if __name__ == "__main__":
+    main()
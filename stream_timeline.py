@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+LSL Stream Timeline Monitor
+Dejitters clock-synchronized LSL timestamps and tracks stream health.
+
+The receiver opens its inlet with clock synchronization (time_correction)
+applied, then passes every chunk of timestamps through TimelineMonitor:
+
+- a gap is a jump of the timeline: a sample and the ones after it (up to
+  CONFIRM_SAMPLES, within the chunk) all arrive more than gap_factor sample
+  periods after their slots on the ideal sample clock. A single late sample
+  is jitter, not a gap. The number of missing samples is the size of that
+  jump in sample periods
+- timestamps are dejittered against an ideal sample clock; the model restarts
+  after a gap so dropped BLE packets stay visible on the timeline
+- effective sample rate, timestamp jitter and loss are summarized per
+  report_interval seconds of stream time
+"""
+
+import numpy as np
+
+
+# Muse BLE packets carry 12 samples, so real losses are far above this,
+# while BLE timestamp jitter stays well below it
+GAP_FACTOR = 4.0
+CONFIRM_SAMPLES = 4
+
+
+class TimelineMonitor:
+    """Gap detection, dejittering and per-interval rate/jitter/loss reports"""
+
+    def __init__(self, nominal_rate=256.0, report_interval=60.0, gap_factor=GAP_FACTOR,
+                 smoothing=0.05):
+        self.nominal_rate = nominal_rate
+        self.period = 1.0 / nominal_rate
+        self.report_interval = report_interval
+        self.gap_factor = gap_factor
+        self.smoothing = smoothing
+
+        # Dejitter model: t = anchor + index * period + offset
+        self.anchor = None
+        self.index = 0
+        self.offset = 0.0
+
+        # Lifetime totals
+        self.total_samples = 0
+        self.total_gaps = 0
+        self.total_missing = 0
+
+        self.reports = []
+        self.reset_interval(None)
+
+    def reset_interval(self, start):
+        self.interval_start = start
+        self.interval_samples = 0
+        self.interval_gaps = 0
+        self.interval_missing = 0
+        self.interval_max_gap = 0.0
+        self.residual_sum = 0.0
+        self.residual_sq_sum = 0.0
+
+    def add(self, timestamps):
+        """Process a chunk of raw timestamps.
+
+        Returns (dejittered_timestamps, report) where report is a dict when
+        this chunk completed a reporting interval, otherwise None.
+        """
+        raw = np.asarray(timestamps, dtype=np.float64)
+        if raw.size == 0:
+            return raw, None
+
+        if self.anchor is None:
+            self.restart(raw[0])
+            self.interval_start = raw[0]
+
+        dejittered = np.empty_like(raw)
+        pos = 0
+        while pos < raw.size:
+            # Samples went missing where the timeline jumps: a sample and the
+            # ones right after it all arrive well after their slots
+            segment = raw[pos:]
+            residual = segment - self.expected(segment.size)
+            following = np.concatenate((residual, np.full(CONFIRM_SAMPLES - 1, np.inf)))
+            shift = np.lib.stride_tricks.sliding_window_view(following, CONFIRM_SAMPLES).min(axis=1)
+            late = np.flatnonzero(shift > self.gap_factor * self.period)
+            end = late[0] if late.size else segment.size
+            if end:
+                dejittered[pos:pos + end] = self.dejitter(segment[:end])
+            if not late.size:
+                break
+
+            gap = np.median(residual[end:end + CONFIRM_SAMPLES])  # Size of the jump
+            self.interval_gaps += 1
+            self.interval_missing += int(round(gap * self.nominal_rate))
+            self.interval_max_gap = max(self.interval_max_gap, gap + self.period)
+            self.restart(segment[end])
+            pos += end
+
+        self.interval_samples += raw.size
+        self.total_samples += raw.size
+
+        report = None
+        if raw[-1] - self.interval_start >= self.report_interval:
+            report = self.finish_interval(raw[-1])
+        return dejittered, report
+
+    def expected(self, n):
+        """Where the next n samples belong on the ideal clock"""
+        return self.anchor + (self.index + np.arange(n)) * self.period + self.offset
+
+    def restart(self, start):
+        """Re-anchor the ideal clock, e.g. after a gap"""
+        self.anchor = start
+        self.index = 0
+        self.offset = 0.0
+
+    def dejitter(self, raw):
+        """Map one contiguous run of raw timestamps onto the ideal clock"""
+        ideal = self.expected(raw.size) - self.offset
+        residual = raw - ideal
+        # One smoothing step per chunk keeps this O(1) per sample and lets
+        # the offset follow slow drift between the device and local clocks
+        self.offset += self.smoothing * (residual.mean() - self.offset)
+        self.index += raw.size
+
+        jitter = residual - self.offset
+        self.residual_sum += jitter.sum()
+        self.residual_sq_sum += np.dot(jitter, jitter)
+        return ideal + self.offset
+
+    def finish_interval(self, end):
+        """Close the current reporting interval and return its summary"""
+        duration = end - self.interval_start
+        n = max(self.interval_samples, 1)
+        mean_residual = self.residual_sum / n
+        jitter = np.sqrt(max(self.residual_sq_sum / n - mean_residual ** 2, 0.0))
+        expected = self.interval_samples + self.interval_missing
+
+        report = {
+            'start': self.interval_start,
+            'duration': duration,
+            'samples': self.interval_samples,
+            'effective_rate': self.interval_samples / duration if duration > 0 else 0.0,
+            'jitter_ms': jitter * 1000.0,
+            'gaps': self.interval_gaps,
+            'missing_samples': self.interval_missing,
+            'max_gap_ms': self.interval_max_gap * 1000.0,
+            'loss_percent': 100.0 * self.interval_missing / expected if expected else 0.0,
+        }
+        self.total_gaps += self.interval_gaps
+        self.total_missing += self.interval_missing
+        self.reports.append(report)
+        self.reset_interval(end)
+        return report
+
+
+def format_report(report):
+    """One-line summary for logs"""
+    return (f"TIMELINE {report['duration']:.0f}s: {report['effective_rate']:.1f} Hz, "
+            f"jitter {report['jitter_ms']:.2f} ms, {report['gaps']} gaps "
+            f"({report['missing_samples']} samples, max {report['max_gap_ms']:.0f} ms), "
+            f"loss {report['loss_percent']:.2f}%")
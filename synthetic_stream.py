@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Synthetic Muse EEG Outlet
+Publishes a Muse-shaped EEG stream on LSL without a headset, for profiling,
+demos and development.
+
+The stream mirrors the patched muselsl outlet: type 'EEG', 5 channels
+(TP9, AF7, AF8, TP10, Right AUX) in microvolts at 256Hz, pushed in chunks of
+12 samples with source_id 'Muse<address>'. Signals are a 10Hz alpha rhythm
+on top of pink-ish noise, quantized to the Muse ADC step.
+
+Usage:
+    python synthetic_stream.py [--address 00:55:DA:B0:00:01] [--drop-rate 0.01]
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+from pylsl import StreamInfo, StreamOutlet, local_clock
+
+
+MUSE_CHANNELS = ['TP9', 'AF7', 'AF8', 'TP10', 'Right AUX']
+MUSE_EEG_RATE = 256
+MUSE_CHUNK = 12
+MUSE_UV_PER_LSB = 0.48828125  # muselsl scaling of the 12-bit ADC
+MUSE_UV_RANGE = (-2048 * MUSE_UV_PER_LSB, 2047 * MUSE_UV_PER_LSB)
+
+
+def muse_stream_info(address, name='Muse'):
+    """StreamInfo laid out exactly like the patched muselsl EEG outlet"""
+    info = StreamInfo(name, 'EEG', len(MUSE_CHANNELS), MUSE_EEG_RATE, 'float32',
+                      'Muse%s' % address)
+    info.desc().append_child_value("manufacturer", "Muse")
+    channels = info.desc().append_child("channels")
+    for c in MUSE_CHANNELS:
+        channels.append_child("channel") \
+            .append_child_value("label", c) \
+            .append_child_value("unit", "microvolts") \
+            .append_child_value("type", "EEG")
+    return info
+
+
+def synthetic_eeg(n_samples, rng, alpha_amplitude=20.0, noise_amplitude=10.0, start=0):
+    """(n_samples, 5) block of Muse-like EEG in microvolts"""
+    t = (start + np.arange(n_samples)) / MUSE_EEG_RATE
+    alpha = alpha_amplitude * np.sin(2 * np.pi * 10.0 * t)[:, None]
+    noise = np.cumsum(rng.normal(0, noise_amplitude, (n_samples, len(MUSE_CHANNELS))), axis=0)
+    noise -= noise.mean(axis=0)
+    noise *= 0.1
+    data = alpha + noise + rng.normal(0, noise_amplitude, noise.shape)
+    data = np.clip(data, *MUSE_UV_RANGE)
+    return np.round(data / MUSE_UV_PER_LSB) * MUSE_UV_PER_LSB
+
+
+class SyntheticMuseOutlet:
+    """Background thread pushing synthetic Muse EEG in real time"""
+
+    def __init__(self, address='00:55:DA:B0:00:01', drop_rate=0.0, seed=None):
+        self.address = address
+        self.drop_rate = drop_rate
+        self.rng = np.random.default_rng(seed)
+        self.outlet = StreamOutlet(muse_stream_info(address), MUSE_CHUNK)
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def run(self):
+        sent = 0
+        start = local_clock()
+        while self.running:
+            block = synthetic_eeg(MUSE_CHUNK, self.rng, start=sent)
+            # Timestamps like muselsl: spaced at the nominal rate
+            timestamps = start + (sent + np.arange(MUSE_CHUNK)) / MUSE_EEG_RATE
+            sent += MUSE_CHUNK
+            # Simulated BLE packet loss: the packet's samples never arrive
+            if self.rng.random() >= self.drop_rate:
+                for sample, timestamp in zip(block.tolist(), timestamps):
+                    self.outlet.push_sample(sample, timestamp)
+            time.sleep(max(start + sent / MUSE_EEG_RATE - local_clock(), 0.0))
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish a synthetic Muse EEG stream on LSL")
+    parser.add_argument('--address', default='00:55:DA:B0:00:01',
+                        help="device address used in the stream source_id")
+    parser.add_argument('--drop-rate', type=float, default=0.0,
+                        help="fraction of 12-sample packets to drop")
+    args = parser.parse_args()
+
+    outlet = SyntheticMuseOutlet(args.address, args.drop_rate).start()
+    print(f"Streaming synthetic EEG as Muse{args.address} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        outlet.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -210,7 +210,7 @@ def run_comprehensive_check():
     
     print("\n💡 Quick Start Commands:")
     print("   Apply patch: python patch_muselsl.py")
-    print("   Test LSL:    python test_lsl_working.py")
+    print("   Test LSL:    python stream_profiler.py --duration 5")
     print("   Run GUI:     python working_muse_gui.py")
     
     return passed == total
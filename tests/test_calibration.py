@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from calibration import CalibrationStats, BaselineStore, AdaptiveBaseline, baseline_from_eeg
+
+
+def batch_baseline(af7, af8):
+    pair = np.stack((af7, af8))
+    return {
+        'avg_rms': np.sqrt(np.mean(pair ** 2, axis=1)).mean(),
+        'smoothness': (1.0 / (1.0 + np.var(np.diff(pair, axis=1), axis=1))).mean(),
+        'sync': abs(np.corrcoef(af7, af8)[0, 1]),
+    }
+
+
+@pytest.fixture
+def signals():
+    rng = np.random.default_rng(0)
+    common = rng.normal(0, 15, 3000)
+    return 800 + common + rng.normal(0, 5, 3000), 790 + common + rng.normal(0, 5, 3000)
+
+
+def assert_matches_batch(stats, af7, af8):
+    expected = batch_baseline(af7, af8)
+    for key, value in stats.baseline().items():
+        assert value == pytest.approx(expected[key], rel=1e-12)
+
+
+def test_welford_per_sample_matches_batch(signals):
+    stats = CalibrationStats()
+    for x, y in zip(*signals):
+        stats.add(x, y)
+    assert stats.n_samples == 3000
+    assert_matches_batch(stats, *signals)
+
+
+def test_welford_blocks_match_batch(signals):
+    af7, af8 = signals
+    stats = CalibrationStats()
+    bounds = (0, 7, 500, 2048, 3000)  # Uneven blocks; the seams count in the differences
+    for start, stop in zip(bounds, bounds[1:]):
+        stats.add_block(af7[start:stop], af8[start:stop])
+    stats.add(af7[0], af8[0])  # Mixing in single samples keeps working
+    assert_matches_batch(stats, np.append(af7, af7[0]), np.append(af8, af8[0]))
+
+
+def test_flat_channel_has_no_sync():
+    stats = CalibrationStats()
+    stats.add_block(np.zeros(100), np.arange(100.0))
+    assert stats.baseline()['sync'] is None
+
+
+def test_baseline_from_eeg_picks_the_frontal_channels(signals):
+    af7, af8 = signals
+    eeg = np.stack((np.zeros(3000), af7, af8, np.zeros(3000)))
+    assert_matches_batch(baseline_from_eeg(eeg), af7, af8)
+
+
+def test_adaptive_baseline_half_life_is_in_seconds():
+    start = {'avg_rms': 10.0, 'smoothness': 0.1, 'sync': 0.2}
+    block = {'rms': 30.0, 'smoothness': 0.1, 'sync': np.nan}
+    coarse, fine = AdaptiveBaseline(start, half_life=60.0), AdaptiveBaseline(start, half_life=60.0)
+    for t in range(0, 61, 60):
+        coarse.update(block, float(t))
+    for t in range(0, 61, 2):
+        fine.update(block, float(t))
+    assert coarse.baseline['avg_rms'] == pytest.approx(20.0)
+    assert fine.baseline['avg_rms'] == pytest.approx(20.0)
+    assert fine.baseline['sync'] == 0.2  # Undefined sync leaves it alone
+
+
+def test_baselines_persist_per_device_and_user(tmp_path):
+    path = str(tmp_path / 'baselines.json')
+    baseline = {'avg_rms': 20.0, 'smoothness': 0.01, 'sync': 0.5}
+    BaselineStore(path).put('00:55:DA:B0:00:01', 'ana', baseline, 3000)
+    store = BaselineStore(path)
+    assert store.get('00:55:DA:B0:00:01', 'ana') == baseline
+    assert store.get('00:55:DA:B0:00:01', 'ben') is None
+    assert store.get('00:55:DA:B0:00:01', 'ana', max_age_days=-1) is None
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from coherence import CoherenceTracker, COHERENCE_BANDS, SEGMENTS
+
+CHANNELS = ['TP9', 'AF7', 'AF8', 'TP10']
+
+
+def feed(tracker, eeg, chunk=37, window=1024):
+    """Hand the tracker the newest `window` samples after every chunk, like the analyzer"""
+    for end in range(chunk, eeg.shape[1] + 1, chunk):
+        tracker.update(eeg[:, max(0, end - window):end], end)
+
+
+def direct_msc(a, b, starts, segment=256, rate=256):
+    taper = np.hanning(segment)
+    spectra = []
+    for x in (a, b):
+        segments = x[starts[:, None] + np.arange(segment)]
+        spectra.append(np.fft.rfft((segments - segments.mean(axis=1, keepdims=True)) * taper))
+    cross = np.sum(spectra[0] * np.conj(spectra[1]), axis=0)
+    auto = [np.sum(np.abs(spectrum) ** 2, axis=0) for spectrum in spectra]
+    msc = np.abs(cross) ** 2 / (auto[0] * auto[1])
+    frequencies = np.fft.rfftfreq(segment, 1.0 / rate)
+    return {band: np.mean(msc[(frequencies >= low) & (frequencies <= high)])
+            for band, (low, high) in COHERENCE_BANDS.items()}
+
+
+def test_incremental_matches_direct_welch():
+    rng = np.random.default_rng(0)
+    common = rng.normal(0, 10, 256 * 12)
+    eeg = rng.normal(0, 10, (4, 256 * 12)) + common
+    tracker = CoherenceTracker(CHANNELS)
+    feed(tracker, eeg)
+    values = tracker.values()
+
+    fed = eeg.shape[1] // 37 * 37
+    starts = np.arange(0, fed - 256 + 1, 128)[-SEGMENTS:]  # 50% overlap from the first sample
+    for pair, (a, b) in (('frontal', (1, 2)), ('temporal', (0, 3))):
+        expected = direct_msc(eeg[a], eeg[b], starts)
+        for band in COHERENCE_BANDS:
+            assert values[f"coherence_{band}_{pair}"] == pytest.approx(expected[band], rel=1e-9)
+
+
+def test_coherence_bounds_and_missing_pairs():
+    rng = np.random.default_rng(1)
+    shared = rng.normal(0, 10, 256 * 6)
+    eeg = np.stack((shared, shared, rng.normal(0, 10, 256 * 6)))
+    tracker = CoherenceTracker(['AF7', 'AF8', 'TP9'])
+    assert np.isnan(tracker.values()['coherence_alpha_frontal'])
+    feed(tracker, eeg)
+    values = tracker.values()
+    assert values['coherence_alpha_frontal'] == pytest.approx(1.0)
+    assert np.isnan(values['coherence_alpha_temporal'])  # No TP10
@@ -0,0 +1,28 @@
+import numpy as np
+
+from eeg_codec import encode_block, decode_block, MUSE_UV_PER_LSB
+
+
+def test_device_codes_round_trip_exactly():
+    rng = np.random.default_rng(0)
+    codes = rng.integers(-2048, 2048, (512, 5))
+    data = (codes * MUSE_UV_PER_LSB).astype(np.float32)
+    times = 1000.0 + np.arange(512) / 256.0
+    decoded_times, decoded = decode_block(encode_block(times, data), 512, 5)
+    assert decoded.dtype == np.float32
+    assert np.array_equal(decoded, data)
+    assert np.max(np.abs(decoded_times - times)) <= 0.5e-6 + 1e-9
+
+
+def test_other_signals_round_to_the_step():
+    data = np.random.default_rng(1).normal(0, 50, (300, 4))
+    times = np.sort(np.random.default_rng(2).uniform(0, 2, 300))  # Irregular sampling
+    decoded_times, decoded = decode_block(encode_block(times, data), 300, 4)
+    assert np.max(np.abs(decoded - data)) <= MUSE_UV_PER_LSB / 2 + 1e-4
+    assert np.max(np.abs(decoded_times - times)) <= 0.5e-6 + 1e-9
+
+
+def test_large_jumps_fall_back_to_wide_codes():
+    data = np.array([[0.0], [40000.0], [-40000.0]])
+    _, decoded = decode_block(encode_block(np.arange(3.0), data), 3, 1)
+    assert np.array_equal(decoded, data.astype(np.float32))
@@ -0,0 +1,39 @@
+import numpy as np
+
+from eeg_overview import MinMaxPyramid
+
+
+def filled(n, channels=2, capacity=64, seed=0):
+    values = np.random.default_rng(seed).normal(0, 20, (channels, n)).astype(np.float32)
+    times = np.arange(n) / 256.0
+    pyramid = MinMaxPyramid(channels, capacity=capacity)
+    for i in range(n):
+        pyramid.add(values[:, i], times[i])
+    return pyramid, values, times
+
+
+def test_short_spans_return_raw_samples():
+    pyramid, values, times = filled(1000)
+    t, v = pyramid.read(times[100], times[299], pixels=800)
+    assert np.array_equal(t, times[100:300])
+    assert np.array_equal(v, values[:, 100:300])
+
+
+def test_long_spans_return_min_max_envelope():
+    pyramid, values, times = filled(5003)  # Leaves an unfinished bucket at the end
+    t, v = pyramid.read(times[0], times[-1], pixels=100)
+    size = 64  # Finest level with at most 100 buckets over 5003 samples
+    buckets = -(-5003 // size)
+    assert v.shape[1] == 2 * buckets
+    for b in range(buckets):
+        chunk = values[:, b * size:(b + 1) * size]
+        assert np.array_equal(v[:, 2 * b], chunk.min(axis=1))
+        assert np.array_equal(v[:, 2 * b + 1], chunk.max(axis=1))
+        assert t[2 * b] == times[b * size]
+    assert v.max() == values.max() and v.min() == values.min()
+
+
+def test_empty_range():
+    pyramid, _, _ = filled(10)
+    t, v = pyramid.read(100.0, 200.0, pixels=100)
+    assert t.size == 0 and v.shape == (2, 0)
@@ -0,0 +1,39 @@
+import math
+
+import numpy as np
+import pytest
+
+from heart_rate import HeartRateEngine, heart_score, HEART_REFERENCE, PPG_RATE
+
+
+def ppg(intervals, rate=PPG_RATE, tail=1.0):
+    """Infrared PPG with a pulse (dip in reflected light) at every beat"""
+    beats = 1.0 + np.cumsum(intervals)
+    times = np.arange(0.0, beats[-1] + tail, 1.0 / rate)
+    pulses = np.exp(-((times[:, None] - beats) / 0.08) ** 2).sum(axis=1)
+    samples = np.zeros((len(times), 3))
+    samples[:, 1] = 5000.0 - 200.0 * pulses
+    return samples, times
+
+
+def test_heart_rate_and_rmssd_from_alternating_intervals():
+    engine = HeartRateEngine()
+    engine.add_chunk(*ppg([0.8, 0.85] * 30))
+    summary = engine.summary()
+    assert summary['heart_rate'] == pytest.approx(60 / 0.85, rel=0.03)
+    assert summary['rmssd'] == pytest.approx(50.0, rel=0.15)
+    assert engine.beats > 50
+
+
+def test_heart_rate_goes_unknown_without_beats():
+    engine = HeartRateEngine()
+    engine.add_chunk(*ppg([0.8] * 20, tail=8.0))
+    summary = engine.summary()
+    assert math.isnan(summary['heart_rate']) and math.isnan(summary['rmssd'])
+
+
+def test_heart_score_range():
+    assert heart_score(HEART_REFERENCE) == pytest.approx(50.0)
+    assert heart_score({'heart_rate': 60.0, 'rmssd': 100.0}) == 100.0
+    assert heart_score({'heart_rate': 90.0, 'rmssd': 0.0}) == 0.0
+    assert math.isnan(heart_score({'heart_rate': math.nan, 'rmssd': 40.0}))
@@ -0,0 +1,79 @@
+import numpy as np
+
+from meditation_analyzer import MeditationAnalyzer, UNSCORED_LABELS, MOTION_LABEL, score_windows
+from motion_gate import MotionEstimator
+
+
+def still_acc(t_end, rate=52.0):
+    motion = MotionEstimator()
+    times = np.arange(0.0, t_end, 1.0 / rate)
+    motion.add_chunk(np.tile([0.0, 0.0, 1.0], (len(times), 1)), times)
+    return motion
+
+
+def fed_analyzer(seconds=10, seed=0):
+    analyzer = MeditationAnalyzer()
+    eeg = np.random.default_rng(seed).normal(0, 20, (256 * seconds, 5))
+    analyzer.add_samples(eeg, np.arange(len(eeg)) / 256)
+    return analyzer, eeg
+
+
+def test_live_score_matches_batch():
+    analyzer, eeg = fed_analyzer()
+    score, state = analyzer.calculate_meditation_score()
+    window = analyzer.buffer_size
+    batch = score_windows(eeg.T, window, 256, analyzer.channels)
+    # The live window is the newest buffer_size samples: the last batch window
+    assert batch['end'][-1] == len(eeg) - 1
+    for column in ('rms', 'smoothness', 'sync', 'stability', 'score'):
+        assert analyzer.last_result[column] == batch[column][-1]
+    assert score == batch['score'][-1]
+
+
+def test_score_is_stamped_with_window_end():
+    analyzer, _ = fed_analyzer()
+    analyzer.calculate_meditation_score()
+    assert analyzer.last_score_timestamp == analyzer.last_timestamp
+
+
+def test_gated_score_is_stamped_with_acc_covered_end():
+    analyzer, _ = fed_analyzer()
+    analyzer.motion = still_acc(9.3)  # ACC trails the EEG by ~0.7s
+    score, state = analyzer.calculate_meditation_score()
+    assert state not in UNSCORED_LABELS
+    end = analyzer.time_ring[(analyzer.snapshot_end - 1) % analyzer.ring_capacity]
+    assert analyzer.last_score_timestamp == end
+    assert analyzer.last_score_timestamp <= analyzer.motion.last_time < analyzer.last_timestamp
+
+
+def test_stale_acc_pauses_gating_instead_of_scoring():
+    analyzer, _ = fed_analyzer()
+    analyzer.motion = still_acc(5.0)  # ACC stopped 5s ago
+    score, state = analyzer.calculate_meditation_score()
+    assert state not in UNSCORED_LABELS
+    assert analyzer.motion_paused
+    assert analyzer.last_score_timestamp == analyzer.last_timestamp
+
+    analyzer.motion = still_acc(9.9)
+    analyzer.calculate_meditation_score()
+    assert not analyzer.motion_paused
+
+
+def test_window_with_motion_is_not_scored():
+    analyzer, _ = fed_analyzer()
+    analyzer.motion = still_acc(9.9)
+    analyzer.motion.spans.append((8.0, 8.5))
+    score, state = analyzer.calculate_meditation_score()
+    assert state == MOTION_LABEL
+
+
+def test_snapshot_is_the_newest_samples_in_order():
+    analyzer = MeditationAnalyzer()
+    eeg = np.arange(5 * 5000, dtype=float).reshape(5000, 5)
+    for start in range(0, 3000, 100):  # Block writes that wrap the ring
+        analyzer.add_samples(eeg[start:start + 100], np.arange(start, start + 100) / 256)
+    for i in range(3000, 5000):
+        analyzer.add_sample(eeg[i], i / 256)
+    assert np.array_equal(analyzer.snapshot(analyzer.buffer_size), eeg[-analyzer.buffer_size:].T)
+    assert np.array_equal(analyzer.snapshot(100, end_time=4500 / 256), eeg[4401:4501].T)
+    assert analyzer.snapshot_end == 4501
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from metrics import evaluate, metric, METRICS, WindowData
+
+CHANNELS = ('TP9', 'AF7', 'AF8', 'TP10')
+
+
+def windows(n_windows=6, n_samples=512, seed=0):
+    return np.random.default_rng(seed).normal(0, 20, (len(CHANNELS), n_windows, n_samples))
+
+
+def test_single_window_matches_its_batch_row():
+    signal = windows()
+    names = ['rms', 'smoothness', 'sync', 'stability', 'focus_index', 'alpha_asymmetry']
+    batch = evaluate(names, signal, CHANNELS)
+    for w in range(signal.shape[1]):
+        single = evaluate(names, signal[:, w:w + 1], CHANNELS)
+        for name in names:
+            assert single[name][0] == batch[name][w], name
+
+
+def test_missing_channels_are_an_error():
+    with pytest.raises(ValueError):
+        evaluate(['rms'], windows()[:2], ('TP9', 'AF7'))
+    assert evaluate([], windows(), CHANNELS) == {}
+
+
+def test_intermediates_are_shared_between_metrics(monkeypatch):
+    calls = []
+    original = WindowData.intermediate
+
+    def counting(self, name):
+        if name not in self.cache:
+            calls.append(name)
+        return original(self, name)
+
+    monkeypatch.setattr(WindowData, 'intermediate', counting)
+    evaluate(['rms', 'stability', 'focus_index', 'alpha_asymmetry'], windows(), CHANNELS)
+    assert sorted(calls) == ['fft', 'spectrum', 'squared']
+
+
+def test_registered_metric_reads_only_its_channels():
+    @metric('test_tp_power', channels=('TP9', 'TP10'), needs=('squared',))
+    def tp_power(data):
+        assert data.channels == ['TP9', 'TP10']
+        return data.get('squared', 'TP9').mean(axis=1) + data.get('squared', 'TP10').mean(axis=1)
+
+    try:
+        signal = windows()
+        result = evaluate(['test_tp_power'], signal, CHANNELS)['test_tp_power']
+        assert np.allclose(result, (signal[0] ** 2).mean(axis=1) + (signal[3] ** 2).mean(axis=1))
+    finally:
+        del METRICS['test_tp_power']
+
@@ -0,0 +1,40 @@
+import numpy as np
+
+from motion_gate import MotionEstimator
+
+
+def acc(seconds, shake=None, rate=52.0):
+    """Still head (gravity on z), optionally shaken during (start, end)"""
+    times = np.arange(0.0, seconds, 1.0 / rate)
+    samples = np.tile([0.0, 0.0, 1.0], (len(times), 1))
+    if shake is not None:
+        inside = (times >= shake[0]) & (times < shake[1])
+        samples[inside, 0] += 0.3 * np.sin(2 * np.pi * 3 * times[inside])
+    return samples, times
+
+
+def test_still_head_never_moves():
+    motion = MotionEstimator()
+    motion.add_chunk(*acc(10))
+    assert motion.motion < 1e-9
+    assert not motion.motion_between(0.0, 10.0)
+    assert motion.last_time == acc(10)[1][-1]
+
+
+def test_shake_is_kept_as_a_span():
+    motion = MotionEstimator()
+    motion.add_chunk(*acc(10, shake=(4.0, 5.0)))
+    assert len(motion.spans) == 1
+    start, end = motion.spans[0]
+    assert 4.0 <= start < 4.5 and 5.0 <= end < 6.0
+    assert motion.motion_between(3.0, 4.5)
+    assert not motion.motion_between(0.0, 3.9)
+    assert not motion.motion_between(6.0, 10.0)
+
+
+def test_ongoing_motion_counts_up_to_now():
+    motion = MotionEstimator()
+    motion.add_chunk(*acc(10, shake=(8.0, 10.0)))
+    assert motion.moving_since is not None
+    assert motion.motion_between(9.0, 12.0)
+    assert not motion.motion_between(0.0, 7.9)
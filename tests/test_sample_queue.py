@@ -0,0 +1,42 @@
+import pytest
+
+from sample_queue import BoundedSampleQueue
+
+
+def test_wakes_consumer_only_when_queue_was_empty():
+    queue = BoundedSampleQueue(maxsize=4)
+    assert queue.put(1)
+    assert not queue.put(2)
+    assert queue.drain() == [1, 2]
+    assert queue.put(3)
+
+
+def test_drop_oldest_keeps_the_newest_samples():
+    queue = BoundedSampleQueue(maxsize=3, policy='drop_oldest')
+    for i in range(5):
+        queue.put(i)
+    assert queue.drain() == [2, 3, 4]
+    assert queue.stats()['dropped'] == 2
+
+
+def test_coalesce_replaces_the_newest_sample():
+    queue = BoundedSampleQueue(maxsize=2, policy='coalesce')
+    for i in range(4):
+        queue.put(i)
+    assert queue.drain() == [0, 3]
+    assert queue.stats()['coalesced'] == 2
+
+
+def test_block_falls_back_to_dropping_after_timeout():
+    queue = BoundedSampleQueue(maxsize=1, policy='block', block_timeout=0.01)
+    queue.put(0)
+    queue.put(1)
+    stats = queue.stats()
+    assert queue.drain() == [1]
+    assert stats['dropped'] == 1 and stats['blocked_time'] > 0
+    assert stats['high_watermark'] == 1
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        BoundedSampleQueue(policy='grow')
@@ -0,0 +1,53 @@
+import numpy as np
+
+from score_history import ScoreHistory
+
+
+def fill(history, seconds, seed=0):
+    times = 100.0 + np.arange(seconds) + 0.5
+    scores = np.random.default_rng(seed).uniform(0, 100, seconds)
+    for t, s in zip(times, scores):
+        history.add(t, s)
+    return scores
+
+
+def test_tiers_roll_up_the_base_scores():
+    history = ScoreHistory(origin=100.0)
+    scores = fill(history, 1200)
+    for period in (10, 60, 600):
+        result = history.query(100.0, 1299.0, period=period)
+        buckets = scores.reshape(-1, period)
+        assert np.array_equal(result['count'], np.full(len(buckets), period))
+        assert np.array_equal(result['min'], buckets.min(axis=1))
+        assert np.array_equal(result['max'], buckets.max(axis=1))
+        assert np.allclose(result['mean'], buckets.mean(axis=1))
+        assert np.array_equal(result['time'], 100.0 + np.arange(len(buckets)) * period)
+
+
+def test_choose_tier_caps_points():
+    history = ScoreHistory(origin=100.0)
+    fill(history, 1200)
+    assert history.query(100.0, 1299.0, max_points=600)['period'] == 10
+    assert history.query(100.0, 400.0, max_points=600)['period'] == 1
+
+
+def test_spilled_rows_read_back_from_disk(tmp_path):
+    history = ScoreHistory(origin=100.0, capacity=100, spill_dir=str(tmp_path))
+    scores = fill(history, 450)
+    base = history.tier(1)
+    assert base.spilled > 0 and base.first > 0
+    result = history.query(100.0, 549.0, period=1)
+    assert np.array_equal(result['mean'], scores)
+
+    history.close()
+    on_disk = np.fromfile(tmp_path / 'tier_1s.bin').reshape(-1, 4)
+    assert np.array_equal(on_disk[:, 0], scores)
+
+
+def test_without_spill_dir_old_rows_are_dropped():
+    history = ScoreHistory(origin=100.0, capacity=100)
+    scores = fill(history, 450)
+    result = history.query(100.0, 549.0, period=1)
+    kept = result['count'] > 0
+    assert not kept[0] and kept[-1]
+    assert np.array_equal(result['mean'][kept], scores[kept])
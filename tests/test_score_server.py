@@ -0,0 +1,47 @@
+import json
+import socket
+import struct
+import time
+
+import pytest
+
+from score_server import ScoreServer, SERVER_FIELDS
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize('encoding', ['json', 'binary'])
+def test_subscribers_receive_header_and_records(encoding):
+    server = ScoreServer(port=0, encoding=encoding).start()
+    try:
+        clients = [socket.create_connection(('127.0.0.1', server.port), timeout=2.0) for _ in range(2)]
+        streams = [client.makefile('rb') for client in clients]
+        headers = [json.loads(stream.readline()) for stream in streams]
+        wait_for(lambda: server.stats()['clients'] == 2)
+
+        result = {field: float(i) for i, field in enumerate(SERVER_FIELDS)}
+        server.publish_result(result, timestamp=1234.5, calibrated=True)
+        for header, stream in zip(headers, streams):
+            assert header['fields'] == SERVER_FIELDS
+            if encoding == 'binary':
+                record = struct.Struct(header['record_format'])
+                values = dict(zip(header['fields'], record.unpack(stream.read(record.size))))
+            else:
+                values = json.loads(stream.readline())
+            assert values['timestamp'] == 1234.5 and values['calibrated'] == 1.0
+            assert values['score'] == result['score']
+        for client in clients:
+            client.close()
+    finally:
+        server.stop()
+    assert server.stats()['published'] == 1
+
+
+def test_unknown_encoding_is_rejected():
+    with pytest.raises(ValueError):
+        ScoreServer(encoding='xml')
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from eeg_codec import MUSE_UV_PER_LSB
+from session_archive import SessionWriter, Session, SessionArchive, SCORE_COLUMNS
+
+CHANNELS = ['TP9', 'AF7', 'AF8', 'TP10']
+
+
+def record(path, codec='float32', seconds=20, rate=256):
+    times = 500.0 + np.arange(seconds * rate) / rate
+    codes = np.random.default_rng(0).integers(-200, 200, (len(times), len(CHANNELS)))
+    data = (codes * MUSE_UV_PER_LSB).astype(np.float32)
+    burst = slice(rate * 8, rate * 12)  # Alpha burst on AF7, on the ADC grid
+    data[burst, 1] += np.round(80 * np.sin(2 * np.pi * 10 * times[burst])) * MUSE_UV_PER_LSB
+    writer = SessionWriter(str(path), CHANNELS, rate, codec=codec, block_size=512)
+    for start in range(0, len(times), 100):  # Chunks that straddle blocks
+        writer.append_samples(times[start:start + 100], data[start:start + 100])
+    for t in times[::512]:
+        writer.append_score(dict(dict.fromkeys(SCORE_COLUMNS, 1.0), timestamp=t))
+    writer.close()
+    return times, data.astype(np.float32)
+
+
+@pytest.mark.parametrize('codec', ['float32', 'delta'])
+def test_time_range_query_returns_exact_samples(tmp_path, codec):
+    times, data = record(tmp_path / 's1', codec)
+    session = Session(str(tmp_path / 's1'))
+    t, d = session.raw(503.1, 507.9, channels=['AF8', 'TP9'])
+    mask = (times >= 503.1) & (times <= 507.9)
+    assert np.allclose(t, times[mask], rtol=0, atol=0.5e-6 + 1e-9)
+    assert np.array_equal(d, data[mask][:, [2, 0]])
+
+    t, _ = session.raw_minutes(0, 1)
+    assert len(t) == len(times)
+    assert session.end_time == times[-1]
+
+
+def test_scores_are_selected_by_time(tmp_path):
+    times, _ = record(tmp_path / 's1')
+    scores = Session(str(tmp_path / 's1')).scores(504.0, 510.0)
+    expected = times[::512]
+    assert np.array_equal(scores['timestamp'], expected[(expected >= 504.0) & (expected <= 510.0)])
+
+
+def test_find_blocks_uses_the_index_only(tmp_path):
+    record(tmp_path / 's1')
+    matches = SessionArchive(str(tmp_path)).find_blocks('alpha', 'AF7', above=100.0)
+    starts = [m['start'] for m in matches]
+    assert starts and all(508.0 <= s < 512.0 for s in starts)
@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+import pytest
+
+from shared_ring_buffer import SharedRingBuffer
+
+
+@pytest.fixture
+def ring():
+    buffer = SharedRingBuffer.create(f"test_ring_{os.getpid()}", 8, 2, ['timestamp', 'TP9'], 256.0)
+    yield buffer
+    buffer.close()
+
+
+def rows(start, stop):
+    return np.column_stack((np.arange(start, stop), -np.arange(start, stop))).astype(float)
+
+
+def test_reader_sees_rows_in_order_and_tracks_sequence(ring):
+    reader = SharedRingBuffer.attach(ring.shm.name)
+    try:
+        assert reader.labels == ['timestamp', 'TP9'] and reader.rate == 256.0
+        ring.write(rows(0, 5))
+        out, seq, lost = reader.read_since(0)
+        assert np.array_equal(out, rows(0, 5)) and (seq, lost) == (5, 0)
+        out, seq, lost = reader.read_since(seq)
+        assert len(out) == 0 and (seq, lost) == (5, 0)
+
+        ring.write(rows(5, 11))  # Wraps around the end of the ring
+        out, seq, lost = reader.read_since(seq)
+        assert np.array_equal(out, rows(5, 11)) and (seq, lost) == (11, 0)
+    finally:
+        reader.close()
+
+
+def test_lagging_reader_skips_overwritten_rows(ring):
+    ring.write(rows(0, 20))
+    out, seq, lost = ring.read_since(3)
+    assert np.array_equal(out, rows(12, 20))
+    assert (seq, lost) == (20, 9)
+
+
+def test_oversized_write_keeps_the_newest_rows(ring):
+    ring.write(rows(0, 3))
+    ring.write(rows(3, 30))
+    assert ring.write_seq == 30
+    assert np.array_equal(ring.latest(100), rows(22, 30))
+    assert np.array_equal(ring.latest(2), rows(28, 30))
+
+
+def test_max_rows_pages_through_the_backlog(ring):
+    ring.write(rows(0, 6))
+    out, seq, _ = ring.read_since(0, max_rows=4)
+    assert np.array_equal(out, rows(0, 4)) and seq == 4
+    out, seq, _ = ring.read_since(seq, max_rows=4)
+    assert np.array_equal(out, rows(4, 6)) and seq == 6
+
+
+def test_control_and_status_words(ring):
+    reader = SharedRingBuffer.attach(ring.shm.name)
+    try:
+        reader.set_control(2)
+        assert ring.take_control() == 2 and ring.take_control() == 0
+        ring.set_status(3)
+        assert reader.status == 3 and not reader.closed
+    finally:
+        reader.close()
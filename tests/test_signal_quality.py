@@ -0,0 +1,32 @@
+import numpy as np
+
+from metrics import evaluate
+from signal_quality import channel_quality, quality_label, QUALITY_GOOD
+
+CHANNELS = ('TP9', 'AF7', 'AF8', 'TP10')
+
+
+def test_contact_problems_lower_the_index():
+    rng = np.random.default_rng(0)
+    t = np.arange(512) / 256
+    good = rng.normal(0, 20, 512)
+    block = np.stack((good,
+                      np.zeros(512),                              # Flat line
+                      good + 200 * np.sin(2 * np.pi * 50 * t),    # Mains hum
+                      rng.normal(0, 500, 512)))                   # Artifacts
+    quality = channel_quality(block)
+    assert quality[0] >= QUALITY_GOOD and quality_label(quality[0]) == "good"
+    assert quality[1] == 0.0
+    assert quality[2] < 0.5 and quality_label(quality[2]) == "poor"
+    assert quality[3] < 0.5
+
+
+def test_quality_weighting_favours_the_good_channel():
+    signal = np.random.default_rng(0).normal(0, 20, (len(CHANNELS), 6, 512))
+    plain = evaluate(['rms'], signal, CHANNELS)['rms']
+    assert np.array_equal(evaluate(['rms'], signal, CHANNELS, weighted=True)['rms'], plain)
+
+    signal[2] = 0.0  # AF8 lifted off: flat line
+    weighted = evaluate(['rms'], signal, CHANNELS, weighted=True)['rms']
+    af7 = np.sqrt(np.mean(signal[1] ** 2, axis=1))
+    assert np.allclose(weighted, af7, rtol=1e-2)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from spectrogram import RollingSpectrogram
+
+
+def test_columns_match_a_direct_stft():
+    rate = 256
+    t = np.arange(rate * 5) / rate
+    signal = 20 * np.sin(2 * np.pi * 10 * t) + np.random.default_rng(0).normal(0, 2, len(t))
+    spectrogram = RollingSpectrogram(rate, seconds=10.0)
+    for value in signal:
+        spectrogram.add(value)
+
+    # One column per hop once the first full segment is in
+    ends = np.arange(spectrogram.segment, len(signal) + 1, spectrogram.hop)
+    assert spectrogram.column_count == len(ends)
+    image = spectrogram.image()
+    assert image.shape == (spectrogram.columns, spectrogram.bins)
+
+    taper = np.hanning(spectrogram.segment)
+    for k, end in enumerate(ends):
+        segment = signal[end - spectrogram.segment:end]
+        power = spectrogram.scale * np.abs(np.fft.rfft((segment - segment.mean()) * taper)) ** 2
+        expected = 10 * np.log10(power[:spectrogram.bins] + 1e-12)
+        assert np.allclose(image[spectrogram.columns - len(ends) + k], expected)
+
+    peak = np.argmax(image[-1])
+    assert np.fft.rfftfreq(spectrogram.segment, 1 / rate)[peak] == pytest.approx(10.0)
+
+
+def test_image_scrolls_without_copying():
+    spectrogram = RollingSpectrogram(256, seconds=2.0)
+    for i in range(256 * 10):
+        spectrogram.add(float(i % 7))
+    assert spectrogram.column_count > spectrogram.columns
+    assert np.shares_memory(spectrogram.image(), spectrogram.buffer)
+    low, high = spectrogram.levels()
+    assert high >= low + 1.0
+
+
+def test_hop_follows_the_stream_rate():
+    spectrogram = RollingSpectrogram(250, seconds=300.0)
+    assert spectrogram.hop == 62
+    assert spectrogram.seconds == pytest.approx(300.0, abs=spectrogram.hop_seconds)
@@ -0,0 +1,43 @@
+import numpy as np
+
+from stream_timeline import TimelineMonitor
+
+
+def jittered_clock(n, seed=0, rate=256.0):
+    return 10.0 + np.arange(n) / rate + np.random.default_rng(seed).normal(0, 0.2e-3, n)
+
+
+def feed(monitor, times, chunk=12):
+    out = [monitor.add(times[i:i + chunk])[0] for i in range(0, len(times), chunk)]
+    return np.concatenate(out)
+
+
+def test_dropped_packets_are_counted_as_one_gap():
+    times = jittered_clock(2560)
+    kept = np.delete(times, np.arange(1200, 1250))  # 50 samples lost
+    monitor = TimelineMonitor(report_interval=5.0)
+    feed(monitor, kept)
+    report = monitor.reports[0]
+    assert report['gaps'] == 1
+    assert report['missing_samples'] == 50
+
+
+def test_single_late_sample_is_jitter_not_a_gap():
+    times = jittered_clock(2560)
+    times[700] += 30e-3  # One sample held back well beyond the gap threshold
+    monitor = TimelineMonitor(report_interval=5.0)
+    feed(monitor, times)
+    assert monitor.reports[0]['gaps'] == 0
+
+
+def test_dejittered_times_follow_the_ideal_clock():
+    times = jittered_clock(2560)
+    monitor = TimelineMonitor(report_interval=5.0)
+    dejittered = feed(monitor, times)
+    assert len(dejittered) == len(times)
+    assert np.all(np.diff(dejittered) > 0)
+    ideal = 10.0 + np.arange(2560) / 256.0
+    assert np.std(dejittered - ideal) < np.std(times - ideal) / 4
+    report = monitor.reports[0]
+    assert abs(report['effective_rate'] - 256.0) < 1.0
+    assert 0.1 < report['jitter_ms'] < 0.4
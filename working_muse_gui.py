@@ -10,17 +10,39 @@ Not intended for medical diagnosis or treatment. Use at your own risk.
 Always consult qualified medical professionals for health-related concerns.
 """
 
+import os
 import sys
+import argparse
+import getpass
 import numpy as np
 import time
 import threading
-from collections import deque
-from pylsl import resolve_streams, StreamInlet
+from pylsl import resolve_streams, StreamInlet, proc_clocksync
+
+from meditation_analyzer import (MeditationAnalyzer, MUSE_CHANNELS, UNSCORED_LABELS, NO_NEW_SCORE_LABEL,
+                                 COLLECTING_LABEL, state_label)
+from motion_gate import MotionEstimator, MOTION_THRESHOLD
+from heart_rate import HeartRateEngine, PPG_RATE
+from shared_ring_buffer import SharedRingBuffer
+from sample_queue import BoundedSampleQueue, OVERFLOW_POLICIES
+from stream_timeline import TimelineMonitor, format_report
+from score_history import ScoreHistory
+from session_archive import SessionWriter, DEFAULT_SESSION_DIR, CODECS
+from session_export import export_session, PARQUET_AVAILABLE
+from score_outlet import ScoreOutlet
+from score_server import ScoreServer, ENCODINGS
+from calibration import BaselineStore
+from multi_headset import device_address
+from stream_profiler import channel_map, open_inlet
+from signal_quality import channel_quality, quality_label
+from spectrogram import RollingSpectrogram, SPECTROGRAM_SECONDS, MAX_FREQUENCY
+from eeg_overview import MinMaxPyramid
+import muse_ingest
 
 # Qt imports
 try:
     from PyQt5.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QPushButton, QLabel, QTextEdit, QProgressBar
-    from PyQt5.QtCore import QTimer, pyqtSignal, QObject
+    from PyQt5.QtCore import QTimer, QRectF, pyqtSignal, QObject
     from PyQt5.QtGui import QFont
     import pyqtgraph as pg
     QT_AVAILABLE = True
@@ -39,210 +61,30 @@ except ImportError as e:
     MUSE_AVAILABLE = False
 
 
-class MeditationAnalyzer:
-    """Real-time meditation analysis from EEG data"""
-    def __init__(self, sample_rate=256):
-        self.sample_rate = sample_rate
-        self.buffer_size = 3 * sample_rate  # 3 seconds of data
-        self.eeg_buffer = {
-            'TP9': deque(maxlen=self.buffer_size),
-            'AF7': deque(maxlen=self.buffer_size),
-            'AF8': deque(maxlen=self.buffer_size),
-            'TP10': deque(maxlen=self.buffer_size)
-        }
-        self.lock = threading.Lock()
-        
-        # Calibration data
-        self.is_calibrated = False
-        self.calibration_baseline = {
-            'avg_rms': 50.0,     # Default baseline RMS
-            'smoothness': 0.01,   # Default smoothness baseline
-            'sync': 0.3          # Default synchronization baseline
-        }
-        self.calibration_buffer = {
-            'TP9': [],
-            'AF7': [],
-            'AF8': [],
-            'TP10': []
-        }
-        
-    def start_calibration(self):
-        """Start calibration data collection"""
-        self.calibration_buffer = {'TP9': [], 'AF7': [], 'AF8': [], 'TP10': []}
-        self.is_calibrated = False
-        
-    def add_calibration_sample(self, sample):
-        """Add sample during calibration"""
-        channels = ['TP9', 'AF7', 'AF8', 'TP10']
-        for i, channel in enumerate(channels):
-            if i < len(sample):
-                self.calibration_buffer[channel].append(sample[i])
-                
-    def finish_calibration(self):
-        """Complete calibration and set baseline values"""
-        if len(self.calibration_buffer['AF7']) < 256:  # Need at least 1 second
-            return False, "Not enough calibration data"
-            
-        try:
-            # Calculate baseline values from calibration data
-            af7_data = np.array(self.calibration_buffer['AF7'])
-            af8_data = np.array(self.calibration_buffer['AF8'])
-            
-            # Baseline RMS
-            af7_rms = np.sqrt(np.mean(af7_data ** 2))
-            af8_rms = np.sqrt(np.mean(af8_data ** 2))
-            self.calibration_baseline['avg_rms'] = (af7_rms + af8_rms) / 2
-            
-            # Baseline smoothness
-            af7_diff = np.diff(af7_data)
-            af8_diff = np.diff(af8_data)
-            af7_smoothness = 1.0 / (1.0 + np.var(af7_diff))
-            af8_smoothness = 1.0 / (1.0 + np.var(af8_diff))
-            self.calibration_baseline['smoothness'] = (af7_smoothness + af8_smoothness) / 2
-            
-            # Baseline synchronization
-            if len(af7_data) > 100 and len(af8_data) > 100:
-                correlation = np.corrcoef(af7_data, af8_data)[0, 1]
-                if not np.isnan(correlation):
-                    self.calibration_baseline['sync'] = abs(correlation)
-            
-            self.is_calibrated = True
-            return True, f"Calibration complete! Baseline RMS: {self.calibration_baseline['avg_rms']:.1f}µV"
-            
-        except Exception as e:
-            return False, f"Calibration failed: {e}"
-        
-    def add_sample(self, sample):
-        """Add EEG sample for analysis"""
-        with self.lock:
-            channels = ['TP9', 'AF7', 'AF8', 'TP10']
-            for i, channel in enumerate(channels):
-                if i < len(sample):
-                    self.eeg_buffer[channel].append(sample[i])
-                
-    def calculate_meditation_score(self):
-        """Calculate meditation score from EEG data using research-based approach"""
-        with self.lock:
-            if len(self.eeg_buffer['AF7']) < 256:  # Need at least 1 second
-                return 0.0, "Collecting data..."
-                
-            # Use frontal channels for meditation analysis
-            af7_data = np.array(list(self.eeg_buffer['AF7'])[-768:])  # Last 3 seconds
-            af8_data = np.array(list(self.eeg_buffer['AF8'])[-768:])
-            
-            if len(af7_data) < 256:
-                return 0.0, "Collecting data..."
-            
-            # Research-based meditation indicators:
-            # 1. Signal amplitude (high amplitude = more mental activity)
-            # 2. Signal smoothness (jagged = more active, smooth = more relaxed)
-            # 3. Cross-channel coherence (synchronized = more meditative)
-            
-            # Calculate RMS (Root Mean Square) for signal strength
-            af7_rms = np.sqrt(np.mean(af7_data ** 2))
-            af8_rms = np.sqrt(np.mean(af8_data ** 2))
-            avg_rms = (af7_rms + af8_rms) / 2
-            
-            # Calculate signal smoothness (derivative variance)
-            af7_diff = np.diff(af7_data)
-            af8_diff = np.diff(af8_data)
-            af7_smoothness = 1.0 / (1.0 + np.var(af7_diff))  # Inverse variance
-            af8_smoothness = 1.0 / (1.0 + np.var(af8_diff))
-            avg_smoothness = (af7_smoothness + af8_smoothness) / 2
-            
-            # Calculate cross-correlation (synchronization between hemispheres)
-            if len(af7_data) > 100 and len(af8_data) > 100:
-                correlation = np.corrcoef(af7_data, af8_data)[0, 1]
-                if np.isnan(correlation):
-                    correlation = 0
-                sync_factor = abs(correlation)  # Higher correlation = more synchronized
-            else:
-                sync_factor = 0
-            
-            # Use calibration baseline if available
-            if self.is_calibrated:
-                baseline_rms = self.calibration_baseline['avg_rms']
-                baseline_smoothness = self.calibration_baseline['smoothness']
-                baseline_sync = self.calibration_baseline['sync']
-                
-                # Relative amplitude scoring (compared to personal baseline)
-                rms_ratio = avg_rms / baseline_rms
-                if rms_ratio < 0.7:      # Much lower than baseline
-                    amplitude_score = 40
-                elif rms_ratio < 0.85:   # Somewhat lower
-                    amplitude_score = 30
-                elif rms_ratio < 1.15:   # Near baseline
-                    amplitude_score = 20
-                elif rms_ratio < 1.4:    # Somewhat higher
-                    amplitude_score = 10
-                else:                    # Much higher than baseline
-                    amplitude_score = 0
-                
-                # Relative smoothness scoring
-                smoothness_ratio = avg_smoothness / baseline_smoothness
-                smoothness_score = min(30, smoothness_ratio * 15)
-                
-                # Relative synchronization scoring
-                sync_ratio = sync_factor / baseline_sync if baseline_sync > 0 else 1.0
-                sync_score = min(20, sync_ratio * 15)
-                
-                meditation_state_suffix = " (Calibrated)"
-                
-            else:
-                # Default scoring without calibration
-                if avg_rms < 15:
-                    amplitude_score = 40
-                elif avg_rms < 30:
-                    amplitude_score = 25
-                elif avg_rms < 50:
-                    amplitude_score = 10
-                else:
-                    amplitude_score = 0
-                
-                smoothness_score = min(30, avg_smoothness * 1000)
-                sync_score = sync_factor * 20
-                meditation_state_suffix = " (Uncalibrated)"
-            
-            # Stability bonus - consistent readings over time
-            recent_rms = [np.sqrt(np.mean(af7_data[i:i+128] ** 2)) 
-                         for i in range(0, len(af7_data)-128, 64)]
-            if len(recent_rms) > 2:
-                stability = 1.0 / (1.0 + np.var(recent_rms))
-                stability_score = min(10, stability * 100)
-            else:
-                stability_score = 0
-            
-            # Combine scores
-            meditation_score = amplitude_score + smoothness_score + sync_score + stability_score
-            meditation_score = max(0, min(100, meditation_score))
-            
-            # Determine state with research-based thresholds
-            if meditation_score > 75:
-                state = "Deep Meditation" + meditation_state_suffix
-            elif meditation_score > 60:
-                state = "Calm/Relaxed" + meditation_state_suffix
-            elif meditation_score > 40:
-                state = "Mild Relaxation" + meditation_state_suffix
-            elif meditation_score > 25:
-                state = "Alert/Focused" + meditation_state_suffix
-            else:
-                state = "Active/Stressed" + meditation_state_suffix
-                
-            return meditation_score, state
-
-
 class LSLDataReceiver(QObject):
     """Receives data from LSL streams created by fixed muselsl"""
-    data_received = pyqtSignal(np.ndarray)
+    data_received = pyqtSignal(np.ndarray, float)  # sample, LSL timestamp
     status_update = pyqtSignal(str)
     connection_lost = pyqtSignal()
+    samples_ready = pyqtSignal()
     
-    def __init__(self):
+    def __init__(self, queue_size=1024, overflow_policy='block'):
         super().__init__()
         self.running = False
         self.inlet = None
+        self.source_id = ''
+        self.channels = list(MUSE_CHANNELS)  # Labels in sample order, from the stream
+        self.sample_rate = 256.0            # Nominal rate, from the stream
+        self.motion = None  # MotionEstimator fed from the ACC stream, if set
+        self.heart = None   # HeartRateEngine fed from the PPG stream, if set
         self.sample_count = 0
         self.last_sample_time = 0
+        self.timeline = None
+        
+        # Bounded hand-off to the GUI thread: one queued event per batch
+        # instead of one per sample, so a slow repaint can't grow the backlog
+        self.sample_queue = BoundedSampleQueue(queue_size, overflow_policy)
+        self.samples_ready.connect(self.drain_samples)
         
     def start_receiving(self):
         """Start receiving data from LSL stream"""
@@ -261,17 +103,51 @@ class LSLDataReceiver(QObject):
                     self.connection_lost.emit()
                     return
                 
-                self.inlet = StreamInlet(eeg_streams[0])
-                self.status_update.emit(f"Connected to: {eeg_streams[0].name()}")
+                # Timestamps are mapped onto the local LSL clock by the inlet
+                # (time_correction) and dejittered by the timeline monitor
+                self.inlet = StreamInlet(eeg_streams[0], processing_flags=proc_clocksync)
+                self.sample_rate = eeg_streams[0].nominal_srate() or 256.0
+                self.timeline = TimelineMonitor(self.sample_rate)
+                self.source_id = eeg_streams[0].source_id()
+                self.channels = channel_map(eeg_streams[0])
+                self.status_update.emit(f"Connected to: {eeg_streams[0].name()} "
+                                        f"({', '.join(self.channels)})")
+                
+                acc_inlet = open_inlet('ACC', self.source_id) if self.motion is not None else None
+                if self.motion is not None:
+                    self.status_update.emit("Motion gating on ACC stream" if acc_inlet is not None
+                                            else "No ACC stream found, motion gating disabled")
+                ppg_inlet = open_inlet('PPG', self.source_id) if self.heart is not None else None
+                if ppg_inlet is not None:
+                    self.heart.set_sample_rate(ppg_inlet.info().nominal_srate() or PPG_RATE)
+                    self.status_update.emit("Tracking heart rate and HRV on PPG stream")
                 
                 # Main data receiving loop
                 while self.running:
                     try:
-                        sample, timestamp = self.inlet.pull_sample(timeout=3.0)
-                        if sample and len(sample) >= 4:
+                        chunk, timestamps = self.inlet.pull_chunk(timeout=3.0, max_samples=64)
+                        if not timestamps:
+                            continue
+                        timestamps, report = self.timeline.add(timestamps)
+                        if report:
+                            self.status_update.emit(format_report(report))
+                        if acc_inlet is not None:
+                            acc_chunk, acc_timestamps = acc_inlet.pull_chunk(timeout=0.0)
+                            if acc_timestamps:
+                                self.motion.add_chunk(acc_chunk, acc_timestamps)
+                        self.last_sample_time = time.time()
+                        
+                        for sample, timestamp in zip(np.asarray(chunk, dtype=np.float64), timestamps):
                             self.sample_count += 1
-                            self.last_sample_time = time.time()
-                            self.data_received.emit(np.array(sample[:4]))  # First 4 channels
+                            # Every channel of the stream, including Right AUX
+                            if self.sample_queue.put((sample, timestamp)):
+                                self.samples_ready.emit()
+                                
+                        # After the EEG is handed on, so heart tracking never delays it
+                        if ppg_inlet is not None:
+                            ppg_chunk, ppg_timestamps = ppg_inlet.pull_chunk(timeout=0.0)
+                            if ppg_timestamps:
+                                self.heart.add_chunk(ppg_chunk, ppg_timestamps)
                     except Exception as e:
                         self.status_update.emit(f"Data receive error: {e}")
                         break
@@ -283,16 +159,171 @@ class LSLDataReceiver(QObject):
         thread = threading.Thread(target=receiver_thread, daemon=True)
         thread.start()
         
+    def drain_samples(self):
+        """Deliver every queued sample (runs in the GUI thread)"""
+        for sample, timestamp in self.sample_queue.drain():
+            self.data_received.emit(sample, timestamp)
+            
+    def queue_stats(self):
+        """Backlog and overflow counters of the GUI hand-off"""
+        return self.sample_queue.stats()
+        
     def stop_receiving(self):
         """Stop receiving data"""
         self.running = False
+        self.sample_queue.drain()
         self.status_update.emit("Stopped receiving LSL data")
 
 
+class SharedMemoryReceiver(QObject):
+    """Receives samples published by muse_ingest.py through shared memory"""
+    data_received = pyqtSignal(np.ndarray, float)  # sample, LSL timestamp
+    status_update = pyqtSignal(str)
+    connection_lost = pyqtSignal()
+    
+    def __init__(self, name, attach_timeout=20.0):
+        super().__init__()
+        self.name = name
+        self.attach_timeout = attach_timeout
+        self.sample_buffer = None
+        self.score_buffer = None
+        self.read_seq = 0
+        self.channels = list(MUSE_CHANNELS)
+        self.sample_rate = 256.0
+        self.sample_count = 0
+        self.lost_samples = 0
+        self.attach_deadline = 0
+        
+        self.poll_timer = QTimer(self)
+        self.poll_timer.timeout.connect(self.poll)
+        
+    def start_receiving(self):
+        """Start polling the shared ring buffers"""
+        self.status_update.emit(f"Attaching to shared memory '{self.name}'...")
+        self.attach_deadline = time.time() + self.attach_timeout
+        self.poll_timer.start(30)
+        
+    def attach(self):
+        """Attach to the ingest process buffers, returns True once attached"""
+        try:
+            self.sample_buffer = SharedRingBuffer.attach(muse_ingest.sample_buffer_name(self.name))
+            self.score_buffer = SharedRingBuffer.attach(muse_ingest.score_buffer_name(self.name))
+        except FileNotFoundError:
+            self.close_buffers()
+            return False
+        
+        # Rows are the LSL timestamp followed by the stream's channels, in the
+        # order the ingest process resolved from the stream (Muse order if unlabelled)
+        labels = self.sample_buffer.labels
+        self.channels = labels[1:] if labels else list(MUSE_CHANNELS)[:self.sample_buffer.width - 1]
+        self.sample_rate = self.sample_buffer.rate or 256.0
+        
+        # Start a few seconds back so the plots fill immediately
+        self.read_seq = max(0, self.sample_buffer.write_seq - 2048)
+        self.status_update.emit(f"Connected to: shared memory '{self.name}'")
+        return True
+        
+    def poll(self):
+        """Copy newly published samples and hand them to the GUI"""
+        if self.sample_buffer is None and not self.attach():
+            if time.time() > self.attach_deadline:
+                self.poll_timer.stop()
+                self.status_update.emit(f"No ingest process found for '{self.name}'")
+                self.connection_lost.emit()
+            return
+        
+        rows, self.read_seq, lost = self.sample_buffer.read_since(self.read_seq)
+        if lost:
+            # Only this viewer skipped ahead; the ingest process lost nothing
+            self.lost_samples += lost
+            self.status_update.emit(f"Viewer skipped {lost} samples (ingest unaffected)")
+        
+        for row in rows:
+            self.sample_count += 1
+            self.data_received.emit(row[1:], row[0])  # All channels, LSL timestamp
+            
+        if self.sample_buffer.closed:
+            self.poll_timer.stop()
+            self.status_update.emit("Ingest process closed the shared memory")
+            self.close_buffers()
+            self.connection_lost.emit()
+            
+    def close_buffers(self):
+        for buffer in (self.sample_buffer, self.score_buffer):
+            if buffer is not None:
+                buffer.close()
+        self.sample_buffer = None
+        self.score_buffer = None
+        
+    def stop_receiving(self):
+        """Stop polling and detach from shared memory"""
+        self.poll_timer.stop()
+        self.close_buffers()
+        self.status_update.emit("Stopped reading shared memory")
+
+
+class SharedScoreView:
+    """Stands in for MeditationAnalyzer when scores come from the ingest process"""
+    
+    def __init__(self, receiver):
+        self.receiver = receiver
+        self.is_calibrated = False
+        self.last_score_timestamp = None
+        self.read_seq = 0  # Scores already taken from the score buffer
+        
+    def add_sample(self, sample, timestamp=None):
+        """Samples are analyzed in the ingest process"""
+        
+    def add_calibration_sample(self, sample):
+        """Calibration samples are collected in the ingest process"""
+        
+    def start_calibration(self):
+        """Ask the ingest process to start collecting calibration data"""
+        if self.receiver.score_buffer is not None:
+            self.receiver.score_buffer.set_control(muse_ingest.CONTROL_START_CALIBRATION)
+            
+    def finish_calibration(self):
+        """Ask the ingest process to finish calibration and wait for its answer"""
+        score_buffer = self.receiver.score_buffer
+        if score_buffer is None:
+            return False, "Not attached to an ingest process"
+        
+        score_buffer.set_control(muse_ingest.CONTROL_FINISH_CALIBRATION)
+        deadline = time.time() + 2.0
+        while time.time() < deadline:
+            status = score_buffer.status
+            if status == muse_ingest.CALIBRATION_DONE:
+                self.is_calibrated = True
+                return True, "Calibration complete in ingest process"
+            if status == muse_ingest.CALIBRATION_FAILED:
+                return False, "Ingest process calibration failed"
+            time.sleep(0.05)
+        return False, "Ingest process did not answer the calibration request"
+        
+    def calculate_meditation_score(self):
+        """Newest score published by the ingest process since the last call.
+        
+        The ingest process may score less often than the viewer asks; without
+        a new score this returns NO_NEW_SCORE_LABEL so nothing is recorded twice.
+        """
+        score_buffer = self.receiver.score_buffer
+        if score_buffer is None:
+            return 0.0, COLLECTING_LABEL
+        rows, self.read_seq, _ = score_buffer.read_since(self.read_seq)
+        if len(rows) == 0:
+            return 0.0, COLLECTING_LABEL if score_buffer.write_seq == 0 else NO_NEW_SCORE_LABEL
+        self.last_score_timestamp, score, state_code, calibrated = rows[-1]
+        return float(score), state_label(state_code, calibrated)
+
+
 class WorkingMuseGUI(QMainWindow):
     """Working Muse 2 GUI using fixed muselsl library"""
     
-    def __init__(self):
+    def __init__(self, shared_memory_name=None, spawn_ingest=False,
+                 queue_size=1024, overflow_policy='block', session_dir=None, codec='float32',
+                 score_rate=1.0, lsl_outlet=False, serve_port=None, serve_encoding='json',
+                 user=None, adaptive_baseline=None, motion_threshold=MOTION_THRESHOLD,
+                 heart_weight=0.0, spectrogram_channel='AF7'):
         super().__init__()
         self.setWindowTitle("🧠 Working Muse 2 GUI - Using Fixed muselsl!")
         self.setGeometry(100, 100, 1400, 900)
@@ -350,12 +381,50 @@ class WorkingMuseGUI(QMainWindow):
             }
         """)
         
+        self.spectrogram_channel = spectrogram_channel
         self.setup_ui()
         self.setup_plots()
         
         # Initialize components
-        self.meditation_analyzer = MeditationAnalyzer()
-        self.lsl_receiver = LSLDataReceiver()
+        # With shared memory, ingestion and analysis live in muse_ingest.py
+        self.shared_memory_name = shared_memory_name
+        self.spawn_ingest = spawn_ingest
+        self.ingest_process = None
+        
+        # Half-life (minutes) of the drift-following baseline, None to keep it fixed
+        self.adaptive_baseline = adaptive_baseline
+        self.motion_threshold = motion_threshold
+        self.motion_paused = False  # Last reported motion gating pause
+        # Share of the meditation score taken from heart rate and HRV
+        self.heart_weight = heart_weight
+        
+        # Scores per second; optionally republished as an LSL stream
+        self.score_rate = score_rate
+        self.lsl_outlet = lsl_outlet
+        self.score_outlet = None
+        self.serve_port = serve_port
+        self.serve_encoding = serve_encoding
+        self.score_server = None
+        
+        # Personal baselines saved per headset and user
+        self.user = user or getpass.getuser()
+        self.baseline_store = BaselineStore()
+        self.baseline_checked = False
+        if shared_memory_name:
+            self.lsl_receiver = SharedMemoryReceiver(shared_memory_name)
+            self.meditation_analyzer = SharedScoreView(self.lsl_receiver)
+        else:
+            self.meditation_analyzer = MeditationAnalyzer()
+            if adaptive_baseline:
+                self.meditation_analyzer.enable_adaptive_baseline(adaptive_baseline * 60.0)
+            self.lsl_receiver = LSLDataReceiver(queue_size, overflow_policy)
+            if motion_threshold:
+                # Head movement gates scoring; the receiver thread feeds the estimator
+                self.meditation_analyzer.motion = MotionEstimator(motion_threshold)
+                self.lsl_receiver.motion = self.meditation_analyzer.motion
+            self.meditation_analyzer.heart = HeartRateEngine()
+            self.meditation_analyzer.heart_weight = heart_weight
+            self.lsl_receiver.heart = self.meditation_analyzer.heart
         
         # Connect signals
         self.lsl_receiver.data_received.connect(self.process_eeg_data)
@@ -373,20 +442,31 @@ class WorkingMuseGUI(QMainWindow):
         self.calibration_duration = 20  # seconds
         
         # Plot data - show last 8 seconds
+        # (channels, samples) ring, one row per stream channel in stream order
         self.plot_buffer_size = 2048  # 8 seconds at 256Hz
-        self.eeg_data = {
-            'TP9': deque(maxlen=self.plot_buffer_size),
-            'AF7': deque(maxlen=self.plot_buffer_size),
-            'AF8': deque(maxlen=self.plot_buffer_size),
-            'TP10': deque(maxlen=self.plot_buffer_size)
-        }
-        self.time_data = deque(maxlen=self.plot_buffer_size)
-        
-        # Meditation tracking data
-        self.meditation_10s_data = deque(maxlen=180)  # Last 30 minutes at 10s intervals
-        self.meditation_10s_times = deque(maxlen=180)
-        self.meditation_1m_data = deque(maxlen=60)   # Last 1 hour at 1m intervals  
-        self.meditation_1m_times = deque(maxlen=60)
+        self.channels = None
+        self.sample_rate = None
+        self.eeg_data = None
+        self.time_data = np.zeros(self.plot_buffer_size)
+        self.plot_count = 0
+        # Whole session as a min/max pyramid; the curves are drawn from it so
+        # zooming out to hours still draws about one point pair per pixel
+        self.overview = None
+        self.quality_update_time = 0  # Contact quality titles refresh once a second
+        
+        # Rolling spectrogram of one channel (None if the stream lacks it)
+        self.spectrogram = None
+        self.spectrogram_row = None
+        self.spectrogram_shown = 0  # column_count last drawn
+        self.spectrogram_levels = None
+        
+        # Meditation tracking data: 1s scores rolled up into 10s/1m/10m tiers
+        # for the whole session; older buckets spill into the session folder
+        self.session_dir = session_dir
+        self.session_codec = codec
+        self.session_path = None
+        self.session_writer = None
+        self.score_history = None
         
         # Timers
         self.meditation_timer = QTimer(self)
@@ -397,10 +477,11 @@ class WorkingMuseGUI(QMainWindow):
         
         # Meditation tracking timers
         self.meditation_10s_timer = QTimer(self)
-        self.meditation_10s_timer.timeout.connect(self.record_meditation_10s)
+        self.meditation_10s_timer.timeout.connect(self.update_meditation_10s_plot)
+        self.meditation_10s_timer.timeout.connect(self.update_meditation_stats)
         
         self.meditation_1m_timer = QTimer(self)
-        self.meditation_1m_timer.timeout.connect(self.record_meditation_1m)
+        self.meditation_1m_timer.timeout.connect(self.update_meditation_1m_plot)
         
         # Calibration timer
         self.calibration_timer = QTimer(self)
@@ -537,17 +618,16 @@ class WorkingMuseGUI(QMainWindow):
         main_layout.addWidget(self.log_text)
         
     def setup_plots(self):
-        # EEG plots setup - 2x2 grid of EEG channel plots
-        channels = ['TP9', 'AF7', 'AF8', 'TP10']
-        colors = ['#ffd700', '#00bfff', '#ff6347', '#32cd32']  # Gold, Blue, Red, Green
-        positions = [(0, 0), (0, 1), (1, 0), (1, 1)]
+        # EEG plots setup - 2x2 grid of EEG channel plots, Right AUX below
+        colors = ['#ffd700', '#00bfff', '#ff6347', '#32cd32', '#da70d6']  # Gold, Blue, Red, Green, Orchid
+        positions = [(0, 0, 1), (0, 1, 1), (1, 0, 1), (1, 1, 1), (2, 0, 2)]
         
         self.eeg_plots = {}
         self.eeg_curves = {}
         
-        for (channel, color, (row, col)) in zip(channels, colors, positions):
+        for (channel, color, (row, col, colspan)) in zip(MUSE_CHANNELS, colors, positions):
             plot = self.eeg_plot_widget.addPlot(title=f"EEG {channel}", 
-                                           row=row, col=col)
+                                           row=row, col=col, colspan=colspan)
             plot.setLabel('left', 'Amplitude (µV)', color='white', size='11pt')
             plot.setLabel('bottom', 'Time (seconds)', color='white', size='11pt')
             plot.showGrid(x=True, y=True, alpha=0.4)
@@ -565,6 +645,28 @@ class WorkingMuseGUI(QMainWindow):
             
             self.eeg_plots[channel] = plot
             self.eeg_curves[channel] = curve
+            if channel != MUSE_CHANNELS[0]:
+                plot.setXLink(self.eeg_plots[MUSE_CHANNELS[0]])  # Zoom and pan together
+            
+        self.quality_colors = {"good": '#90ee90', "fair": '#ffd700', "poor": '#ff6347'}
+        
+        # Spectrogram of the last minutes below the EEG curves; the image is
+        # a (time, frequency) view into RollingSpectrogram's fixed buffer,
+        # sized for the stream's rate once it is known (setup_channel_map)
+        self.spectrogram_plot = self.eeg_plot_widget.addPlot(title=f"Spectrogram {self.spectrogram_channel}",
+                                                             row=3, col=0, colspan=2)
+        self.spectrogram_plot.setLabel('left', 'Frequency (Hz)', color='white', size='11pt')
+        self.spectrogram_plot.setLabel('bottom', 'Time (seconds)', color='white', size='11pt')
+        self.spectrogram_plot.getAxis('left').setTextPen('white')
+        self.spectrogram_plot.getAxis('bottom').setTextPen('white')
+        self.spectrogram_plot.setTitle(f"Spectrogram {self.spectrogram_channel}", color='white', size='12pt')
+        self.spectrogram_image = pg.ImageItem()
+        self.spectrogram_image.setLookupTable(pg.colormap.get('viridis').getLookupTable())
+        self.spectrogram_plot.addItem(self.spectrogram_image)
+        self.spectrogram_plot.setXRange(-SPECTROGRAM_SECONDS, 0, padding=0)
+        self.spectrogram_plot.setYRange(0, MAX_FREQUENCY, padding=0)
+        for frequency in (8, 13):  # Alpha band
+            self.spectrogram_plot.addLine(y=frequency, pen=pg.mkPen('#ffffff', width=1, style=2))
         
         # Meditation tracking plots setup
         # 10-second interval plot (top)
@@ -632,23 +734,58 @@ class WorkingMuseGUI(QMainWindow):
             self.status_label.setText("Status: Error")
             self.status_label.setStyleSheet("color: #ff6347;")
             
-    def process_eeg_data(self, sample):
+    def setup_channel_map(self):
+        """Adopt the stream's channel map for the analyzer and plot buffers"""
+        self.channels = list(self.lsl_receiver.channels)
+        self.sample_rate = self.lsl_receiver.sample_rate
+        self.eeg_data = np.zeros((len(self.channels), self.plot_buffer_size))
+        self.plot_count = 0
+        self.overview = MinMaxPyramid(len(self.channels))
+        if self.spectrogram_channel in self.channels:
+            spectrogram = RollingSpectrogram(self.sample_rate)
+            self.spectrogram_image.setRect(QRectF(-spectrogram.seconds, 0, spectrogram.seconds,
+                                                  spectrogram.max_frequency))
+            self.spectrogram = spectrogram
+            self.spectrogram_row = self.channels.index(self.spectrogram_channel)
+        else:
+            self.spectrogram = None
+        self.spectrogram_shown = 0
+        if not self.shared_memory_name:
+            self.meditation_analyzer.set_channels(self.channels)
+            
+    def process_eeg_data(self, sample, timestamp):
         """Process received EEG data"""
+        if self.channels != self.lsl_receiver.channels or self.sample_rate != self.lsl_receiver.sample_rate:
+            self.setup_channel_map()
+            
         # Add to meditation analyzer
-        self.meditation_analyzer.add_sample(sample)
+        self.meditation_analyzer.add_sample(sample, timestamp)
+        
+        # Returning users start with their saved baseline
+        if not self.baseline_checked and not self.shared_memory_name:
+            self.baseline_checked = True
+            self.load_saved_baseline()
+            
+        # Record raw EEG (the ingest process records it in shared memory mode)
+        if self.session_path and not self.shared_memory_name:
+            if self.session_writer is None:
+                self.session_writer = SessionWriter(self.session_path, self.channels,
+                                                    source_id=self.lsl_receiver.source_id,
+                                                    codec=self.session_codec)
+            self.session_writer.append_samples(timestamp, sample)
         
         # Add to calibration if active
         if self.is_calibrating:
             self.meditation_analyzer.add_calibration_sample(sample)
         
-        # Add to plot buffers
-        current_time = time.time()
-        self.time_data.append(current_time)
-        
-        channels = ['TP9', 'AF7', 'AF8', 'TP10']
-        for i, channel in enumerate(channels):
-            if i < len(sample):
-                self.eeg_data[channel].append(sample[i])
+        # Add to plot buffers, on the stream's own (LSL) timeline
+        slot = self.plot_count % self.plot_buffer_size
+        self.time_data[slot] = timestamp
+        self.eeg_data[:, slot] = sample[:len(self.channels)]
+        self.plot_count += 1
+        self.overview.add(sample[:len(self.channels)], timestamp)
+        if self.spectrogram is not None:
+            self.spectrogram.add(sample[self.spectrogram_row])
         
         self.sample_count += 1
         
@@ -658,30 +795,86 @@ class WorkingMuseGUI(QMainWindow):
             
     def update_plots(self):
         """Update EEG plots with better scaling"""
-        if len(self.time_data) < 10:
+        if self.plot_count < 10:
             return
             
-        time_array = np.array(self.time_data)
-        time_relative = time_array - time_array[-1]  # Relative to current
-        
-        channels = ['TP9', 'AF7', 'AF8', 'TP10']
-        for channel in channels:
-            if len(self.eeg_data[channel]) > 0:
-                data_array = np.array(self.eeg_data[channel])
-                self.eeg_curves[channel].setData(time_relative, data_array)
+        # Oldest to newest slots of the ring
+        n = min(self.plot_count, self.plot_buffer_size)
+        slots = (self.plot_count - n + np.arange(n)) % self.plot_buffer_size
+        data = self.eeg_data[:, slots]
+        
+        # Follow the last 8 seconds while x auto-range is on; once the user
+        # zooms or pans, show that span (relative to the newest sample)
+        views = [plot.getViewBox() for plot in self.eeg_plots.values()]
+        following = any(view.autoRangeEnabled()[0] for view in views)
+        if following:
+            start, stop = self.time_data[slots[0]] - self.time_data[slots[-1]], 0.0
+        else:
+            start, stop = views[0].viewRange()[0]
+        newest = self.overview.last_time
+        times, values = self.overview.read(newest + start, newest + stop, max(int(views[0].width()), 200))
+        time_relative = times - newest  # Relative to current
+        
+        # Auto-scale Y axis to the last ~2 seconds of every channel at once,
+        # or to everything shown when looking at another span
+        recent = data[:, -500:] if following or values.shape[1] == 0 else values
+        data_min, data_max = recent.min(axis=1), recent.max(axis=1)
+        padding = (data_max - data_min) * 0.1  # 10% padding
+        
+        for i, channel in enumerate(self.channels):
+            if channel not in self.eeg_curves:
+                continue
+            self.eeg_curves[channel].setData(time_relative, values[i])
+            # Only scale when we have enough data and a reasonable signal range
+            if n > 50 and data_max[i] - data_min[i] > 10:
+                self.eeg_plots[channel].setYRange(data_min[i] - padding[i], data_max[i] + padding[i])
                 
-                # Auto-scale Y axis to data range with some padding
-                if len(data_array) > 50:  # Only scale when we have enough data
-                    data_min, data_max = np.min(data_array[-500:]), np.max(data_array[-500:])  # Last ~2 seconds
-                    padding = (data_max - data_min) * 0.1  # 10% padding
-                    if data_max - data_min > 10:  # Only if we have reasonable signal range
-                        self.eeg_plots[channel].setYRange(data_min - padding, data_max + padding)
+        if n >= 512 and time.time() - self.quality_update_time >= 1.0:
+            self.quality_update_time = time.time()
+            self.update_quality_titles(data[:, -512:])
+            self.update_spectrogram(levels=True)
+        else:
+            self.update_spectrogram()
+            
+    def update_spectrogram(self, levels=False):
+        """Show new spectrogram columns; color levels are refit once a second"""
+        spectrogram = self.spectrogram
+        if spectrogram is None or spectrogram.column_count == self.spectrogram_shown:
+            return
+        self.spectrogram_shown = spectrogram.column_count
+        if levels or self.spectrogram_levels is None:
+            self.spectrogram_levels = spectrogram.levels()
+        self.spectrogram_image.setImage(spectrogram.image(), autoLevels=False, levels=self.spectrogram_levels)
+            
+    def update_quality_titles(self, recent):
+        """Show the contact quality of the last 2 seconds in every EEG plot title"""
+        quality = channel_quality(recent)  # All channels in one call
+        for channel, value in zip(self.channels, quality):
+            if channel in self.eeg_plots:
+                label = quality_label(value)
+                self.eeg_plots[channel].setTitle(f"EEG {channel} - contact {label} ({value:.0%})",
+                                                 color=self.quality_colors[label], size='12pt')
                 
     def update_meditation_display(self):
-        """Update meditation score display"""
+        """Update meditation score display and record it in the history"""
         score, state = self.meditation_analyzer.calculate_meditation_score()
+        self.record_meditation_score(score, state)
+        if state == NO_NEW_SCORE_LABEL:
+            return  # Keep showing the ingest process's last score
         
         self.meditation_label.setText(f"MEDITATION: {score:.1f}/100")
+        heart = (self.meditation_analyzer.last_result or {}) if not self.shared_memory_name else {}
+        if np.isfinite(heart.get('heart_rate', np.nan)):
+            state += f"  |  HR {heart['heart_rate']:.0f} bpm"
+            if np.isfinite(heart['rmssd']):
+                state += f", RMSSD {heart['rmssd']:.0f} ms"
+        paused = getattr(self.meditation_analyzer, 'motion_paused', False)
+        if paused:
+            state += "  |  motion gating paused (no ACC data)"
+        if paused != self.motion_paused:
+            self.motion_paused = paused
+            self.log_message("WARNING ACC data stalled, scoring without motion gating" if paused
+                             else "Motion gating resumed")
         self.state_label.setText(f"STATE: {state}")
         self.meditation_progress.setValue(int(score))
         
@@ -697,75 +890,82 @@ class WorkingMuseGUI(QMainWindow):
             
         self.meditation_label.setStyleSheet(f"color: {color}; font-weight: bold;")
     
-    def record_meditation_10s(self):
-        """Record meditation score every 10 seconds"""
-        score, _ = self.meditation_analyzer.calculate_meditation_score()
-        current_time = time.time()
-        
-        self.meditation_10s_data.append(score)
-        self.meditation_10s_times.append(current_time)
-        
-        self.update_meditation_10s_plot()
-        self.update_meditation_stats()
-    
-    def record_meditation_1m(self):
-        """Record meditation score every minute"""
-        score, _ = self.meditation_analyzer.calculate_meditation_score()
-        current_time = time.time()
-        
-        self.meditation_1m_data.append(score)
-        self.meditation_1m_times.append(current_time)
-        
-        self.update_meditation_1m_plot()
-        self.update_meditation_stats()
+    def record_meditation_score(self, score, state):
+        """Fold the latest score into the multi-resolution history"""
+        # Stamped with the end of the scored EEG window
+        timestamp = self.meditation_analyzer.last_score_timestamp
+        if timestamp is None or state in UNSCORED_LABELS:
+            return
+            
+        if self.score_history is None:
+            spill_dir = None
+            if self.session_path:
+                spill_dir = os.path.join(self.session_path, 'score_history')
+            self.score_history = ScoreHistory(origin=timestamp, spill_dir=spill_dir)
+        self.score_history.add(timestamp, score)
+        
+        if self.lsl_outlet and not self.shared_memory_name:
+            if self.score_outlet is None:
+                self.score_outlet = ScoreOutlet(self.lsl_receiver.source_id, self.score_rate)
+                self.log_message("PUBLISHING scores on LSL stream 'MuseMeditation'")
+            self.score_outlet.publish(self.meditation_analyzer.last_result, timestamp,
+                                      self.meditation_analyzer.is_calibrated)
+            
+        if self.score_server is not None:
+            self.score_server.publish_result(self.meditation_analyzer.last_result, timestamp,
+                                             self.meditation_analyzer.is_calibrated)
+            
+        if self.session_writer is not None:
+            self.session_writer.append_score(dict(self.meditation_analyzer.last_result, timestamp=timestamp,
+                                                  calibrated=float(self.meditation_analyzer.is_calibrated)))
     
     def update_meditation_stats(self):
         """Update meditation statistics display"""
-        if len(self.meditation_10s_data) > 0:
-            recent_scores = list(self.meditation_10s_data)[-18:]  # Last 3 minutes (18 * 10s)
-            if len(recent_scores) > 0:
-                avg_score = np.mean(recent_scores)
-                max_score = np.max(recent_scores)
-                min_score = np.min(recent_scores)
-                self.meditation_stats_label.setText(
-                    f"Last 3min: Avg {avg_score:.1f}, Max {max_score:.1f}, Min {min_score:.1f}"
-                )
+        recent = self.score_history.recent(180, period=10) if self.score_history else None
+        if recent is not None and recent['count'].sum() > 0:
+            # Last 3 minutes from the 10s tier aggregates
+            avg_score = np.nansum(recent['mean'] * recent['count']) / recent['count'].sum()
+            max_score = np.nanmax(recent['max'])
+            min_score = np.nanmin(recent['min'])
+            self.meditation_stats_label.setText(
+                f"Last 3min: Avg {avg_score:.1f}, Max {max_score:.1f}, Min {min_score:.1f}"
+            )
         else:
             self.meditation_stats_label.setText("STATS: Collecting data...")
     
     def update_meditation_10s_plot(self):
-        """Update the 10-second meditation tracking plot"""
-        if len(self.meditation_10s_data) < 2:
+        """Update the 10-second meditation tracking plot (last 30 minutes)"""
+        if self.score_history is None:
+            return
+        recent = self.score_history.recent(1800, period=10)
+        if len(recent['time']) < 2:
             return
             
-        # Convert times to minutes relative to the latest time
-        times_array = np.array(self.meditation_10s_times)
-        time_relative = (times_array - times_array[-1]) / 60.0  # Convert to minutes
-        scores_array = np.array(self.meditation_10s_data)
+        # Bucket centers in minutes relative to the latest score
+        latest = self.score_history.latest_time
+        time_relative = (recent['time'] + recent['period'] / 2 - latest) / 60.0
         
-        # Update the plot
-        self.meditation_10s_curve.setData(time_relative, scores_array)
-        
-        # Auto-scale X axis to show meaningful time range
-        if len(time_relative) > 1:
-            self.meditation_10s_plot.setXRange(time_relative[0], time_relative[-1])
+        # Update the plot; empty buckets leave a gap
+        self.meditation_10s_curve.setData(time_relative, recent['mean'], connect='finite')
+        self.meditation_10s_plot.setXRange(time_relative[0], time_relative[-1])
     
     def update_meditation_1m_plot(self):
-        """Update the 1-minute meditation tracking plot"""
-        if len(self.meditation_1m_data) < 2:
+        """Update the session-long tracking plot from the coarsest tier that fits"""
+        if self.score_history is None:
+            return
+        history = self.score_history
+        session = history.query(history.origin, history.latest_time, max_points=600)
+        if len(session['time']) < 2:
             return
             
-        # Convert times to hours relative to the latest time
-        times_array = np.array(self.meditation_1m_times)
-        time_relative = (times_array - times_array[-1]) / 3600.0  # Convert to hours
-        scores_array = np.array(self.meditation_1m_data)
-        
-        # Update the plot
-        self.meditation_1m_curve.setData(time_relative, scores_array)
-        
-        # Auto-scale X axis to show meaningful time range
-        if len(time_relative) > 1:
-            self.meditation_1m_plot.setXRange(time_relative[0], time_relative[-1])
+        # Bucket centers in hours relative to the latest score
+        time_relative = (session['time'] + session['period'] / 2 - history.latest_time) / 3600.0
+        
+        # Update the plot; the bucket size grows with the session length
+        self.meditation_1m_curve.setData(time_relative, session['mean'], connect='finite')
+        self.meditation_1m_plot.setXRange(time_relative[0], time_relative[-1])
+        self.meditation_1m_plot.setTitle(f"Session ({session['period']}s buckets)",
+                                         color='white', size='11pt')
     
     def start_calibration(self):
         """Start 20-second calibration process"""
@@ -821,6 +1021,11 @@ class WorkingMuseGUI(QMainWindow):
         
         if success:
             self.log_message(f"SUCCESS {message}")
+            if not self.shared_memory_name:
+                address = device_address(self.lsl_receiver.source_id)
+                self.baseline_store.put(address, self.user, self.meditation_analyzer.calibration_baseline,
+                                        self.meditation_analyzer.calibration_stats.n_samples)
+                self.log_message(f"SAVED baseline for {self.user} on {address}")
             self.calibrate_btn.setText("RECALIBRATE")
             self.calibrate_btn.setStyleSheet("""
                 QPushButton { 
@@ -841,6 +1046,17 @@ class WorkingMuseGUI(QMainWindow):
             
         self.calibrate_btn.setEnabled(True)
     
+    def load_saved_baseline(self):
+        """Apply the baseline saved for this headset and user, if any"""
+        address = device_address(self.lsl_receiver.source_id)
+        baseline = self.baseline_store.get(address, self.user)
+        if baseline is None:
+            return
+        self.meditation_analyzer.set_baseline(baseline)
+        self.calibrate_btn.setText("RECALIBRATE")
+        self.log_message(f"LOADED saved baseline for {self.user} on {address} "
+                         f"(RMS {baseline['avg_rms']:.1f}µV) - calibration optional")
+        
     def handle_connection_lost(self):
         """Handle when connection is lost"""
         self.log_message("CONNECTION Lost - stopping stream")
@@ -859,9 +1075,16 @@ class WorkingMuseGUI(QMainWindow):
     def update_sample_count(self):
         """Update sample counter"""
         if hasattr(self.lsl_receiver, 'sample_count'):
-            self.sample_label.setText(f"SAMPLES: {self.lsl_receiver.sample_count}")
+            text = f"SAMPLES: {self.lsl_receiver.sample_count}"
         else:
-            self.sample_label.setText(f"SAMPLES: {self.sample_count}")
+            text = f"SAMPLES: {self.sample_count}"
+            
+        if hasattr(self.lsl_receiver, 'queue_stats'):
+            stats = self.lsl_receiver.queue_stats()
+            text += (f" | backlog {stats['backlog']}"
+                     f" | dropped {stats['dropped']}"
+                     f" | coalesced {stats['coalesced']}")
+        self.sample_label.setText(text)
             
     def toggle_streaming(self):
         """Start/stop Muse streaming"""
@@ -872,6 +1095,16 @@ class WorkingMuseGUI(QMainWindow):
             
     def start_streaming(self):
         """Start muselsl streaming process"""
+        # One archive folder per session, shared by raw data, scores and history
+        self.session_path = None
+        if self.session_dir:
+            self.session_path = os.path.join(self.session_dir, time.strftime("%Y%m%d-%H%M%S"))
+            
+        if self.shared_memory_name and not self.spawn_ingest:
+            # Attach-only viewer: the headset is owned by another process
+            self.start_receiver()
+            return
+            
         if not MUSE_AVAILABLE:
             self.log_message("ERROR muselsl not available")
             return
@@ -919,6 +1152,40 @@ class WorkingMuseGUI(QMainWindow):
             # Wait for stream to establish (muselsl needs time to start LSL stream)
             time.sleep(5)
             
+            if self.spawn_ingest:
+                # Separate process so GUI stalls or crashes never drop samples
+                self.log_message("STARTING ingest process...")
+                cmd = [
+                    sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'muse_ingest.py'),
+                    '--name', self.shared_memory_name
+                ]
+                cmd += ['--score-interval', str(1.0 / self.score_rate), '--user', self.user]
+                if self.session_path:
+                    cmd += ['--session-dir', self.session_path, '--codec', self.session_codec]
+                if self.lsl_outlet:
+                    cmd += ['--lsl-outlet']
+                if self.serve_port is not None:
+                    cmd += ['--serve-port', str(self.serve_port), '--serve-encoding', self.serve_encoding]
+                if self.adaptive_baseline:
+                    cmd += ['--adaptive-baseline', str(self.adaptive_baseline)]
+                cmd += ['--motion-threshold', str(self.motion_threshold)]
+                if self.heart_weight:
+                    cmd += ['--heart-weight', str(self.heart_weight)]
+                self.ingest_process = subprocess.Popen(cmd)
+            
+            self.start_receiver()
+            
+        except Exception as e:
+            self.log_message(f"ERROR in streaming process: {e}")
+            
+    def start_receiver(self):
+        """Start the data receiver and switch the UI to streaming mode"""
+        try:
+            # Fan scores out to local subscribers (muse_ingest.py does it in shared memory mode)
+            if self.serve_port is not None and not self.shared_memory_name and self.score_server is None:
+                self.score_server = ScoreServer(port=self.serve_port, encoding=self.serve_encoding).start()
+                self.log_message(f"SERVING scores on 127.0.0.1:{self.score_server.port}")
+                
             # Start LSL data receiver
             self.log_message("CONNECTING Starting LSL data receiver...")
             self.lsl_receiver.start_receiving()
@@ -947,13 +1214,13 @@ class WorkingMuseGUI(QMainWindow):
             self.calibrate_btn.setEnabled(True)
             
             # Start timers
-            self.meditation_timer.start(2000)     # Every 2 seconds for display
+            self.meditation_timer.start(int(1000 / self.score_rate))  # Score, display and history
             self.sample_timer.start(1000)         # Every second for sample count
-            self.meditation_10s_timer.start(10000)  # Every 10 seconds for tracking
-            self.meditation_1m_timer.start(60000)   # Every 1 minute for tracking
+            self.meditation_10s_timer.start(10000)  # Every 10 seconds for tracking plots
+            self.meditation_1m_timer.start(60000)   # Every 1 minute for the session plot
             
         except Exception as e:
-            self.log_message(f"ERROR in streaming process: {e}")
+            self.log_message(f"ERROR starting receiver: {e}")
             
     def stop_streaming(self):
         """Stop streaming"""
@@ -974,6 +1241,18 @@ class WorkingMuseGUI(QMainWindow):
                     pass
             self.stream_process = None
         
+        # Stop ingest process if we started it
+        if self.ingest_process:
+            try:
+                self.ingest_process.terminate()
+                self.ingest_process.wait(timeout=5)
+            except:
+                try:
+                    self.ingest_process.kill()
+                except:
+                    pass
+            self.ingest_process = None
+        
         # Stop timers
         self.meditation_timer.stop()
         self.sample_timer.stop()
@@ -984,6 +1263,16 @@ class WorkingMuseGUI(QMainWindow):
         # Stop calibration if active
         if self.is_calibrating:
             self.is_calibrating = False
+            
+        # Flush the score history of this session to disk
+        if self.score_history is not None:
+            self.score_history.close()
+            self.score_history = None
+        if self.session_writer is not None:
+            self.session_writer.close()
+            self.session_writer = None
+            self.log_message(f"SAVED Session recorded to {self.session_path}")
+            self.export_session_scores()
         
         # Reset UI
         self.start_btn.setText("START Muse Streaming")
@@ -1002,14 +1291,70 @@ class WorkingMuseGUI(QMainWindow):
         
         self.log_message("STOPPED Streaming stopped")
         
+    def export_session_scores(self):
+        """Write the session's per-tick scores to Parquet for analysis"""
+        if not PARQUET_AVAILABLE:
+            self.log_message("SKIPPED Parquet export (pip install pyarrow)")
+            return
+        try:
+            path, rows = export_session(self.session_path)
+            if path:
+                self.log_message(f"EXPORTED {rows} scores to {path}")
+        except Exception as e:
+            self.log_message(f"ERROR exporting session: {e}")
+            
     def closeEvent(self, event):
         """Handle window close"""
         if self.is_streaming:
             self.stop_streaming()
+        if self.score_server is not None:
+            self.score_server.stop()
         event.accept()
 
 
+def positive_float(text):
+    """argparse type for rates that are divided by"""
+    value = float(text)
+    if not value > 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {text}")
+    return value
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Working Muse 2 GUI")
+    parser.add_argument('--shared-memory', action='store_true',
+                        help="run ingestion and analysis in a separate process (muse_ingest.py)")
+    parser.add_argument('--attach', metavar='NAME',
+                        help="view an already running muse_ingest.py process")
+    parser.add_argument('--name', default=muse_ingest.DEFAULT_NAME,
+                        help="shared memory name used with --shared-memory")
+    parser.add_argument('--session-dir', default=DEFAULT_SESSION_DIR,
+                        help="where session data is written ('' to keep it in memory only)")
+    parser.add_argument('--codec', choices=sorted(CODECS), default='float32',
+                        help="raw EEG storage codec ('delta' is quantized and compressed)")
+    parser.add_argument('--user', help="whose calibration baseline to load and save (default: login name)")
+    parser.add_argument('--adaptive-baseline', type=float, metavar='MINUTES',
+                        help="let the calibrated baseline follow drift with this half-life")
+    parser.add_argument('--motion-threshold', type=float, default=MOTION_THRESHOLD,
+                        help="skip windows with head movement above this RMS acceleration in g (0 = off)")
+    parser.add_argument('--heart-weight', type=float, default=0.0,
+                        help="share (0-1) of the meditation score taken from heart rate and HRV (default off)")
+    parser.add_argument('--spectrogram-channel', choices=MUSE_CHANNELS, default='AF7',
+                        help="channel shown in the rolling spectrogram")
+    parser.add_argument('--score-rate', type=positive_float, default=1.0,
+                        help="meditation scores per second")
+    parser.add_argument('--lsl-outlet', action='store_true',
+                        help="publish scores, state and sub-scores as an LSL stream")
+    parser.add_argument('--serve-port', type=int,
+                        help="serve scores and features to local TCP subscribers on this port")
+    parser.add_argument('--serve-encoding', choices=ENCODINGS, default='json',
+                        help="record encoding for --serve-port subscribers")
+    parser.add_argument('--queue-size', type=int, default=1024,
+                        help="max samples waiting for the GUI thread")
+    parser.add_argument('--overflow-policy', choices=OVERFLOW_POLICIES, default='block',
+                        help="what to do when the GUI falls behind")
+    args = parser.parse_args()
+    
     try:
         if not QT_AVAILABLE:
             print("ERROR Qt components not available")
@@ -1019,13 +1364,34 @@ def main():
             print("ERROR Muse components not available")
             sys.exit(1)
             
-        import os
         os.environ['QT_X11_NO_MITSHM'] = '1'
         
-        app = QApplication(sys.argv)
+        app = QApplication(sys.argv[:1])
         app.setApplicationName("Working Muse 2 GUI")
         
-        window = WorkingMuseGUI()
+        if args.attach:
+            window = WorkingMuseGUI(shared_memory_name=args.attach,
+                                    session_dir=args.session_dir, codec=args.codec,
+                                    spectrogram_channel=args.spectrogram_channel)
+        elif args.shared_memory:
+            window = WorkingMuseGUI(shared_memory_name=args.name, spawn_ingest=True,
+                                    session_dir=args.session_dir, codec=args.codec,
+                                    score_rate=args.score_rate, lsl_outlet=args.lsl_outlet,
+                                    serve_port=args.serve_port, serve_encoding=args.serve_encoding,
+                                    user=args.user, adaptive_baseline=args.adaptive_baseline,
+                                    motion_threshold=args.motion_threshold,
+                                    heart_weight=args.heart_weight,
+                                    spectrogram_channel=args.spectrogram_channel)
+        else:
+            window = WorkingMuseGUI(queue_size=args.queue_size,
+                                    overflow_policy=args.overflow_policy,
+                                    session_dir=args.session_dir, codec=args.codec,
+                                    score_rate=args.score_rate, lsl_outlet=args.lsl_outlet,
+                                    serve_port=args.serve_port, serve_encoding=args.serve_encoding,
+                                    user=args.user, adaptive_baseline=args.adaptive_baseline,
+                                    motion_threshold=args.motion_threshold,
+                                    heart_weight=args.heart_weight,
+                                    spectrogram_channel=args.spectrogram_channel)
         window.show()
         
         print("SUCCESS Working Muse 2 GUI launched successfully!")